@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+""" Benchmarks parsing of the date formats returned by Habitica.
+
+Compares the original iso8601 parse with an exception-driven epoch fallback
+against `scriptabit.dates.parse_date_utc`, both with an empty memo (every
+string distinct) and with repeated strings.
+
+Usage::
+
+    python benchmarks/bench_dates.py [--count N]
+"""
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals)
+
+import argparse
+import time
+from datetime import datetime
+
+import iso8601
+import pytz
+
+from scriptabit import dates
+from scriptabit.dates import parse_date_utc
+
+BASE_MS = 1469601694391
+
+FORMATS = [
+    ('iso, milliseconds, Z',
+     lambda i: '2016-08-12T11:{0:02}:{1:02}.{2:03}Z'.format(
+         i // 60 % 60, i % 60, i % 1000)),
+    ('iso, offset',
+     lambda i: '2016-08-12T11:{0:02}:{1:02}+00:00'.format(
+         i // 60 % 60, i % 60)),
+    ('iso, date only',
+     lambda i: '{0:04}-{1:02}-{2:02}'.format(
+         1900 + i // 336, i // 28 % 12 + 1, i % 28 + 1)),
+    ('epoch ms string', lambda i: str(BASE_MS + i)),
+    ('epoch ms number', lambda i: BASE_MS + i),
+]
+
+
+def original_parse_date_utc(date, milliseconds=True):
+    """ The original implementation """
+    parsed_date = None
+    try:
+        parsed_date = iso8601.parse_date(date)
+    except iso8601.ParseError:
+        value = int(date)
+        if milliseconds:
+            value /= 1000
+        parsed_date = datetime.utcfromtimestamp(value)
+
+    return parsed_date.replace(tzinfo=pytz.utc)
+
+
+def measure(func, values, repeat=3):
+    """ Measures the best per-call time in microseconds """
+    best = None
+    for _ in range(repeat):
+        dates._CACHE.clear()
+        start = time.perf_counter()
+        for value in values:
+            func(value)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6 / len(values)
+
+
+def main():
+    """ Runs the benchmarks """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20000)
+    args = parser.parse_args()
+
+    print('{0:<22} {1:>10} {2:>10} {3:>10}'.format(
+        'format (us/call)', 'original', 'distinct', 'repeated'))
+    for name, make in FORMATS:
+        distinct = [make(i) for i in range(args.count)]
+        # a realistic mix: a small set of timestamps seen many times
+        repeated = [make(i % 100) for i in range(args.count)]
+        print('{0:<22} {1:10.2f} {2:10.2f} {3:10.2f}'.format(
+            name,
+            measure(original_parse_date_utc, distinct),
+            measure(parse_date_utc, distinct),
+            measure(parse_date_utc, repeated)))
+
+
+if __name__ == '__main__':
+    main()
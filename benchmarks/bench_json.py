@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+""" Benchmarks decoding of large Habitica user and task responses.
+
+Compares the original `requests.Response.json()` style decode (bytes to str to
+objects), the `scriptabit.json_stream.loads` backend, and the incremental
+streaming decode. Responses are read from a temporary file in chunks, as they
+would be from the network, and peak memory is measured with tracemalloc.
+
+Usage::
+
+    python benchmarks/bench_json.py [--messages N] [--tasks N] [--history N]
+"""
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals)
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from scriptabit.json_stream import (
+    iter_array_items,
+    iter_object_items,
+    loads,
+    orjson)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def fake_user(messages):
+    """ A user document with a large inbox """
+    return {
+        'success': True,
+        'data': {
+            'id': str(uuid.uuid4()),
+            'stats': {'hp': 50, 'mp': 30, 'exp': 10, 'gp': 100, 'lvl': 20},
+            'inbox': {
+                'messages': {
+                    str(uuid.uuid4()): {
+                        'text': 'message text ' * 10,
+                        'timestamp': '2017-01-30T10:11:12.000Z',
+                        'user': 'somebody',
+                    }
+                    for _ in range(messages)
+                },
+            },
+            'items': {'food': {'Meat': 3}, 'pets': {'Wolf-Base': 5}},
+        },
+    }
+
+
+def fake_tasks(count, history):
+    """ A task list where every task has a long history """
+    return {
+        'success': True,
+        'data': [
+            {
+                '_id': str(uuid.uuid4()),
+                'text': 'habit {0}'.format(i),
+                'type': 'habit',
+                'tags': [str(uuid.uuid4())],
+                'history': [
+                    {'date': 1469601694391 + j * 86400000, 'value': j * 0.5}
+                    for j in range(history)
+                ],
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def read_chunks(path):
+    """ Reads a file in chunks """
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def decode_response_json(path):
+    """ requests.Response.json(): bytes, then str, then objects """
+    content = b''.join(read_chunks(path))
+    return json.loads(content.decode('utf-8'))['data']
+
+
+def decode_loads(path):
+    """ scriptabit.json_stream.loads from bytes """
+    content = b''.join(read_chunks(path))
+    return loads(content)['data']
+
+
+def decode_streaming_object(path):
+    """ incremental decode of the data object """
+    return dict(iter_object_items(read_chunks(path)))
+
+
+def decode_streaming_array(path):
+    """ incremental decode of the data array """
+    return list(iter_array_items(read_chunks(path)))
+
+
+def measure(name, func, path, repeat=3):
+    """ Measures the best time and the peak memory of a decode """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    result = func(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+
+    print('  {0:<28} {1:8.1f} ms {2:8.1f} MiB peak'.format(
+        name, best * 1000, peak / 2**20))
+
+
+def run(label, document, funcs):
+    """ Writes the document to a temporary file and benchmarks it """
+    fd, path = tempfile.mkstemp(suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(document, f)
+        print('{0}: {1:.1f} MiB'.format(
+            label, os.path.getsize(path) / 2**20))
+        for name, func in funcs:
+            measure(name, func, path)
+    finally:
+        os.remove(path)
+
+
+def main():
+    """ Runs the benchmarks """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--tasks', type=int, default=300)
+    parser.add_argument('--history', type=int, default=500)
+    args = parser.parse_args()
+
+    print('fast backend: {0}'.format('orjson' if orjson else 'none'))
+
+    run('user', fake_user(args.messages), [
+        ('response.json()', decode_response_json),
+        ('json_stream.loads', decode_loads),
+        ('streaming', decode_streaming_object),
+    ])
+
+    run('tasks', fake_tasks(args.tasks, args.history), [
+        ('response.json()', decode_response_json),
+        ('json_stream.loads', decode_loads),
+        ('streaming', decode_streaming_array),
+    ])
+
+
+if __name__ == '__main__':
+    main()
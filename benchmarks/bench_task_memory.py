@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+""" Benchmarks the memory used by the Habitica side of a task sync.
+
+Loads a large list of todos the way `HabiticaTaskService.get_all_tasks` does,
+and indexes them by ID the way `TaskSync` does. The current compact records
+(`__slots__` and only `HabiticaTask.SYNC_FIELDS`) are compared against
+dictionary-backed records that keep every field apart from the history.
+Peak and retained memory are measured with tracemalloc.
+
+Usage::
+
+    python benchmarks/bench_task_memory.py [--tasks N]
+"""
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals)
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+import uuid
+
+from scriptabit import HabiticaTask
+
+
+class DictTask(object):
+    """ A dictionary-backed task record, keeping all but the history """
+    def __init__(self, task_dict):
+        self.task_dict = task_dict
+        self.status = None
+        self.existing_checklist_items = task_dict.pop('checklist', [])
+        self.new_checklist_items = []
+
+    @property
+    def id(self):
+        return self.task_dict['_id']
+
+
+def fake_todo(i):
+    """ A todo as returned by the Habitica API, encoded as JSON """
+    _id = str(uuid.uuid4())
+    return json.dumps({
+        '_id': _id,
+        'id': _id,
+        'userId': 'f0e9c6a2-2a7b-4c6e-9b7e-5f1d1d1c8f11',
+        'type': 'todo',
+        'text': 'Trello card number {0}'.format(i),
+        'notes': 'Some notes about card {0} '.format(i) * 3,
+        'tags': [str(uuid.uuid4()), str(uuid.uuid4())],
+        'value': -1.5 + i % 7,
+        'priority': 1.5,
+        'attribute': 'str',
+        'completed': False,
+        'collapseChecklist': False,
+        'checklist': [
+            {'id': str(uuid.uuid4()), 'text': 'item', 'completed': False},
+        ],
+        'reminders': [],
+        'challenge': {},
+        'group': {
+            'approval': {
+                'required': False, 'approved': False, 'requested': False},
+            'assignedUsers': [],
+            'sharedCompletion': 'recurringCompletion'},
+        'byHabitica': False,
+        'createdAt': '2017-01-30T10:11:12.000Z',
+        'updatedAt': '2017-02-01T09:10:11.000Z',
+        'date': '2017-03-01T00:00:00.000Z',
+        'history': [],
+    })
+
+
+def load_dict_tasks(raw):
+    """ The previous load: full dictionaries, without the history """
+    tasks = []
+    for r in raw:
+        task = json.loads(r)
+        task.pop('history', None)
+        tasks.append(DictTask(task))
+    return tasks
+
+
+def load_compact_tasks(raw):
+    """ The current load: only the sync fields, in slotted records """
+    fields = HabiticaTask.SYNC_FIELDS
+    tasks = []
+    for r in raw:
+        task = json.loads(r)
+        tasks.append(HabiticaTask({k: task[k] for k in fields if k in task}))
+    return tasks
+
+
+def measure(name, load, raw):
+    """ Measures the time, peak, and retained memory of a load """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tasks = load(raw)
+    index = {t.id: t for t in tasks}
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks, index
+
+    print('  {0:<10} {1:8.1f} ms {2:8.1f} MiB peak {3:8.1f} MiB retained'
+          .format(name, elapsed * 1000, peak / 2**20, current / 2**20))
+
+
+def main():
+    """ Runs the benchmark """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=50000)
+    args = parser.parse_args()
+
+    raw = [fake_todo(i) for i in range(args.tasks)]
+    print('{0} tasks'.format(args.tasks))
+    measure('dict', load_dict_tasks, raw)
+    measure('compact', load_compact_tasks, raw)
+
+
+if __name__ == '__main__':
+    main()
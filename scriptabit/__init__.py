@@ -5,17 +5,26 @@
 """
 
 from .authentication import load_habitica_authentication_credentials
+from .bulk import BulkResult, BulkRunner
+from .circuit_breaker import CircuitBreaker, CircuitState
 from .configuration import (
     get_configuration,
     get_config_file,
+    get_habitica_timeouts,
     copy_default_config_to_user_directory,
 )
 from .dates import parse_date_utc, parse_date_local
 from .errors import *
-from .habitica_service import HabiticaService, HabiticaTaskTypes
+from .habitica_service import (
+    HEAVY_TASK_FIELDS,
+    EndpointCategory,
+    HabiticaService,
+    HabiticaTaskTypes,
+)
 from .habitica_task import HabiticaTask
 from .habitica_task_service import HabiticaTaskService
 from .iplugin import IPlugin
+from .rate_limit import RateLimit
 from .scriptabit import (
     start_scriptabit,
     start_banking,
@@ -35,7 +44,7 @@ from .task import (
 )
 from .task_map import TaskMap
 from .task_service import TaskService
-from .task_sync import TaskSync
+from .task_sync import SyncPlan, TaskSync
 from .utility_functions import UtilityFunctions
 
 from .metadata import __author__, __email__, __version__
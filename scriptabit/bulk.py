@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+""" Bulk operations over many Habitica objects.
+
+`BulkRunner` applies a single-object operation, such as deleting a task, to a
+list of objects using a bounded number of concurrent requests. Progress is
+logged as the operation runs. The objects that have not yet been processed
+can be saved to a file, so that an interrupted operation can be resumed.
+"""
+
+# Ensure backwards compatibility with Python 2
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals)
+from builtins import *
+
+import json
+import logging
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+
+class BulkResult(object):
+    """ Summary of a bulk operation.
+
+    Attributes:
+        done (int): The number of objects that were processed.
+        failed (list): The (object, exception) pairs for the objects that
+            could not be processed.
+    """
+    def __init__(self):
+        self.done = 0
+        self.failed = []
+
+
+class BulkRunner(object):
+    """ Applies an operation to many objects with bounded concurrency.
+
+    The operation is retried when the API rate limit is exceeded. By
+    default, objects that no longer exist (a 404 response) are counted as
+    done, so an interrupted delete can be safely resumed. Operations that are
+    not idempotent should count a 404 as a failure instead.
+    """
+    def __init__(
+            self,
+            operation,
+            max_workers=4,
+            pending_file=None,
+            description='objects',
+            progress_interval=25,
+            max_retries=3,
+            not_found_is_done=True):
+        """ Initialise the runner.
+
+        Args:
+            operation (callable): The operation, called with each object.
+                Operations are called concurrently, so must be thread-safe.
+            max_workers (int): The maximum number of concurrent operations.
+            pending_file (str): Optional file used to record the objects that
+                are still pending.
+            description (str): Description of the objects, for log messages.
+            progress_interval (int): Progress is logged, and the pending file
+                saved, every time this many objects have been processed.
+            max_retries (int): The maximum number of retries for an object
+                after the rate limit is exceeded.
+            not_found_is_done (bool): If True, a 404 response counts as
+                success, otherwise it is a failure.
+        """
+        self.__operation = operation
+        self.__max_workers = max(1, max_workers)
+        self.__pending_file = pending_file
+        self.__description = description
+        self.__progress_interval = max(1, progress_interval)
+        self.__max_retries = max_retries
+        self.__not_found_is_done = not_found_is_done
+
+    @staticmethod
+    def load_pending(pending_file):
+        """ Loads the pending objects saved by an interrupted operation.
+
+        Args:
+            pending_file (str): The pending file.
+
+        Returns:
+            list: The pending objects, or an empty list if there are none.
+        """
+        try:
+            with open(pending_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            if pending_file and os.path.exists(pending_file):
+                logging.getLogger(__name__).warning(e)
+            return []
+
+    def __save_pending(self, pending):
+        """ Saves the pending objects, removing the file when there are
+        none.
+        """
+        if not self.__pending_file:
+            return
+
+        if not pending:
+            if os.path.exists(self.__pending_file):
+                os.remove(self.__pending_file)
+            return
+
+        with open(self.__pending_file, 'w') as f:
+            if sys.version_info < (3, 0):
+                x = json.dumps(pending, encoding='UTF-8', ensure_ascii=False)
+            else:
+                x = json.dumps(pending, ensure_ascii=False)
+
+            f.write(x)
+
+    def __apply(self, obj):
+        """ Applies the operation to an object, with retries when the rate
+        limit is exceeded.
+
+        Returns:
+            Exception: The exception, or None on success.
+        """
+        for attempt in range(self.__max_retries + 1):
+            try:
+                self.__operation(obj)
+                return None
+            except requests.exceptions.HTTPError as ex:
+                status = ex.response.status_code \
+                    if ex.response is not None else None
+                if status == requests.codes.not_found and \
+                        self.__not_found_is_done:
+                    return None
+                if status != requests.codes.too_many_requests or \
+                        attempt == self.__max_retries:
+                    return ex
+                # the service waits out the rate limit on the next request
+                logging.getLogger(__name__).debug('Retrying %s', obj)
+            except Exception as ex:
+                return ex
+
+    def run(self, objects):
+        """ Runs the operation.
+
+        Args:
+            objects (list): The objects.
+
+        Returns:
+            BulkResult: The operation summary.
+        """
+        result = BulkResult()
+        total = len(objects)
+        pending = dict(enumerate(objects))
+        self.__save_pending(objects)
+
+        def complete(index, error):
+            """ Records a completed operation """
+            obj = pending[index]
+            if error:
+                logging.getLogger(__name__).error(
+                    'Failed to process %s: %s', obj, error)
+                result.failed.append((obj, error))
+            else:
+                del pending[index]
+                result.done += 1
+
+            processed = result.done + len(result.failed)
+            if processed % self.__progress_interval == 0 or processed == total:
+                logging.getLogger(__name__).info(
+                    'Processed %d of %d %s (%d%%)',
+                    processed,
+                    total,
+                    self.__description,
+                    100 * processed // total)
+                self.__save_pending(list(pending.values()))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+                futures = {}
+                for index, obj in enumerate(objects):
+                    futures[executor.submit(self.__apply, obj)] = index
+
+                    # bound the number of queued operations
+                    if len(futures) >= 2 * self.__max_workers:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            complete(futures.pop(future), future.result())
+
+                for future in list(futures):
+                    complete(futures.pop(future), future.result())
+        finally:
+            self.__save_pending(list(pending.values()))
+
+        return result
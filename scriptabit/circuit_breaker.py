@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+""" Circuit breaker for remote service calls.
+
+The breaker starts *closed*, and all calls are allowed. After a number of
+consecutive failures the breaker *opens*, and calls fail fast without touching
+the network. Once the reset timeout has elapsed the breaker becomes
+*half-open*, and a single probe call is allowed through. A successful probe
+closes the breaker, while a failed probe opens it again for another reset
+period.
+"""
+
+# Ensure backwards compatibility with Python 2
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals)
+from builtins import *
+
+import logging
+import threading
+import time
+from enum import Enum
+
+
+class CircuitState(Enum):
+    """ Circuit breaker states """
+    closed = 'closed'
+    open = 'open'
+    half_open = 'half_open'
+
+
+class CircuitBreaker(object):
+    """ Thread-safe circuit breaker.
+
+    Attributes:
+        failure_threshold (int): Number of consecutive failures that will open
+            the circuit.
+        reset_timeout (float): Seconds to wait in the open state before a
+            probe call is allowed.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=60, clock=None):
+        """ Initialise the circuit breaker.
+
+        Args:
+            failure_threshold (int): Number of consecutive failures that will
+                open the circuit. Values < 1 disable the breaker.
+            reset_timeout (float): Seconds to wait in the open state before a
+                probe call is allowed.
+            clock (callable): Optional time source returning seconds. Defaults
+                to `time.time`.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.__clock = clock or time.time
+        self.__lock = threading.Lock()
+        self.__failures = 0
+        self.__opened_at = None
+        self.__probing = False
+
+    @property
+    def enabled(self):
+        """ Returns True if the breaker is enabled. """
+        return self.failure_threshold > 0
+
+    @property
+    def failures(self):
+        """ The current count of consecutive failures. """
+        return self.__failures
+
+    @property
+    def state(self):
+        """ The current circuit state.
+
+        Returns:
+            CircuitState: The state.
+        """
+        with self.__lock:
+            return self.__get_state()
+
+    @property
+    def is_open(self):
+        """ Returns True if calls will currently fail fast.
+
+        A half-open circuit is not reported as open, since the next call will
+        be allowed through as a probe.
+        """
+        return self.state == CircuitState.open
+
+    def seconds_until_retry(self):
+        """ Gets the time remaining before an open circuit goes half-open.
+
+        Returns:
+            float: Seconds until a probe call is allowed, or 0 if calls are
+            currently allowed.
+        """
+        with self.__lock:
+            if self.__opened_at is None:
+                return 0
+            elapsed = self.__clock() - self.__opened_at
+            return max(0, self.reset_timeout - elapsed)
+
+    def __get_state(self):
+        """ Gets the state. The lock must be held by the caller. """
+        if self.__opened_at is None:
+            return CircuitState.closed
+        if self.__clock() - self.__opened_at >= self.reset_timeout:
+            return CircuitState.half_open
+        return CircuitState.open
+
+    def allow_request(self):
+        """ Checks whether a call may proceed.
+
+        In the half-open state only a single probe call is allowed until its
+        outcome is recorded.
+
+        Returns:
+            bool: True if the call may proceed, otherwise False.
+        """
+        if not self.enabled:
+            return True
+
+        with self.__lock:
+            state = self.__get_state()
+            if state == CircuitState.closed:
+                return True
+            if state == CircuitState.half_open and not self.__probing:
+                self.__probing = True
+                return True
+            return False
+
+    def record_success(self):
+        """ Records a successful call, closing the circuit. """
+        with self.__lock:
+            if self.__opened_at is not None:
+                logging.getLogger(__name__).info('Circuit closed')
+            self.__failures = 0
+            self.__opened_at = None
+            self.__probing = False
+
+    def record_failure(self):
+        """ Records a failed call, opening the circuit if the failure
+        threshold has been reached or a probe call failed.
+        """
+        if not self.enabled:
+            return
+
+        with self.__lock:
+            self.__failures += 1
+            if self.__probing or self.__failures >= self.failure_threshold:
+                if self.__opened_at is None or self.__probing:
+                    logging.getLogger(__name__).warning(
+                        'Circuit opened after %d consecutive failures. '
+                        'Retrying in %s seconds',
+                        self.__failures,
+                        self.reset_timeout)
+                self.__opened_at = self.__clock()
+                self.__probing = False
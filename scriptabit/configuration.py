@@ -17,6 +17,8 @@ from string import Template
 import configargparse
 from pkg_resources import Requirement, resource_filename
 
+from .habitica_service import EndpointCategory, HabiticaService
+
 
 def __add_min_max_value(
         parser,
@@ -63,6 +65,71 @@ def __add_min_max_value(
         required=False,
         help=help_template.substitute(mmi='initial', name=basename))
 
+def __timeout(value):
+    """ Parses a timeout option. The value is either a single read timeout, or
+    a comma-separated connect and read timeout pair.
+
+    Args:
+        value (str): The option value, for example '10' or '3.05,10'.
+
+    Returns:
+        tuple: The (connect, read) timeouts. The connect timeout is None if it
+        was not specified.
+    """
+    parts = [float(v) for v in str(value).split(',')]
+    if len(parts) == 1:
+        return None, parts[0]
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    raise ValueError('Invalid timeout: {0}'.format(value))
+
+def __field_ttls(value):
+    """ Parses a comma-separated list of field=seconds pairs.
+
+    Args:
+        value (str): The option value, for example 'stats=5,items=60'.
+
+    Returns:
+        dict: Mapping of field name to time to live in seconds.
+    """
+    ttls = {}
+    for pair in str(value).split(','):
+        if pair.strip():
+            field, seconds = pair.split('=')
+            ttls[field.strip()] = float(seconds)
+    return ttls
+
+def get_habitica_timeouts(config):
+    """ Builds the HabiticaService timeouts from the configuration.
+
+    Category timeouts override the read timeout for that category, and
+    optionally the connect timeout. Categories without an override use the
+    `HabiticaService.DEFAULT_TIMEOUTS` read timeout unless a global
+    `--read-timeout` is specified. The status check is kept short, so the
+    global read timeout never applies to it; only `--status-timeout` changes
+    the status read timeout.
+
+    Args:
+        config: The configuration returned by `get_configuration`.
+
+    Returns:
+        dict: Mapping of `EndpointCategory` to (connect, read) timeouts.
+    """
+    timeouts = {}
+    for category in EndpointCategory:
+        connect, read = HabiticaService.DEFAULT_TIMEOUTS[category]
+        connect = config.connect_timeout or connect
+        if category != EndpointCategory.status:
+            read = config.read_timeout or read
+
+        override = getattr(config, '{0}_timeout'.format(category.value))
+        if override:
+            connect = override[0] or connect
+            read = override[1]
+
+        timeouts[category] = (connect, read)
+    return timeouts
+
 def get_config_file(basename):
     """ Looks for a configuration file in 3 locations:
 
@@ -175,6 +242,73 @@ credentials''')
         default='https://habitica.com/api/v3/',
         help='''The base Habitica API URL''')
 
+    # Habitica API circuit breaker
+    parser.add(
+        '--circuit-breaker-failures',
+        required=False,
+        type=int,
+        default=5,
+        help='''Number of consecutive Habitica API failures before further
+calls fail fast. Set to 0 to disable the circuit breaker.''')
+
+    parser.add(
+        '--circuit-breaker-reset',
+        required=False,
+        type=float,
+        default=60,
+        help='''Seconds to wait after the Habitica API circuit breaker opens
+before the next probe call is allowed.''')
+
+    parser.add(
+        '--stream-responses',
+        required=False,
+        action='store_true',
+        help='''Decode large Habitica API responses incrementally. This reduces
+peak memory use for accounts with large user documents or task histories.''')
+
+    parser.add(
+        '--user-cache-ttls',
+        required=False,
+        type=__field_ttls,
+        default='stats=5,items=60',
+        metavar='FIELD=SECONDS[,...]',
+        help='''Comma-separated list of user document fields and the number of
+seconds that each is cached for. Fields that are not listed are not
+cached.''')
+
+    # Habitica API timeouts
+    parser.add(
+        '--connect-timeout',
+        required=False,
+        type=float,
+        default=0,
+        help='''Habitica API connection timeout in seconds. If 0, the built-in
+default is used.''')
+
+    parser.add(
+        '--read-timeout',
+        required=False,
+        type=float,
+        default=0,
+        help='''Habitica API read timeout in seconds, for endpoint categories
+without a specific timeout. If 0, the built-in category defaults are used.
+Does not apply to the server status check, see --status-timeout.''')
+
+    for category, help_text in [
+            ('status', 'the server status check'),
+            ('reads', 'ordinary reads'),
+            ('writes', 'task and user updates'),
+            ('bulk', 'bulk reads and writes, such as completed todos')]:
+        parser.add(
+            '--{0}-timeout'.format(category),
+            required=False,
+            type=__timeout,
+            default=None,
+            metavar='[CONNECT,]READ',
+            help='''Habitica API timeout in seconds for {0}. Either a read
+timeout, or a comma-separated connect and read timeout pair.'''.format(
+    help_text))
+
     # plugins
     parser.add(
         '-r',
@@ -10,11 +10,57 @@ from __future__ import (
     unicode_literals)
 from builtins import *
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import iso8601
 import pytz
 from tzlocal import get_localzone
 
+# The Unix epoch
+_EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+
+# Memo of recently parsed date strings. Habitica repeats the same timestamps
+# across tasks and responses, such as the last modified and creation dates.
+_CACHE = {}
+_CACHE_SIZE = 4096
+
+# The stdlib ISO 8601 parser, where available (Python 3.7+). Before Python 3.11
+# it only accepts the formats written by datetime.isoformat, so anything it
+# rejects falls back to iso8601.
+_fromisoformat = getattr(datetime, 'fromisoformat', None)
+
+
+def __parse_epoch(value, milliseconds):
+    """ Converts an epoch time to a UTC datetime. """
+    if milliseconds:
+        return _EPOCH + timedelta(milliseconds=value)
+    return _EPOCH + timedelta(seconds=value)
+
+
+def __parse_string(date, milliseconds):
+    """ Parses a date string without using the memo. """
+    # Epoch times are detected directly rather than by a failed ISO parse.
+    # Digit strings of length 4 and 8 are ISO 8601 years and basic dates.
+    if date.isdigit() and len(date) not in (4, 8):
+        return __parse_epoch(int(date), milliseconds)
+
+    parsed_date = None
+    if _fromisoformat:
+        try:
+            # Habitica dates end in Z, which is only accepted from Python 3.11
+            parsed_date = _fromisoformat(
+                date[:-1] if date.endswith('Z') else date)
+        except ValueError:
+            pass
+
+    if parsed_date is None:
+        try:
+            parsed_date = iso8601.parse_date(date)
+        except iso8601.ParseError:
+            return __parse_epoch(int(date), milliseconds)
+
+    return parsed_date.replace(tzinfo=pytz.utc)
+
+
 def parse_date_utc(date, milliseconds=True):
     """Parses dates from ISO8601 or Epoch formats to a standard datetime object.
 
@@ -24,26 +70,29 @@ def parse_date_utc(date, milliseconds=True):
         - iso8601 encoded strings
         - Long integer Epoch times
 
+    Recently parsed strings are remembered, as the same dates are often
+    parsed many times.
+
     Args:
-        date (str): A date string in either iso8601 or Epoch format.
+        date (str): A date string in either iso8601 or Epoch format. Epoch
+            times can also be given as a number.
         milliseconds (bool): If True, then epoch times are treated as
             millisecond values, otherwise they are evaluated as seconds.
 
     Returns:
         datetime: The parsed date time in UTC.
     """
+    if isinstance(date, (int, float)):
+        return __parse_epoch(date, milliseconds)
 
-    parsed_date = None
-    try:
-        parsed_date = iso8601.parse_date(date)
-    except iso8601.ParseError:
-        value = int(date)
-        # utcfromtimestamp expects values in seconds
-        if milliseconds:
-            value /= 1000
-        parsed_date = datetime.utcfromtimestamp(value)
-
-    return parsed_date.replace(tzinfo=pytz.utc)
+    key = (date, milliseconds)
+    parsed_date = _CACHE.get(key)
+    if parsed_date is None:
+        parsed_date = __parse_string(date, milliseconds)
+        if len(_CACHE) >= _CACHE_SIZE:
+            _CACHE.clear()
+        _CACHE[key] = parsed_date
+    return parsed_date
 
 def parse_date_local(date, milliseconds=True):
     """Parses dates from ISO8601 or Epoch formats to a standard datetime object
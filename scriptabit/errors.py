@@ -69,3 +69,17 @@ class NotFoundError(Exception):
 
     def __str__(self):
         return repr(self.value)
+
+
+class CircuitOpenError(ServerUnreachableError):
+    """The circuit breaker is open, so the Habitica server was not called"""
+
+
+class TaskFetchError(Exception):
+    """Tasks could not be fetched from a synchronisation task service"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
@@ -11,11 +11,16 @@ from __future__ import (
 from builtins import *
 
 import logging
+import time
 from enum import Enum
 
 import requests
 
+from .circuit_breaker import CircuitBreaker
+from .dates import parse_date_utc
 from .errors import *
+from .json_stream import iter_array_items, iter_object_items, loads
+from .rate_limit import RateLimit
 
 
 class HabiticaTaskTypes(Enum):
@@ -25,6 +30,25 @@ class HabiticaTaskTypes(Enum):
     todos = 'todos'
     rewards = 'rewards'
     completed_todos = 'completedTodos'
+    all_completed_todos = '_allCompletedTodos'
+
+# Task fields that are large and rarely needed, such as the scoring history of
+# habits and dailies.
+HEAVY_TASK_FIELDS = ('history',)
+
+class EndpointCategory(Enum):
+    """ Habitica API endpoint categories, used to select request timeouts.
+
+    *status*: the server status check, which should fail fast.
+    *reads*: ordinary GET requests.
+    *writes*: requests that create, update, or delete data.
+    *bulk*: large reads and writes, such as completed todos or multiple task
+    creation.
+    """
+    status = 'status'
+    reads = 'reads'
+    writes = 'writes'
+    bulk = 'bulk'
 
 class SpellIDs(Enum):
     """ Spell/skill codes for casting.
@@ -72,55 +96,168 @@ class SpellIDs(Enum):
 
 class HabiticaService(object):
     """ Habitica API service interface. """
-    def __init__(self, headers, base_url):
+
+    # Default (connect, read) timeouts in seconds for each endpoint category
+    DEFAULT_TIMEOUTS = {
+        EndpointCategory.status: (3.05, 5),
+        EndpointCategory.reads: (3.05, 10),
+        EndpointCategory.writes: (3.05, 10),
+        EndpointCategory.bulk: (3.05, 60),
+    }
+
+    # Number of bytes read at a time when streaming responses
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+            self,
+            headers,
+            base_url,
+            circuit_breaker=None,
+            timeouts=None,
+            streaming=False,
+            user_cache_ttls=None,
+            rate_limit=None):
         """
         Args:
             headers (dict): HTTP headers.
             base_url (str): The base URL for requests.
+            circuit_breaker (CircuitBreaker): Optional circuit breaker. If
+                supplied, calls fail fast with `CircuitOpenError` while the
+                circuit is open.
+            timeouts (dict): Optional mapping of `EndpointCategory` to
+                (connect, read) timeout tuples in seconds. Categories that are
+                not present use `HabiticaService.DEFAULT_TIMEOUTS`.
+            streaming (bool): If True, large user and task responses are
+                decoded incrementally as they are received, which reduces
+                peak memory use at some cost in decoding speed.
+            user_cache_ttls (dict): Optional mapping of user document field
+                names (such as 'stats' or 'items') to the number of seconds
+                that field is cached by `get_user_fields`. Fields that are not
+                present are not cached.
+            rate_limit (RateLimit): Optional rate limit tracker. If the API
+                rate limit is exhausted, requests wait until it resets.
             """
         self.__headers = headers
         self.__base_url = base_url
-        self.__timeout = 10  # allow 10 seconds before timing out API calls
+        self.__timeouts = dict(self.DEFAULT_TIMEOUTS)
+        self.__timeouts.update(timeouts or {})
+        self.__streaming = streaming
+        self.__user_cache_ttls = dict(user_cache_ttls or {})
+        self.__user_cache = {}  # field -> (timestamp, value)
+        self.__breaker = circuit_breaker or CircuitBreaker(failure_threshold=0)
+        self.__rate_limit = rate_limit or RateLimit()
+
+    @property
+    def circuit_breaker(self):
+        """ Gets the circuit breaker. """
+        return self.__breaker
+
+    @property
+    def circuit_state(self):
+        """ Gets the current circuit breaker state.
 
-    def __delete(self, command, params=None):
-        """Utility wrapper around a HTTP DELETE"""
-        url = self.__base_url + command
-        logging.getLogger(__name__).debug('DELETE %s', url)
-        return requests.delete(
-            url,
-            params=params,
-            headers=self.__headers,
-            timeout=self.__timeout)
+        Returns:
+            CircuitState: The circuit state.
+        """
+        return self.__breaker.state
 
-    def __get(self, command, params=None):
-        """Utility wrapper around a HTTP GET"""
+    @property
+    def rate_limit(self):
+        """ Gets the API rate limit tracker.
+
+        Returns:
+            RateLimit: The rate limit tracker.
+        """
+        return self.__rate_limit
+
+    def get_timeout(self, category):
+        """ Gets the request timeout for an endpoint category.
+
+        Args:
+            category (EndpointCategory): The endpoint category.
+
+        Returns:
+            tuple: The (connect, read) timeouts in seconds.
+        """
+        return self.__timeouts[category]
+
+    def __request(self, method, command, category, **kwargs):
+        """Utility wrapper around all HTTP requests.
+
+        Connection errors, timeouts, any other exception raised by the
+        request, and server errors (5xx) are counted as failures by the
+        circuit breaker. If the API rate limit is exhausted, the request
+        waits until the limit resets.
+
+        Raises:
+            CircuitOpenError: The circuit is open.
+        """
         url = self.__base_url + command
-        logging.getLogger(__name__).debug('GET %s', url)
-        return requests.get(
-            url,
+        logging.getLogger(__name__).debug('%s %s', method, url)
+
+        if not self.__breaker.allow_request():
+            raise CircuitOpenError(
+                'Habitica API circuit is open, retry in {0:.0f} seconds'.format(
+                    self.__breaker.seconds_until_retry()))
+
+        delay = self.__rate_limit.acquire()
+        if delay > 0:
+            logging.getLogger(__name__).info(
+                'Rate limit reached, waiting %.1f seconds', delay)
+            time.sleep(delay)
+
+        response = None
+        try:
+            response = requests.request(
+                method,
+                url,
+                headers=self.__headers,
+                timeout=self.get_timeout(category),
+                **kwargs)
+            self.__rate_limit.update(response.headers, response.status_code)
+        finally:
+            # always record an outcome, so that a half-open probe is closed
+            if response is None or response.status_code >= 500:
+                self.__breaker.record_failure()
+            else:
+                self.__breaker.record_success()
+        return response
+
+    def __delete(self, command, params=None, category=EndpointCategory.writes):
+        """Utility wrapper around a HTTP DELETE"""
+        return self.__request('DELETE', command, category, params=params)
+
+    def __get(
+            self,
+            command,
+            params=None,
+            category=EndpointCategory.reads,
+            stream=False):
+        """Utility wrapper around a HTTP GET"""
+        return self.__request(
+            'GET',
+            command,
+            category,
             params=params,
-            headers=self.__headers,
-            timeout=self.__timeout)
+            stream=stream)
 
-    def __put(self, command, data):
+    def __put(self, command, data, category=EndpointCategory.writes):
         """Utility wrapper around a HTTP PUT"""
-        url = self.__base_url + command
-        logging.getLogger(__name__).debug('PUT %s', url)
-        return requests.put(
-            url,
-            headers=self.__headers,
-            data=data,
-            timeout=self.__timeout)
-
-    def __post(self, command, data=None):
+        return self.__request('PUT', command, category, data=data)
+
+    def __post(
+            self,
+            command,
+            data=None,
+            category=EndpointCategory.writes,
+            params=None):
         """Utility wrapper around a HTTP POST"""
-        url = self.__base_url + command
-        logging.getLogger(__name__).debug('PUT %s', url)
-        return requests.post(
-            url,
-            headers=self.__headers,
+        return self.__request(
+            'POST',
+            command,
+            category,
             json=data,
-            timeout=self.__timeout)
+            params=params)
 
     @staticmethod
     def __get_key(task):
@@ -149,43 +286,267 @@ class HabiticaService(object):
         Returns:
             bool: `True` if the server is reachable, otherwise `False`.
         """
-        response = self.__get('status')
+        response = self.__get('status', category=EndpointCategory.status)
         if response.status_code == requests.codes.ok:
-            return response.json()['data']['status'] == 'up'
+            return loads(response.content)['data']['status'] == 'up'
         return False
 
-    def get_user(self):
+    def get_user(self, user_fields=None):
         """Gets the authenticated user data.
 
+        Args:
+            user_fields (list): Optional list of top-level user fields to
+                fetch, such as 'stats' or 'items'. If not specified, the
+                entire user document is returned.
+
         Returns:
             dict: The user data.
         """
-        response = self.__get('user')
+        params = {'userFields': ','.join(user_fields)} if user_fields else None
+
+        if self.__streaming:
+            response = self.__get('user', params, stream=True)
+            try:
+                response.raise_for_status()
+                return dict(iter_object_items(response.iter_content(
+                    self.STREAM_CHUNK_SIZE)))
+            finally:
+                response.close()
+
+        response = self.__get('user', params)
         response.raise_for_status()
-        return response.json()['data']
+        return loads(response.content)['data']
+
+    def get_user_fields(self, *fields, **kwargs):
+        """Gets selected top-level fields of the authenticated user document.
+
+        Fields are served from the cache while they are younger than their
+        time to live. Any missing or stale fields are fetched together in a
+        single request.
+
+        Args:
+            fields (str): The user fields, such as 'stats' or 'items'.
+            max_age (float): Optional keyword argument that overrides the
+                cache time to live (in seconds) for this call. Use 0 to force
+                a fetch.
+
+        Returns:
+            dict: The requested user fields.
+        """
+        max_age = kwargs.pop('max_age', None)
+        now = time.time()
+        result = {}
+        stale = []
+        for field in fields:
+            ttl = self.__user_cache_ttls.get(field, 0) \
+                if max_age is None else max_age
+            cached = self.__user_cache.get(field, None)
+            if cached and ttl > 0 and now - cached[0] < ttl:
+                result[field] = cached[1]
+            else:
+                stale.append(field)
+
+        if stale:
+            user = self.get_user(user_fields=stale)
+            for field in stale:
+                value = user.get(field, None)
+                self.__cache_user_field(field, value, now)
+                result[field] = value
+
+        return result
+
+    def __cache_user_field(self, field, value, timestamp=None):
+        """ Caches a user field, if caching is enabled for that field. """
+        if self.__user_cache_ttls.get(field, 0) > 0:
+            self.__user_cache[field] = (timestamp or time.time(), value)
+
+    def invalidate_user_cache(self, *fields):
+        """ Invalidates cached user fields.
 
-    def get_stats(self):
+        Args:
+            fields (str): The fields to invalidate. If none are specified,
+                the entire cache is invalidated.
+        """
+        if not fields:
+            self.__user_cache.clear()
+        for field in fields:
+            self.__user_cache.pop(field, None)
+
+    def get_stats(self, max_age=None):
         """Gets the authenticated user stats.
 
+        Args:
+            max_age (float): Optional override of the cache time to live for
+                the stats, in seconds.
+
         Returns:
             dict: The stats.
         """
-        return self.get_user()['stats']
+        return self.get_user_fields('stats', max_age=max_age)['stats']
+
+    def __put_stats(self, stats):
+        """ Updates user stats, refreshing the stats cache from the response.
 
-    def get_tasks(self, task_type=None):
+        Args:
+            stats (dict): The stats update, keyed by 'stats.<name>'.
+
+        Returns:
+            dict: The new stats.
+        """
+        response = self.__put('user', stats)
+        response.raise_for_status()
+        new_stats = loads(response.content)['data']['stats']
+        self.__cache_user_field('stats', new_stats)
+        return new_stats
+
+    @staticmethod
+    def __select_tasks(
+            tasks,
+            tags=None,
+            include_challenges=True,
+            updated_since=None,
+            fields=None,
+            exclude_fields=None):
+        """ Filters and projects raw task dictionaries on the client.
+
+        Args:
+            tasks: Iterable of task dictionaries.
+            tags, include_challenges, updated_since, fields, exclude_fields:
+                See `HabiticaService.get_tasks`.
+
+        Yields:
+            dict: The selected tasks.
+        """
+        tags = set(tags) if tags else None
+        for task in tasks:
+            if tags and tags.isdisjoint(task.get('tags', ())):
+                continue
+
+            if not include_challenges and \
+                    'id' in task.get('challenge', {}):
+                continue
+
+            if updated_since:
+                updated = task.get('updatedAt', None)
+                if not updated or parse_date_utc(updated) < updated_since:
+                    continue
+
+            if fields:
+                task = {k: task[k] for k in fields if k in task}
+            elif exclude_fields:
+                for k in exclude_fields:
+                    task.pop(k, None)
+
+            yield task
+
+    def get_tasks(
+            self,
+            task_type=None,
+            tags=None,
+            include_challenges=True,
+            updated_since=None,
+            fields=None,
+            exclude_fields=None):
         """Gets all tasks for the current user.
 
+        Only `task_type` is sent to the server. The Habitica API has no
+        query parameters for the other options, so they are local filters:
+        every task of the requested type is still downloaded, and the
+        response is filtered and projected as it is processed. They reduce
+        the memory held by the caller, not the data transferred.
+
         Args:
             task_type (HabiticaTaskTypes): The type of task to get.
                 Default is all tasks apart from completed todos.
+            tags (list): Local filter. If specified, only tasks with at least
+                one of these tag IDs are returned.
+            include_challenges (bool): Local filter. If False, challenge tasks
+                are excluded.
+            updated_since (datetime): Local filter. If specified, only tasks
+                updated at or after this time are returned.
+            fields (list): If specified, each task is projected locally to
+                only these fields.
+            exclude_fields (list): Fields to drop locally from each task, such
+                as `HEAVY_TASK_FIELDS`. Ignored if `fields` is specified.
 
         Returns:
-            dict: The tasks.
+            list: The tasks.
         """
+        query = {
+            'tags': tags,
+            'include_challenges': include_challenges,
+            'updated_since': updated_since,
+            'fields': fields,
+            'exclude_fields': exclude_fields,
+        }
+
+        if self.__streaming:
+            return list(self.iter_tasks(task_type, **query))
+
         params = {'type': task_type.value} if task_type else {}
-        response = self.__get('tasks/user', params)
+        category = EndpointCategory.bulk \
+            if task_type in (HabiticaTaskTypes.completed_todos,
+                             HabiticaTaskTypes.all_completed_todos) \
+            else EndpointCategory.reads
+        response = self.__get('tasks/user', params, category=category)
         response.raise_for_status()
-        return response.json()['data']
+        return list(self.__select_tasks(
+            loads(response.content)['data'],
+            **query))
+
+    def iter_tasks(
+            self,
+            task_type=None,
+            chunk_size=None,
+            **query):
+        """Iterates over the tasks for the current user.
+
+        Unlike `get_tasks`, the response is streamed and decoded one task at a
+        time, so memory use does not grow with the number of tasks.
+
+        Args:
+            task_type (HabiticaTaskTypes): The type of task to get.
+                Default is all tasks apart from completed todos.
+            chunk_size (int): The number of bytes to read from the response
+                at a time. Defaults to `HabiticaService.STREAM_CHUNK_SIZE`.
+            query: The optional local filters supported by `get_tasks`.
+
+        Yields:
+            dict: The tasks.
+        """
+        params = {'type': task_type.value} if task_type else {}
+        response = self.__get(
+            'tasks/user',
+            params,
+            category=EndpointCategory.bulk,
+            stream=True)
+        try:
+            response.raise_for_status()
+            tasks = iter_array_items(response.iter_content(
+                chunk_size or self.STREAM_CHUNK_SIZE))
+            for task in self.__select_tasks(tasks, **query):
+                yield task
+        finally:
+            response.close()
+
+    def iter_completed_todos(self, all_completed=True, **kwargs):
+        """Iterates over the completed todos for the current user.
+
+        The Habitica API does not page completed todos. They are fetched with
+        a single request, and the response is streamed and decoded one task
+        at a time by `iter_tasks`.
+
+        Args:
+            all_completed (bool): If True, all completed todos are returned,
+                otherwise only the most recent todos retained by Habitica.
+            kwargs: Optional `iter_tasks` arguments.
+
+        Returns:
+            generator: The completed todo generator.
+        """
+        task_type = HabiticaTaskTypes.all_completed_todos if all_completed \
+            else HabiticaTaskTypes.completed_todos
+        return self.iter_tasks(task_type, **kwargs)
 
     def create_task(self, task, task_type=HabiticaTaskTypes.todos):
         """ Creates a task.
@@ -211,7 +572,7 @@ class HabiticaService(object):
 
         response = self.__post('tasks/user', task)
         response.raise_for_status()
-        return response.json()['data']
+        return loads(response.content)['data']
 
     def create_tasks(self, tasks):
         """ Creates multiple tasks.
@@ -225,9 +586,12 @@ class HabiticaService(object):
         Returns:
             list: The new tasks as returned from the server.
         """
-        response = self.__post('tasks/user', tasks)
+        response = self.__post(
+            'tasks/user',
+            tasks,
+            category=EndpointCategory.bulk)
         response.raise_for_status()
-        return response.json()['data']
+        return loads(response.content)['data']
 
     def get_task(self, _id='', alias=''):
         """ Gets a task.
@@ -250,7 +614,7 @@ class HabiticaService(object):
 
         response = self.__get('tasks/{key}'.format(key=key))
         if response.status_code == requests.codes.ok:
-            return response.json()['data']
+            return loads(response.content)['data']
         else:
             return None
 
@@ -278,7 +642,7 @@ class HabiticaService(object):
         key = self.__get_key(task)
         response = self.__put('tasks/{0}'.format(key), task)
         response.raise_for_status()
-        return response.json()['data']
+        return loads(response.content)['data']
 
     def score_task(self, task, direction='up'):
         """ Score a task.
@@ -299,7 +663,8 @@ class HabiticaService(object):
             'tasks/{0}/score/{1}'.format(key, direction),
             data=None)
         response.raise_for_status()
-        return response.json()['data']
+        self.invalidate_user_cache('stats')
+        return loads(response.content)['data']
 
     def upsert_task(self, task, task_type=HabiticaTaskTypes.todos):
         """Upserts a task.
@@ -329,35 +694,60 @@ class HabiticaService(object):
             logging.getLogger(__name__).debug('task %s exists, updating', key)
             response = self.__put('tasks/{0}'.format(key), task)
             response.raise_for_status()
-            return response.json()['data']
+            return loads(response.content)['data']
         else:
             logging.getLogger(__name__).debug(
                 'task %s not found, creating', key)
             return self.create_task(task, task_type)
 
-    # I don't think the API lets me set partial user objects in this way.
-    # So I could get the entire user structure, swap the stats for the argument
-    # version, and then PUT that back. Or I can wait to see if I even need this
-    # method at all.
-    # def set_stats(self, stats):
-    # """Sets the authenticated user stats.
-    # ** Not implemented **
-    # Note that unlike the fine-grained set_[hp|mp|xp] methods,
-    # this method performs no sanity checking of values.
-
-        # Args:
-        # stats (dict): The stats to set. This can be a
-        # partial set of values.
-
-        # Returns: dictionary: The new stats, as returned by the server.
-
-        # Raises: NotImplementedError
-        # """
-        # raise NotImplementedError
-        # response = self.__put('user', {'stats': stats})
-        # if response.status_code == requests.codes.ok:
-        # return response.json()['data']['stats']
-        # return None
+    @staticmethod
+    def __check_stat(name, value):
+        """ Range checks a stat value.
+
+        Raises:
+            ArgumentOutOfRangeError: The value is out of range.
+            ValueError: Unknown stat name.
+        """
+        if name not in ('hp', 'mp', 'exp', 'gp', 'lvl'):
+            raise ValueError('Unknown stat: {0}'.format(name))
+        if name == 'hp' and value > 50:
+            raise ArgumentOutOfRangeError("hp > 50")
+        if value < 0:
+            raise ArgumentOutOfRangeError("{0} < 0".format(name))
+
+    def set_stats(self, **changes):
+        """ Sets several user stats with a single request.
+
+        Values are range checked in the same way as the individual stat
+        setters. As with `set_lvl`, XP is reset to 0 when the level is set,
+        unless a new XP value is also supplied.
+
+        Args:
+            hp (float): The new HP value.
+            mp (float): The new MP value.
+            exp (float): The new XP value.
+            gp (float): The new gold value.
+            lvl (int): The new character level.
+
+        Returns:
+            dict: The new stats, extracted from the JSON response data.
+
+        Raises:
+            ArgumentOutOfRangeError: A value is out of range.
+            ValueError: Unknown stat name, or no changes.
+        """
+        if not changes:
+            raise ValueError('No stat changes specified')
+
+        data = {}
+        for name, value in changes.items():
+            self.__check_stat(name, value)
+            data['stats.' + name] = value
+
+        if 'lvl' in changes and 'exp' not in changes:
+            data['stats.exp'] = 0
+
+        return self.__put_stats(data)
 
     def set_hp(self, hp):
         """ Sets the user's HP.
@@ -368,14 +758,7 @@ class HabiticaService(object):
         Returns:
             float: The new HP value, extracted from the JSON response data.
         """
-        if hp > 50:
-            raise ArgumentOutOfRangeError("hp > 50")
-        if hp < 0:
-            raise ArgumentOutOfRangeError("hp < 0")
-
-        response = self.__put('user', {'stats.hp': hp})
-        response.raise_for_status()
-        return response.json()['data']['stats']['hp']
+        return self.set_stats(hp=hp)['hp']
 
     def set_mp(self, mp):
         """ Sets the user's MP (mana points).
@@ -386,15 +769,7 @@ class HabiticaService(object):
         Returns:
             float: The new MP value, extracted from the JSON response data.
         """
-        # max_mp = self.get_user()['stats']['maxMP']
-        # if mp > max_mp:
-            # raise ArgumentOutOfRangeError("mp > {0}".format(max_mp))
-        if mp < 0:
-            raise ArgumentOutOfRangeError("mp < 0")
-
-        response = self.__put('user', {'stats.mp': mp})
-        response.raise_for_status()
-        return response.json()['data']['stats']['mp']
+        return self.set_stats(mp=mp)['mp']
 
     def set_exp(self, exp):
         """ Sets the user's XP (experience points).
@@ -405,12 +780,7 @@ class HabiticaService(object):
         Returns:
             float: The new XP value, extracted from the JSON response data.
         """
-        if exp < 0:
-            raise ArgumentOutOfRangeError("exp < 0")
-
-        response = self.__put('user', {'stats.exp': exp})
-        response.raise_for_status()
-        return response.json()['data']['stats']['exp']
+        return self.set_stats(exp=exp)['exp']
 
     def set_lvl(self, lvl):
         """ Sets the user's character level.
@@ -422,12 +792,7 @@ class HabiticaService(object):
         Returns:
             lvl: The new character level, extracted from the JSON response data.
         """
-        if lvl < 0:
-            raise ArgumentOutOfRangeError("lvl < 0")
-
-        response = self.__put('user', {'stats.lvl': lvl, 'stats.exp': 0})
-        response.raise_for_status()
-        return response.json()['data']['stats']['lvl']
+        return self.set_stats(lvl=lvl)['lvl']
 
     def set_gp(self, gp):
         """ Sets the user's gold (gp).
@@ -438,12 +803,7 @@ class HabiticaService(object):
         Returns:
             float: The new gold value, extracted from the response data.
         """
-        if gp < 0:
-            raise ArgumentOutOfRangeError("gp < 0")
-
-        response = self.__put('user', {'stats.gp': gp})
-        response.raise_for_status()
-        return response.json()['data']['stats']['gp']
+        return self.set_stats(gp=gp)['gp']
 
     def get_tags(self):
         """ Get the current user's tags.
@@ -453,7 +813,7 @@ class HabiticaService(object):
         """
         response = self.__get('tags')
         response.raise_for_status()
-        return response.json()['data']
+        return loads(response.content)['data']
 
     def create_tag(self, name):
         """ Create a tag.
@@ -466,7 +826,7 @@ class HabiticaService(object):
         """
         response = self.__post('tags', data={'name': name})
         response.raise_for_status()
-        return response.json()['data']
+        return loads(response.content)['data']
 
     def create_tags(self, tags):
         """ Create the tags. Existing tags are ignored.
@@ -487,6 +847,15 @@ class HabiticaService(object):
 
         return return_tags
 
+    def delete_tag(self, tag):
+        """ Delete a tag.
+
+        Args:
+            tag (dict): The tag object.
+        """
+        response = self.__delete('tags/{0}'.format(tag['id']))
+        response.raise_for_status()
+
     def delete_tags(self, tags):
         """ Delete a list of tag objects.
 
@@ -494,8 +863,7 @@ class HabiticaService(object):
             tags (list): The list of tag objects.
         """
         for t in tags:
-            response = self.__delete('tags/{0}'.format(t['id']))
-            response.raise_for_status()
+            self.delete_tag(t)
 
     def delete_checklist_item(self, task_id, item_id):
         """ Delete a checklist item.
@@ -520,19 +888,25 @@ class HabiticaService(object):
             data=item)
         response.raise_for_status()
 
-    def feed_pet(self, pet, food):
+    def feed_pet(self, pet, food, amount=1):
         """ Feed a pet.
 
         Args:
             pet (str): The pet name.
             food (str): The food.
+            amount (int): The number of pieces of food to feed. Habitica
+                doesn't consume food that would exceed the growth required
+                for a mount.
 
         Returns:
             dict: The Habitica response data.
         """
-        response = self.__post('user/feed/{0}/{1}'.format(pet, food))
+        response = self.__post(
+            'user/feed/{0}/{1}'.format(pet, food),
+            params={'amount': amount} if amount > 1 else None)
         response.raise_for_status()
-        return response.json()
+        self.invalidate_user_cache('items')
+        return loads(response.content)
 
     def hatch_pet(self, egg, potion):
         """ Hatch a pet.
@@ -546,7 +920,8 @@ class HabiticaService(object):
         """
         response = self.__post('user/hatch/{0}/{1}'.format(egg, potion))
         response.raise_for_status()
-        return response.json()
+        self.invalidate_user_cache('items')
+        return loads(response.content)
 
     def buy_armoire(self):
         """ Buy an armoire item.
@@ -556,7 +931,8 @@ class HabiticaService(object):
         """
         response = self.__post('user/buy-armoire')
         response.raise_for_status()
-        return response.json()
+        self.invalidate_user_cache('stats', 'items')
+        return loads(response.content)
 
     def cast_skill_by_raw_spell_id(self, spellId, targetId=None):
         """ Cast a skill using the raw Habitica API spell ID rather than the
@@ -575,7 +951,8 @@ class HabiticaService(object):
             request += '?targetId={0}'.format(targetId)
         response = self.__post(request)
         response.raise_for_status()
-        return response.json()
+        self.invalidate_user_cache('stats')
+        return loads(response.content)
 
     def cast_skill(self, spellId, targetId=None):
         """ Cast a skill.
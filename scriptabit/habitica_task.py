@@ -12,20 +12,51 @@ from datetime import datetime
 from tzlocal import get_localzone
 
 from .dates import parse_date_utc
-from .task import CharacterAttribute, ChecklistItem, Difficulty, Task
+from .task import (
+    CharacterAttribute,
+    ChecklistItem,
+    Difficulty,
+    SyncStatus,
+    Task)
 
 
 class HabiticaTask(Task):
     """ Defines a Habitica synchronisation task.
     """
-    def __init__(self, task_dict=None):
+
+    # The task fields used for synchronisation. Loading only these fields
+    # keeps large task lists compact.
+    SYNC_FIELDS = (
+        '_id',
+        'type',
+        'text',
+        'notes',
+        'completed',
+        'priority',
+        'attribute',
+        'date',
+        'updatedAt',
+        'checklist',
+        'challenge')
+
+    __slots__ = (
+        '__task_dict',
+        '__derived',
+        'new_checklist_items')
+
+    def __init__(self, task_dict=None, status=SyncStatus.new):
         """ Initialise the task.
 
+        The task dictionary is not modified. Defaults for the required fields
+        are applied when they are read, and when the update request data is
+        built by `update_data`.
+
         Args:
             task_dict (dict): The Habitica task dictionary, as returned by
                 HabiticaService.
+            status (SyncStatus): The initial synchronisation status.
         """
-        super().__init__()
+        super().__init__(status)
 
         if not task_dict:
             task_dict = {'text': 'scriptabit todo'}
@@ -35,34 +66,35 @@ class HabiticaTask(Task):
 
         self.__task_dict = task_dict
 
-        # ensure that some required values are defined
-        task_dict['type'] = 'todo'
+        # Values derived from raw task fields, such as parsed dates, keyed by
+        # field name. Each entry holds the raw value it was derived from, so
+        # that any write to the field invalidates it. Created on first use.
+        self.__derived = None
 
-        if 'priority' not in task_dict:
-            task_dict['priority'] = Difficulty.default.value
+        # Checklist items added by synchronisation. These need separate API
+        # calls, see `update_data`.
+        self.new_checklist_items = []
 
-        if 'attribute' not in task_dict:
-            task_dict['attribute'] = CharacterAttribute.default.value
+    def __derive(self, field, convert):
+        """ Gets a value derived from a raw task field.
 
-        # The Habitica API chokes if you attempt to update a task with a
-        # checklist in the request data. To work around this we move the
-        # checklist (if any) out of task_dict so it can be handled separately.
-        # We also need separate API calls for deleted, added, and updated
-        # checklist items items
-        self.new_checklist_items = []
-        if 'checklist' in task_dict.keys():
-            self.existing_checklist_items = task_dict['checklist']
-            del task_dict['checklist']
-        else:
-            self.existing_checklist_items = []
-
-        # April 2018: the API now complains if you update a task with the 
-        # collapsechecklist field present. Rather than sort out the reason, 
-        # I remove the field as it serves no relevant purpose.
-        try:
-            del task_dict['collapseChecklist']
-        except KeyError:
-            pass
+        The conversion is only repeated when the raw field value changes.
+
+        Args:
+            field (str): The task dictionary field.
+            convert (callable): Converts the raw value.
+
+        Returns:
+            The converted value.
+        """
+        if self.__derived is None:
+            self.__derived = {}
+        raw = self.__task_dict.get(field)
+        cached = self.__derived.get(field)
+        if cached is None or cached[0] != raw:
+            cached = (raw, convert(raw))
+            self.__derived[field] = cached
+        return cached[1]
 
     @property
     def is_challenge(self):
@@ -75,6 +107,45 @@ class HabiticaTask(Task):
         """ Gets the internal task dictionary. """
         return self.__task_dict
 
+    @property
+    def update_data(self):
+        """ Gets the task data for an update request.
+
+        This is a copy of the task dictionary, with defaults for the required
+        fields, and without the fields that the Habitica API rejects in an
+        update.
+
+        Returns:
+            dict: The update request data.
+        """
+        data = dict(self.__task_dict)
+
+        # ensure that some required values are defined
+        data['type'] = 'todo'
+        data.setdefault('priority', Difficulty.default.value)
+        data.setdefault('attribute', CharacterAttribute.default.value)
+
+        # The Habitica API chokes if you attempt to update a task with a
+        # checklist in the request data. To work around this the checklist
+        # is left out, and handled separately. We also need separate API
+        # calls for deleted, added, and updated checklist items.
+        data.pop('checklist', None)
+
+        # April 2018: the API now complains if you update a task with the
+        # collapsechecklist field present. Rather than sort out the reason,
+        # I remove the field as it serves no relevant purpose.
+        data.pop('collapseChecklist', None)
+        return data
+
+    @property
+    def existing_checklist_items(self):
+        """ The checklist items of the task as loaded from Habitica.
+
+        Returns:
+            list: The checklist item dictionaries.
+        """
+        return self.__task_dict.get('checklist', [])
+
     @property
     def id(self):
         """ Task id """
@@ -113,7 +184,7 @@ class HabiticaTask(Task):
     @property
     def difficulty(self):
         """ Task difficulty """
-        return Difficulty.from_value(self.__task_dict['priority'])
+        return self.__derive('priority', Difficulty.from_value)
 
     @difficulty.setter
     def difficulty(self, difficulty):
@@ -125,7 +196,7 @@ class HabiticaTask(Task):
     @property
     def attribute(self):
         """ Task character attribute """
-        return CharacterAttribute.from_value(self.__task_dict['attribute'])
+        return self.__derive('attribute', CharacterAttribute.from_value)
 
     @attribute.setter
     def attribute(self, attribute):
@@ -137,10 +208,9 @@ class HabiticaTask(Task):
     @property
     def due_date(self):
         """ The due date if there is one, or None. """
-        datestr = self.__task_dict.get('date', None)
-        if datestr:
-            return parse_date_utc(datestr, milliseconds=True)
-        return None
+        return self.__derive(
+            'date',
+            lambda d: parse_date_utc(d, milliseconds=True) if d else None)
 
     @due_date.setter
     def due_date(self, due_date):
@@ -155,10 +225,11 @@ class HabiticaTask(Task):
 
     @property
     def last_modified(self):
-        """ The last modified timestamp in UTC. """
-        timestamp = self.__task_dict['updatedAt']
-        if timestamp:
-            return parse_date_utc(timestamp)
+        """ The last modified timestamp in UTC, or None if the task has not
+        been saved. """
+        return self.__derive(
+            'updatedAt',
+            lambda t: parse_date_utc(t) if t else None)
 
     @property
     def checklist(self):
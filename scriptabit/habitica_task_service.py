@@ -43,11 +43,25 @@ class HabiticaTaskService(TaskService):
         Returns:
             list: The list of tasks
         """
-        raw_tasks = self.__hs.get_tasks(task_type=HabiticaTaskTypes.todos)
-        tasks = [HabiticaTask(rt) for rt in raw_tasks]
-        for t in tasks:
-            t.status = SyncStatus.unchanged
-        return tasks
+        return list(self.iter_tasks())
+
+    def iter_tasks(self):
+        """ Iterates over all tasks.
+
+        The todos are streamed from Habitica, and each task is created as its
+        data is decoded.
+
+        Yields:
+            HabiticaTask: The tasks.
+        """
+        # Challenge tasks are never synchronised, and only the fields used
+        # for synchronisation are kept
+        raw_tasks = self.__hs.iter_tasks(
+            task_type=HabiticaTaskTypes.todos,
+            include_challenges=False,
+            fields=HabiticaTask.SYNC_FIELDS)
+        for rt in raw_tasks:
+            yield HabiticaTask(rt, status=SyncStatus.unchanged)
 
     def persist_tasks(self, tasks):
         """ Task factory method.
@@ -74,6 +88,28 @@ class HabiticaTaskService(TaskService):
                 elif task.status == SyncStatus.deleted:
                     self.__hs.delete_task(td)
 
+    def persist_plan(self, plan):
+        """ Persists the changes in a synchronisation plan.
+
+        Args:
+            plan (SyncPlan): The changes to persist.
+        """
+        if self.dry_run:
+            return
+
+        # new tasks have already been created in _create_task, so they just
+        # need an update.
+        for task in plan.creates + plan.updates + plan.completions:
+            self.__update_task(task)
+            if task.completed:
+                # Scoring a todo does not update the data, so the task is
+                # updated first, as the task may have changed upstream in ways
+                # that affect the Habitica score for completing it.
+                self.__hs.score_task(task.task_dict)
+
+        for task in plan.deletes:
+            self.__hs.delete_task(task.task_dict)
+
     def __update_task(self, task):
         """ Updates a task. This is required as checklists require tedious
         handling.
@@ -94,7 +130,7 @@ class HabiticaTaskService(TaskService):
             # do I need to score checked items separately?
 
         # update the rest of the task
-        self.__hs.update_task(td)
+        self.__hs.update_task(task.update_data)
 
     def _create_task(self, src=None):
         """ Task factory method.
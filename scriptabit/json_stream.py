@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+""" JSON decoding.
+
+Large Habitica responses, such as the list of all completed todos, are a JSON
+object with the interesting content in a single array member. The iterative
+functions in this module decode the items of that array (or the members of an
+object) one at a time from a stream of chunks, so that the raw response and
+the full decoded content never need to be held in memory at once.
+
+`loads` decodes complete documents, using the optional `orjson` package when
+it is installed.
+"""
+
+# Ensure backwards compatibility with Python 2
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals)
+from builtins import *
+
+import codecs
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Characters that can continue a JSON number
+_NUMBER_CHARACTERS = frozenset('0123456789.eE+-')
+
+
+class _ChunkBuffer(object):
+    """ A text buffer that is refilled on demand from an iterator of chunks.
+    """
+    def __init__(self, chunks, encoding='utf-8'):
+        """
+        Args:
+            chunks: Iterable of str or bytes chunks.
+            encoding (str): Encoding used to decode bytes chunks.
+        """
+        self.__chunks = iter(chunks)
+        self.__decoder = codecs.getincrementaldecoder(encoding)()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, grow=False):
+        """ Reads the next chunk into the buffer.
+
+        Args:
+            grow (bool): If True, chunks are read until the unconsumed text
+                has at least doubled. This bounds the number of decode
+                retries for values that span many chunks.
+
+        Returns:
+            bool: False if the stream is exhausted, otherwise True.
+        """
+        if self.eof:
+            return False
+
+        # drop consumed text once it dominates the buffer
+        if self.pos > len(self.text) // 2:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+
+        target = len(self.text) - self.pos if grow else 0
+        chunks = []
+        read = 0
+        while True:
+            try:
+                chunk = next(self.__chunks)
+            except StopIteration:
+                self.eof = True
+                chunks.append(self.__decoder.decode(b'', final=True))
+                break
+            if isinstance(chunk, bytes):
+                chunk = self.__decoder.decode(chunk)
+            chunks.append(chunk)
+            read += len(chunk)
+            if read and read >= target:
+                break
+
+        self.text += ''.join(chunks)
+        return read > 0
+
+    def peek(self):
+        """ Skips whitespace and returns the next character, or '' at the end
+        of the stream.
+        """
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, characters):
+        """ Consumes the next non-whitespace character, which must be one of
+        `characters`.
+
+        Returns:
+            str: The consumed character.
+
+        Raises:
+            ValueError: An unexpected character was found.
+        """
+        c = self.peek()
+        if not c or c not in characters:
+            raise ValueError(
+                'Expected one of {0!r} at position {1}, found {2!r}'.format(
+                    characters, self.pos, c))
+        self.pos += 1
+        return c
+
+    def decode_value(self, decoder):
+        """ Decodes the next complete JSON value, reading more chunks as
+        required.
+
+        Args:
+            decoder (json.JSONDecoder): The decoder.
+
+        Returns:
+            The decoded value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except ValueError:
+                # Most likely an incomplete value, so try again with more
+                # data. At the end of the stream the error is genuine.
+                if not self.fill(grow=True):
+                    raise
+                continue
+
+            # A number is only complete once it is followed by a character
+            # that can't continue it, or the end of the stream.
+            if isinstance(value, (int, float)) and \
+                    not isinstance(value, bool) and \
+                    (end == len(self.text) or
+                     self.text[end] in _NUMBER_CHARACTERS):
+                if self.fill():
+                    continue
+
+            self.pos = end
+            return value
+
+
+def loads(data):
+    """ Decodes a complete JSON document.
+
+    Bytes are decoded directly when the fast `orjson` backend is available,
+    avoiding an intermediate copy of the document as text.
+
+    Args:
+        data (bytes or str): The JSON document.
+
+    Returns:
+        The decoded document.
+    """
+    if orjson:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def __seek_member(buf, key, decoder):
+    """ Consumes the start of the top-level JSON object up to the value of
+    the `key` member.
+
+    Raises:
+        ValueError: Malformed JSON.
+        KeyError: The key is not present in the object.
+    """
+    buf.expect('{')
+    if buf.peek() == '}':
+        raise KeyError(key)
+
+    while True:
+        name = buf.decode_value(decoder)
+        buf.expect(':')
+        if name == key:
+            return
+        buf.decode_value(decoder)
+        if buf.expect(',}') == '}':
+            raise KeyError(key)
+
+
+def iter_array_items(chunks, key='data', decoder=None):
+    """ Incrementally decodes the items of an array member of a JSON object.
+
+    Members of the top-level object other than `key` are decoded and
+    discarded.
+
+    Args:
+        chunks: Iterable of str or bytes chunks, such as
+            `requests.Response.iter_content()`.
+        key (str): The name of the top-level array member.
+        decoder (json.JSONDecoder): Optional decoder.
+
+    Yields:
+        The decoded array items, in order.
+
+    Raises:
+        ValueError: Malformed JSON.
+        KeyError: The key is not present in the object.
+    """
+    decoder = decoder or json.JSONDecoder()
+    buf = _ChunkBuffer(chunks)
+    __seek_member(buf, key, decoder)
+
+    buf.expect('[')
+    if buf.peek() == ']':
+        return
+    while True:
+        yield buf.decode_value(decoder)
+        if buf.expect(',]') == ']':
+            return
+
+
+def iter_object_items(chunks, key='data', decoder=None):
+    """ Incrementally decodes the members of an object member of a JSON
+    object.
+
+    Args:
+        chunks: Iterable of str or bytes chunks, such as
+            `requests.Response.iter_content()`.
+        key (str): The name of the top-level object member.
+        decoder (json.JSONDecoder): Optional decoder.
+
+    Yields:
+        tuple: The (name, value) pairs of the object members, in order.
+
+    Raises:
+        ValueError: Malformed JSON.
+        KeyError: The key is not present in the object.
+    """
+    decoder = decoder or json.JSONDecoder()
+    buf = _ChunkBuffer(chunks)
+    __seek_member(buf, key, decoder)
+
+    buf.expect('{')
+    if buf.peek() == '}':
+        return
+    while True:
+        name = buf.decode_value(decoder)
+        buf.expect(':')
+        yield name, buf.decode_value(decoder)
+        if buf.expect(',}') == '}':
+            return
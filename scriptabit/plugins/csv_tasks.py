@@ -10,12 +10,282 @@ from __future__ import (
     unicode_literals)
 from builtins import *
 import csv
+import hashlib
+import json
 import logging
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pprint import pprint
 
+import requests
 import scriptabit
 from scriptabit import CharacterAttribute, Difficulty
 
+
+class ImportResult(object):
+    """ Summary of a CSV import.
+
+    Attributes:
+        rows (int): The number of data rows read.
+        tasks (int): The number of valid tasks read.
+        uploaded (int): The number of tasks uploaded.
+        updated (int): The number of uploaded tasks that were updates of
+            previously imported tasks.
+        unchanged (int): The number of tasks skipped because they are
+            unchanged since they were last imported.
+        failed_rows (list): The (first, last) row ranges of failed chunks.
+        last_committed_row (int): The last row number such that all rows up
+            to and including it were uploaded or skipped as invalid. An
+            interrupted import can be resumed after this row.
+        last_committed_offset: The file position following the last
+            committed row, or None if no rows were committed.
+    """
+    def __init__(self, start_row=0):
+        self.rows = 0
+        self.tasks = 0
+        self.uploaded = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed_rows = []
+        self.last_committed_row = start_row
+        self.last_committed_offset = None
+
+
+class ImportCheckpoints(object):
+    """ Persistent record of the progress of CSV imports.
+
+    Checkpoints are keyed by the SHA-256 hash of the CSV file, so a changed
+    file is never resumed from a stale checkpoint.
+    """
+    def __init__(self, filename=None):
+        """ Loads the checkpoints from a file. A missing or unreadable file
+        results in no checkpoints.
+
+        Args:
+            filename (str): The checkpoint file name.
+        """
+        self.__checkpoints = {}
+        try:
+            with open(filename, 'r') as f:
+                self.__checkpoints = json.load(f)
+        except Exception as e:
+            if filename and os.path.exists(filename):
+                logging.getLogger(__name__).warning(e)
+
+    def get(self, file_hash):
+        """ Gets the checkpoint for a file.
+
+        Args:
+            file_hash (str): The file hash.
+
+        Returns:
+            dict: The checkpoint, with the last committed `row`, the file
+            `offset` following that row, and the CSV `fieldnames`. None if
+            there is no checkpoint.
+        """
+        return self.__checkpoints.get(file_hash)
+
+    def set(self, file_hash, row, offset, fieldnames):
+        """ Sets the checkpoint for a file. """
+        self.__checkpoints[file_hash] = {
+            'row': row,
+            'offset': offset,
+            'fieldnames': fieldnames,
+        }
+
+    def save(self, filename):
+        """ Saves the checkpoints.
+
+        Args:
+            filename (str): The destination file name.
+        """
+        with open(filename, 'w') as f:
+            if sys.version_info < (3, 0):
+                x = json.dumps(self.__checkpoints,
+                               encoding='UTF-8',
+                               ensure_ascii=False)
+            else:
+                x = json.dumps(self.__checkpoints,
+                               ensure_ascii=False)
+
+            f.write(x)
+
+    @staticmethod
+    def hash_file(filename, block_size=1024 * 1024):
+        """ Gets the SHA-256 hash of a file.
+
+        Args:
+            filename (str): The file name.
+            block_size (int): The read size in bytes.
+
+        Returns:
+            str: The hex digest.
+        """
+        sha = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+
+class ImportIndex(object):
+    """ Persistent index of the tasks imported from CSV files.
+
+    Every imported task is given a deterministic alias, derived from the CSV
+    file name and the task type and name, or taken from the optional alias
+    column. The index records a hash of the content of each imported task,
+    keyed by alias, so that unchanged rows can be skipped and changed rows
+    can be updated in place.
+
+    Generated aliases change if the task name or CSV file name changes, and
+    the edited row is then imported as a new task. Only the alias column
+    gives a key that is stable across such edits.
+    """
+    def __init__(self, filename=None, scope=''):
+        """ Loads the index from a file. A missing or unreadable file
+        results in an empty index.
+
+        Args:
+            filename (str): The index file name.
+            scope (str): Scope for generated aliases, usually the CSV file
+                name. Identical rows in different scopes get different
+                aliases.
+        """
+        self.__scope = scope
+        self.__occurrences = {}
+        self.__entries = {}
+        try:
+            with open(filename, 'r') as f:
+                self.__entries = json.load(f)
+        except Exception as e:
+            if filename and os.path.exists(filename):
+                logging.getLogger(__name__).warning(e)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, alias):
+        """ Gets the index entry for an alias.
+
+        Returns:
+            dict: The entry, with the content `hash` and the `row` number
+            the task was imported from, or None if the alias is not indexed.
+        """
+        return self.__entries.get(alias)
+
+    def set(self, alias, content_hash, row):
+        """ Records an imported task. """
+        self.__entries[alias] = {'hash': content_hash, 'row': row}
+
+    def alias(self, task, start_row=0):
+        """ Gets the alias for a task.
+
+        Tasks with the same type and name are distinguished by their order
+        of occurrence in the file. Occurrences in rows up to `start_row`,
+        which are not read when an import is resumed, are counted from the
+        index.
+
+        Args:
+            task (dict): The task.
+            start_row (int): The last row number that was skipped.
+
+        Returns:
+            str: The task alias.
+        """
+        if task.get('alias'):
+            return task['alias']
+
+        key = hashlib.sha1('\n'.join(
+            [self.__scope, task['type'], task['text']]).encode('utf-8'))
+        key = 'csv-' + key.hexdigest()[:16]
+
+        occurrence = self.__occurrences.get(key)
+        if occurrence is None:
+            occurrence = 0
+            while True:
+                entry = self.get(self.__make_alias(key, occurrence))
+                if not entry or entry['row'] > start_row:
+                    break
+                occurrence += 1
+
+        self.__occurrences[key] = occurrence + 1
+        return self.__make_alias(key, occurrence)
+
+    @staticmethod
+    def __make_alias(key, occurrence):
+        """ Builds an alias from a key and occurrence count. """
+        return key if occurrence == 0 else '{0}-{1}'.format(key, occurrence)
+
+    @staticmethod
+    def content_hash(task):
+        """ Gets a hash of the task content.
+
+        Args:
+            task (dict): The task.
+
+        Returns:
+            str: The hex digest.
+        """
+        return hashlib.sha1(
+            json.dumps(task, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def save(self, filename):
+        """ Saves the index.
+
+        Args:
+            filename (str): The destination file name.
+        """
+        with open(filename, 'w') as f:
+            if sys.version_info < (3, 0):
+                x = json.dumps(self.__entries,
+                               encoding='UTF-8',
+                               ensure_ascii=False)
+            else:
+                x = json.dumps(self.__entries,
+                               ensure_ascii=False)
+
+            f.write(x)
+
+
+class _ChunkTracker(object):
+    """ Records completed chunks in an `ImportResult`, tracking the last
+    contiguously committed row when chunks complete out of order.
+    """
+    def __init__(self, result, on_commit=None):
+        self.__result = result
+        self.__on_commit = on_commit
+        self.__done = {}
+        self.__blocked = False
+
+    def complete(self, first_row, last_row, offset, task_count, error):
+        """ Records a completed chunk. """
+        result = self.__result
+        if error:
+            result.failed_rows.append((first_row, last_row))
+            result.failed_rows.sort()
+        else:
+            result.uploaded += task_count
+
+        self.__done[first_row] = (last_row, offset, error)
+
+        # advance over contiguous successful chunks
+        committed = result.last_committed_row
+        while not self.__blocked:
+            chunk = self.__done.get(result.last_committed_row + 1)
+            if not chunk:
+                break
+            if chunk[2]:
+                self.__blocked = True
+                break
+            del self.__done[result.last_committed_row + 1]
+            result.last_committed_row = chunk[0]
+            result.last_committed_offset = chunk[1]
+
+        if self.__on_commit and result.last_committed_row != committed:
+            self.__on_commit(result)
+
+
 class CsvTasks(scriptabit.IPlugin):
     """ Scriptabit batch CSV task importer for Habitica
     """
@@ -24,8 +294,8 @@ class CsvTasks(scriptabit.IPlugin):
         Generally nothing to do here other than initialise any class attributes.
         """
         super().__init__()
-        self.tasks = []
-        self.tag_names = []
+        self.tag_names = set()
+        self.__tag_ids = {}
 
     @staticmethod
     def supports_dry_runs():
@@ -54,6 +324,55 @@ class CsvTasks(scriptabit.IPlugin):
             metavar='FILE',
             help='CSV file for bulk task import')
 
+        parser.add(
+            '--csv-chunk-size',
+            required=False,
+            type=int,
+            default=100,
+            help='Maximum number of tasks uploaded in each request')
+
+        parser.add(
+            '--csv-workers',
+            required=False,
+            type=int,
+            default=1,
+            help='Maximum number of concurrent upload requests')
+
+        parser.add(
+            '--csv-start-row',
+            required=False,
+            type=int,
+            default=0,
+            metavar='ROW',
+            help='''Skip data rows up to and including this row number. Use this
+to resume an interrupted import. Overrides any saved checkpoint.''')
+
+        parser.add(
+            '--csv-checkpoint-file',
+            required=False,
+            default='csv_tasks_checkpoints.json',
+            metavar='FILE',
+            help='''File in the scriptabit data directory that records import
+progress, so that an interrupted import resumes where it left off''')
+
+        parser.add(
+            '--csv-ignore-checkpoint',
+            required=False,
+            action='store_true',
+            help='Import the entire CSV file, ignoring any saved checkpoint')
+
+        parser.add(
+            '--csv-index-file',
+            required=False,
+            default='csv_tasks_index.json',
+            metavar='FILE',
+            help='''File in the scriptabit data directory that records the
+imported tasks, so that unchanged rows are skipped and changed rows are
+updated when a CSV file is imported again. Rows without an alias column are
+matched by CSV file name, task type, and task name, so editing a task name or
+renaming the CSV file imports a duplicate task. Add an alias column to keep
+rows matched across such edits.''')
+
         self.print_help = parser.print_help
 
         return parser
@@ -100,95 +419,405 @@ class CsvTasks(scriptabit.IPlugin):
             'Importing tasks from %s',
             self._config.csv_file)
 
-        row_count = 0
-
-        with open(self._config.csv_file) as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    row_count += 1  # OK to do this first, as we skip the header
-                    task = {
-                        'text': row['name'],
-                        'type': row['type'],
-                    }
-                    # TODO: due_date
-
-                    if 'description' in row.keys():
-                        task['notes'] = row['description']
-
-                    # We need to handle priority or difficulty in the input
-                    # header row
-                    if 'priority' in row.keys():
-                        task['priority'] = self.__parse_enum(
-                            Difficulty,
-                            row['priority'])
-                    elif 'difficulty' in row.keys():
-                        task['priority'] = self.__parse_enum(
-                            Difficulty,
-                            row['difficulty'])
-
-                    if 'attribute' in row.keys():
-                        task['attribute'] = self.__parse_enum(
-                            CharacterAttribute,
-                            row['attribute'])
-
-                    if task['type'] == 'habit':
-                        task['up'] = self.__parse_bool(row['up'])
-                        task['down'] = self.__parse_bool(row['down'])
-
-                    if task['type'] == 'reward' and 'value' in row.keys():
-                        task['value'] = max(0, int(row['value']))
-
-                    if 'tags' in row.keys():
-                        if row['tags']:
-                            tags = row['tags'].split(',')
-                            self.tag_names += tags
-                            task['tags'] = tags  # placeholder, filled in later
-
-                    if task['type'] in ['habit', 'daily', 'todo', 'reward']:
-                        self.tasks.append(task)
-                    else:
-                        logging.getLogger(__name__).warning(
-                            'Skipping task on row %d: invalid task type',
-                            row_count)
-
-                except ValueError as ex:
-                    logging.getLogger(__name__).error(ex, exc_info=True)
-                except KeyError as ex:
-                    logging.getLogger(__name__).error(ex, exc_info=True)
-                except Exception as ex:
-                    logging.getLogger(__name__).error(ex, exc_info=True)
-
-        self.__fill_tag_placeholders()
-
-        if not self.tasks:
+        checkpoint_file = os.path.join(
+            self._data_dir,
+            self._config.csv_checkpoint_file)
+        checkpoints = ImportCheckpoints(checkpoint_file)
+        index_file = os.path.join(
+            self._data_dir,
+            self._config.csv_index_file)
+        index = ImportIndex(
+            index_file,
+            scope=os.path.basename(self._config.csv_file))
+        file_hash = ImportCheckpoints.hash_file(self._config.csv_file)
+
+        start_row = self._config.csv_start_row
+        checkpoint = None
+        if not (start_row or self._config.csv_ignore_checkpoint):
+            checkpoint = checkpoints.get(file_hash)
+
+        with open(self._config.csv_file, newline='') as f:
+            # readline rather than file iteration, so that tell() is usable
+            lines = iter(f.readline, '')
+            if checkpoint:
+                start_row = checkpoint['row']
+                logging.getLogger(__name__).info(
+                    'Resuming import after row %d', start_row)
+                f.seek(checkpoint['offset'])
+                reader = csv.DictReader(
+                    lines,
+                    fieldnames=checkpoint['fieldnames'])
+            else:
+                reader = csv.DictReader(lines)
+
+            def save_checkpoint(result):
+                """ Records the import progress """
+                # The index must be saved first, otherwise a checkpoint could
+                # skip rows that were never indexed.
+                index.save(index_file)
+                checkpoints.set(
+                    file_hash,
+                    result.last_committed_row,
+                    result.last_committed_offset,
+                    reader.fieldnames)
+                checkpoints.save(checkpoint_file)
+
+            rows = self.iter_tasks(
+                reader,
+                start_row=start_row,
+                first_row=start_row + 1 if checkpoint else 1,
+                tell=f.tell)
+            result = self.import_tasks(
+                rows,
+                chunk_size=self._config.csv_chunk_size,
+                workers=self._config.csv_workers,
+                start_row=start_row,
+                on_commit=None if self.dry_run else save_checkpoint,
+                index=index)
+
+        if not self.dry_run:
+            index.save(index_file)
+
+        if checkpoint and not result.rows:
+            logging.getLogger(__name__).info(
+                'All rows of %s have already been imported',
+                self._config.csv_file)
+            return False
+
+        if self.dry_run and self.tag_names:
+            print()
+            pprint(sorted(self.tag_names))
+
+        if not result.tasks:
             logging.getLogger(__name__).warning(
                 'No tasks created. Check your CSV file format')
             return False
 
-        if not self.dry_run and self.tasks:
-            self._hs.create_tasks(self.tasks)
+        if result.unchanged:
+            logging.getLogger(__name__).info(
+                'Skipped %d unchanged tasks',
+                result.unchanged)
 
-        self.notify('Uploaded {0} rows from CSV'.format(row_count))
+        if result.failed_rows:
+            logging.getLogger(__name__).error(
+                '%d chunks failed. Rerun to resume the import after row %d',
+                len(result.failed_rows),
+                result.last_committed_row)
+
+        self.notify('Uploaded {0} of {1} rows from CSV'.format(
+            result.uploaded,
+            result.rows))
 
         # return False if finished, and True to be updated again.
         return False
 
-    def __fill_tag_placeholders(self):
-        """Replace tag name placeholders with tag IDs"""
-        if self.tag_names:
-            self.tag_names = list(set(self.tag_names))  # remove duplicates
+    def iter_tasks(self, reader, start_row=0, first_row=1, tell=None):
+        """ Lazily parses Habitica tasks from CSV rows.
 
-            if self._config.dry_run:
-                print()
-                pprint(self.tag_names)
-            else:
-                tags = self._hs.create_tags(self.tag_names)
-                for task in self.tasks:
-                    # replace the placeholder names with tag IDs
-                    n = task.get('tags', None)
-                    if n:
-                        task['tags'] = [t['id'] for t in tags if t['name'] in n]
+        Rows that can't be parsed are logged and skipped.
+
+        Args:
+            reader (csv.DictReader): The CSV reader.
+            start_row (int): Rows up to and including this (1-based) data row
+                number are skipped.
+            first_row (int): The number of the first row returned by the
+                reader. This is greater than 1 when the reader starts part
+                way through the file.
+            tell (callable): Optional function returning the current
+                position in the underlying file.
+
+        Yields:
+            tuple: The row number, the task (or None for rows that were
+            skipped as invalid), and the file position following the row.
+            Task tags are tag names.
+        """
+        for row_number, row in enumerate(reader, first_row):
+            if row_number <= start_row:
+                continue
+            offset = tell() if tell else None
+
+            try:
+                task = self.parse_row(row)
+                if not task:
+                    logging.getLogger(__name__).warning(
+                        'Skipping task on row %d: invalid task type',
+                        row_number)
+                yield row_number, task, offset
+            except Exception as ex:
+                logging.getLogger(__name__).error(ex, exc_info=True)
+                yield row_number, None, offset
+
+    def parse_row(self, row):
+        """ Parses a Habitica task from a CSV row.
+
+        Args:
+            row (dict): The CSV row.
+
+        Returns:
+            dict: The task, with tag names in place of tag IDs, or None if
+            the task type is invalid.
+        """
+        task = {
+            'text': row['name'],
+            'type': row['type'],
+        }
+        # TODO: due_date
+
+        if row.get('alias'):
+            task['alias'] = row['alias']
+
+        if 'description' in row.keys():
+            task['notes'] = row['description']
+
+        # We need to handle priority or difficulty in the input
+        # header row
+        if 'priority' in row.keys():
+            task['priority'] = self.__parse_enum(
+                Difficulty,
+                row['priority'])
+        elif 'difficulty' in row.keys():
+            task['priority'] = self.__parse_enum(
+                Difficulty,
+                row['difficulty'])
+
+        if 'attribute' in row.keys():
+            task['attribute'] = self.__parse_enum(
+                CharacterAttribute,
+                row['attribute'])
+
+        if task['type'] == 'habit':
+            task['up'] = self.__parse_bool(row['up'])
+            task['down'] = self.__parse_bool(row['down'])
+
+        if task['type'] == 'reward' and 'value' in row.keys():
+            task['value'] = max(0, int(row['value']))
+
+        if 'tags' in row.keys():
+            if row['tags']:
+                task['tags'] = row['tags'].split(',')
+
+        if task['type'] in ['habit', 'daily', 'todo', 'reward']:
+            return task
+        return None
+
+    def import_tasks(
+            self,
+            rows,
+            chunk_size=100,
+            workers=1,
+            start_row=0,
+            on_commit=None,
+            index=None):
+        """ Uploads tasks in chunks.
+
+        Chunks are uploaded as they are read, so only a bounded number of
+        tasks are held in memory. A failed chunk is logged and the import
+        continues with the next chunk.
+
+        Args:
+            rows: Iterable of (row number, task, offset) tuples, as returned
+                by `iter_tasks`.
+            chunk_size (int): The maximum number of tasks per request.
+            workers (int): The maximum number of concurrent requests.
+            start_row (int): The last row number skipped by `iter_tasks`.
+            on_commit (callable): Optional function that is called with the
+                `ImportResult` whenever the last committed row advances.
+            index (ImportIndex): Optional index of previously imported tasks.
+                If supplied, every task is given an alias, unchanged tasks
+                are skipped, and changed tasks are updated. Uploaded tasks
+                are added to the index.
+
+        Returns:
+            ImportResult: The import summary.
+        """
+        chunk_size = max(1, chunk_size)
+        workers = max(1, workers)
+        result = ImportResult(start_row)
+        chunks = _ChunkTracker(result, on_commit)
+
+        # content hash, row number, and update flag of the indexed tasks
+        # that are waiting to be uploaded, keyed by alias
+        indexing = {}
+        if index is not None:
+            rows = self.__index_rows(rows, index, start_row, result, indexing)
+
+        def complete(first_row, last_row, offset, tasks, updates, error):
+            """ Records a completed chunk """
+            for task in tasks:
+                alias = task.get('alias')
+                if alias in indexing:
+                    content_hash, row_number, _ = indexing.pop(alias)
+                    if not error:
+                        index.set(alias, content_hash, row_number)
+            if not error:
+                result.updated += updates
+            chunks.complete(first_row, last_row, offset, len(tasks), error)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for first_row, last_row, offset, tasks in self.__iter_chunks(
+                    rows, chunk_size, result):
+                self.__resolve_tags(tasks)
+                existing = set(
+                    a for a, (_, _, update) in indexing.items() if update)
+                pending.add(executor.submit(
+                    self.__upload_chunk,
+                    first_row,
+                    last_row,
+                    offset,
+                    tasks,
+                    existing))
+
+                # bound the number of chunks held in memory
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        complete(*future.result())
+
+            for future in pending:
+                complete(*future.result())
+
+        return result
+
+    @staticmethod
+    def __iter_chunks(rows, chunk_size, result):
+        """ Groups rows into chunks of tasks.
+
+        Yields:
+            tuple: The first and last row numbers covered by the chunk, the
+            file position following the last row, and the list of valid tasks
+            in the chunk. Invalid rows are covered by a chunk, but contribute
+            no task.
+        """
+        first_row = None
+        tasks = []
+        row_number = offset = None
+        for row_number, task, offset in rows:
+            result.rows += 1
+            if first_row is None:
+                first_row = row_number
+            if task:
+                result.tasks += 1
+                tasks.append(task)
+            if len(tasks) >= chunk_size:
+                yield first_row, row_number, offset, tasks
+                first_row = None
+                tasks = []
+
+        if first_row is not None:
+            yield first_row, row_number, offset, tasks
+
+    @staticmethod
+    def __index_rows(rows, index, start_row, result, indexing):
+        """ Assigns aliases to tasks, and drops the tasks that are unchanged
+        since they were last imported.
+
+        Yields:
+            tuple: The row number, task, and offset. The task is None for
+            invalid or unchanged rows.
+        """
+        for row_number, task, offset in rows:
+            if task:
+                content_hash = index.content_hash(task)
+                task['alias'] = index.alias(task, start_row)
+                entry = index.get(task['alias'])
+                if entry and entry['hash'] == content_hash:
+                    result.tasks += 1
+                    result.unchanged += 1
+                    task = None
+                else:
+                    indexing[task['alias']] = (
+                        content_hash, row_number, entry is not None)
+            yield row_number, task, offset
+
+    def __resolve_tags(self, tasks):
+        """ Replaces tag names with tag IDs, creating any new tags.
+
+        Tag IDs are cached, so tags are only looked up or created once per
+        import. In a dry run the tag names are only recorded.
+        """
+        names = set()
+        for task in tasks:
+            names.update(task.get('tags', []))
+        new_names = names - self.tag_names
+        self.tag_names.update(new_names)
+
+        if self.dry_run:
+            return
+
+        if new_names:
+            for tag in self._hs.create_tags(list(new_names)):
+                self.__tag_ids[tag['name']] = tag['id']
+
+        for task in tasks:
+            if task.get('tags'):
+                task['tags'] = [
+                    self.__tag_ids[n] for n in task['tags']
+                    if n in self.__tag_ids]
+
+    def __upload_chunk(self, first_row, last_row, offset, tasks, existing):
+        """ Uploads a chunk of tasks.
+
+        Tasks with an alias in `existing` are updated individually, and the
+        remaining tasks are created in a single request. Updates are sent
+        first, so that a failed chunk never leaves behind created tasks that
+        are missing from the index.
+
+        Returns:
+            tuple: The first and last row numbers, the file offset, the
+            tasks, the number of updated tasks, and the exception, or None on
+            success.
+        """
+        creates = []
+        updates = 0
+        try:
+            for task in tasks:
+                if task.get('alias') not in existing:
+                    creates.append(task)
+                elif not self.__update_task(task):
+                    creates.append(task)
+                else:
+                    updates += 1
+
+            if creates and not self.dry_run:
+                self._hs.create_tasks(creates)
+            logging.getLogger(__name__).info(
+                'Uploaded rows %d to %d (%d new, %d updated)',
+                first_row,
+                last_row,
+                len(creates),
+                updates)
+            return first_row, last_row, offset, tasks, updates, None
+        except Exception as ex:
+            logging.getLogger(__name__).error(
+                'Failed to upload rows %d to %d: %s',
+                first_row,
+                last_row,
+                ex)
+            return first_row, last_row, offset, tasks, 0, ex
+
+    def __update_task(self, task):
+        """ Updates a previously imported task.
+
+        Returns:
+            bool: True if the task was updated, or False if it no longer
+            exists.
+        """
+        if self.dry_run:
+            return True
+
+        # the task type can't be changed
+        update = dict((k, v) for k, v in task.items() if k != 'type')
+        try:
+            self._hs.update_task(update)
+            return True
+        except requests.exceptions.HTTPError as ex:
+            if ex.response is not None and \
+                    ex.response.status_code == requests.codes.not_found:
+                logging.getLogger(__name__).info(
+                    'Task %s no longer exists, recreating', task['alias'])
+                return False
+            raise
 
     @staticmethod
     def __parse_bool(csv_value):
@@ -202,12 +831,7 @@ class CsvTasks(scriptabit.IPlugin):
         """ Parse an enum, trying both lookup by name and value.
             Returns the default if neither lookup succeeds.
         """
-        value = enum.default.value
         try:
-            value = enum[name].value
-        except:
-            try:
-                value = enum.from_value(name).value
-            except:
-                pass
-        return value
+            return enum[name].value
+        except KeyError:
+            return enum.from_value(name).value
@@ -9,22 +9,299 @@ from __future__ import (
     unicode_literals)
 from builtins import *
 import itertools
+import json
 import logging
 import math
+import os
+import sys
 from datetime import datetime, timedelta
 
 import pytz
 import scriptabit
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The Unix epoch, for converting parsed dates to timestamps
+_EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+
+
+def _timestamp(date):
+    """ Converts a Habitica history date to an epoch timestamp.
+
+    History dates are usually epoch milliseconds, which are converted
+    directly. Anything else is parsed with `scriptabit.parse_date_utc`.
+
+    Args:
+        date: The date, as epoch milliseconds or a date string.
+
+    Returns:
+        float: The epoch timestamp in seconds.
+    """
+    if isinstance(date, (int, float)):
+        return date / 1000
+    return (scriptabit.parse_date_utc(date) - _EPOCH).total_seconds()
+
+
+class TaskHistory(object):
+    """ Columnar store of the score history of many tasks.
+
+    The task histories are converted once into flat arrays of timestamps,
+    score deltas, and task indices. Windowed score summaries for all tasks are
+    then computed with vectorised operations when numpy is installed, or with
+    a single pass over the arrays otherwise.
+    """
+    def __init__(self, tasks=(), use_numpy=None):
+        """ Initialise the history store.
+
+        Args:
+            tasks (iterable): The Habitica tasks. Only the 'type',
+                'completed', 'value', 'priority', and 'history' fields are
+                used.
+            use_numpy (bool): If True, numpy is used to summarise scores. If
+                None, numpy is used when it is installed.
+        """
+        self.__use_numpy = numpy is not None if use_numpy is None \
+            else use_numpy
+        self.__fixed = []
+        self.__count = 0
+        self.__times = []
+        self.__deltas = []
+        self.__indices = []
+        self.__arrays = None
+
+        for task in tasks:
+            self.add_task(task)
+
+    def __len__(self):
+        """ The number of tasks. """
+        return self.__count
+
+    def add_task(self, task):
+        """ Adds a task.
+
+        Args:
+            task (dict): The Habitica task.
+        """
+        if task['type'] == 'todo':
+            # completed todos always count, regardless of the window
+            if task['completed']:
+                self.__fixed.append(
+                    (self.__count,
+                     float(task['value']) * float(task['priority'])))
+            self.__count += 1
+            return
+
+        # The score moves from 0 when the task is created. Only the date of
+        # the second entry in each pair matters, so the creation date is not
+        # needed.
+        times = []
+        deltas = []
+        previous = 0
+        for entry in task.get('history', ()):
+            value = float(entry['value'])
+            times.append(_timestamp(entry['date']))
+            deltas.append(value - previous)
+            previous = value
+        self.add_deltas(times, deltas)
+
+    def add_deltas(self, times, deltas):
+        """ Adds a task from precomputed score changes.
+
+        Args:
+            times (list): The epoch timestamp of each score change.
+            deltas (list): The score changes.
+        """
+        self.__times.extend(times)
+        self.__deltas.extend(deltas)
+        self.__indices.extend([self.__count] * len(times))
+        self.__count += 1
+        self.__arrays = None
+
+    def summarise(self, now, window):
+        """ Summarises the score changes of each task within a time window.
+
+        Args:
+            now (datetime): The most recent time to consider.
+            window (timedelta): The time window to consider prior to now.
+
+        Returns:
+            list: The (total delta, up count, down count) for each task, in
+            task order.
+        """
+        end = (now - _EPOCH).total_seconds()
+        start = end - window.total_seconds()
+
+        if self.__use_numpy:
+            totals, ups, downs = self.__summarise_numpy(start, end)
+        else:
+            totals, ups, downs = self.__summarise_python(start, end)
+
+        for index, delta in self.__fixed:
+            totals[index] = delta
+            ups[index] = 1
+
+        return list(zip(totals, ups, downs))
+
+    def __summarise_numpy(self, start, end):
+        """ Vectorised windowed summary. """
+        if self.__arrays is None:
+            self.__arrays = (
+                numpy.array(self.__times, dtype=numpy.float64),
+                numpy.array(self.__deltas, dtype=numpy.float64),
+                numpy.array(self.__indices, dtype=numpy.intp))
+        times, deltas, indices = self.__arrays
+
+        mask = (times <= end) & (times > start)
+        deltas = deltas[mask]
+        indices = indices[mask]
+        n = self.__count
+        totals = numpy.bincount(indices, weights=deltas, minlength=n)
+        ups = numpy.bincount(indices[deltas > 0], minlength=n)
+        downs = numpy.bincount(indices[deltas < 0], minlength=n)
+        return totals.tolist(), ups.tolist(), downs.tolist()
+
+    def __summarise_python(self, start, end):
+        """ Pure Python windowed summary. """
+        n = self.__count
+        totals = [0] * n
+        ups = [0] * n
+        downs = [0] * n
+        for time, delta, index in zip(
+                self.__times, self.__deltas, self.__indices):
+            if start < time <= end:
+                totals[index] += delta
+                if delta > 0:
+                    ups[index] += 1
+                elif delta < 0:
+                    downs[index] += 1
+        return totals, ups, downs
+
+
+class HistoryCache(object):
+    """ Persistent, incrementally updated task history state.
+
+    For each task, the cache records the timestamp and value of the newest
+    history entry seen (the high-water mark), and the score changes that are
+    still inside the time window. Each update only converts the history
+    entries newer than the high-water mark, and expires the changes that have
+    left the window.
+    """
+    def __init__(self, filename=None):
+        """ Loads the cache from a file. A missing or unreadable file results
+        in an empty cache.
+
+        Args:
+            filename (str): The cache file name.
+        """
+        self.__window = 0
+        self.__tasks = {}
+        try:
+            with open(filename, 'r') as f:
+                content = json.load(f)
+            self.__window = content['window']
+            self.__tasks = content['tasks']
+        except Exception as e:
+            if filename and os.path.exists(filename):
+                logging.getLogger(__name__).warning(e)
+
+    def __len__(self):
+        return len(self.__tasks)
+
+    def update(self, tasks, now, window, use_numpy=None):
+        """ Updates the cache from the current tasks.
+
+        Tasks that are not in `tasks` are removed from the cache.
+
+        Args:
+            tasks (iterable): The Habitica tasks, including the task 'id'.
+            now (datetime): The most recent time to consider.
+            window (timedelta): The time window to consider prior to now.
+            use_numpy (bool): Passed to `TaskHistory`.
+
+        Returns:
+            TaskHistory: The history of the task score changes within the
+            window, in task order.
+        """
+        seconds = window.total_seconds()
+        if seconds > self.__window:
+            # The retained changes don't cover a larger window
+            self.__tasks = {}
+        self.__window = seconds
+        start = (now - _EPOCH).total_seconds() - seconds
+
+        history = TaskHistory(use_numpy=use_numpy)
+        current = {}
+        for task in tasks:
+            if task['type'] == 'todo':
+                history.add_task(task)
+                continue
+
+            mark, value, changes = self.__tasks.get(task['id'], (None, 0, []))
+
+            # history is in date order, so the new entries are at the end
+            new = []
+            for entry in reversed(task.get('history', ())):
+                time = _timestamp(entry['date'])
+                if mark is not None and time <= mark:
+                    break
+                new.append((time, float(entry['value'])))
+
+            for time, new_value in reversed(new):
+                changes.append((time, new_value - value))
+                value = new_value
+                mark = time
+
+            changes = [c for c in changes if c[0] > start]
+            current[task['id']] = (mark, value, changes)
+            history.add_deltas(
+                [c[0] for c in changes],
+                [c[1] for c in changes])
+
+        self.__tasks = current
+        return history
+
+    def save(self, filename):
+        """ Saves the cache.
+
+        Args:
+            filename (str): The destination file name.
+        """
+        content = {'window': self.__window, 'tasks': self.__tasks}
+        with open(filename, 'w') as f:
+            if sys.version_info < (3, 0):
+                x = json.dumps(content,
+                               encoding='UTF-8',
+                               ensure_ascii=False)
+            else:
+                x = json.dumps(content,
+                               ensure_ascii=False)
+
+            f.write(x)
+
 
 class HealthEffects(scriptabit.IPlugin):
     """ Implements the health effects plugin.
     """
+
+    # The task fields used to summarise task scores
+    SCORE_FIELDS = (
+        'id',
+        'type',
+        'completed',
+        'value',
+        'priority',
+        'createdAt',
+        'history')
+
     def __init__(self):
         """ Initialises the plugin.
         """
         super().__init__()
         self.__stats = None
+        self.__history_cache_file = None
 
     def get_arg_parser(self):
         """Gets the argument parser containing any CLI arguments for the plugin.
@@ -86,6 +363,8 @@ class HealthEffects(scriptabit.IPlugin):
                 persistent data.
         """
         super().initialise(configuration, habitica_service, data_dir)
+        self.__history_cache_file = os.path.join(
+            data_dir, 'health_effects_history.json')
 
     @staticmethod
     def supports_dry_runs():
@@ -200,63 +479,7 @@ class HealthEffects(scriptabit.IPlugin):
             int: Number of times the score went up.
             int: Number of times the score went down.
         """
-        if task['type'] == 'todo':
-            if task['completed']:
-                return float(task['value']) * float(task['priority']), 1, 0
-            else:
-                return 0, 0, 0
-
-        if 'history' not in task:
-            return 0, 0, 0
-
-        def pairwise(iterable):
-            """ pairwise iteration of a sequence.
-
-            s -> (s0,s1), (s1,s2), (s2, s3), ...
-
-            """
-            a, b = itertools.tee(iterable)
-            next(b, None)
-            return zip(a, b)
-
-        class PairCounter(object):
-            """ Tracks score movements for a pair of values. """
-            def __init__(self, scale=1):
-                """ Initialises the PairCounter.
-
-                Args:
-                    multiplier (float): Optional score scale factor.
-                """
-                self.up = 0
-                self.down = 0
-                self.sum_delta = 0
-                self.scale = scale
-
-            def count(self, a, b):
-                """ Count a pair of values. """
-                delta = (b - a) * self.scale
-                # print(a, b, delta)
-                self.sum_delta += delta
-                if delta > 0:
-                    self.up += 1
-                elif delta < 0:
-                    self.down += 1
-
-        counter = PairCounter()
-        # counter = PairCounter(3 if task['type'] == 'daily' else 1)
-        history = [{'date': task['createdAt'], 'value': 0}]
-        history.extend(task['history'])
-
-        # print()
-        # print(task['text'])
-        # pprint(history)
-
-        for a, b in pairwise(history):
-            date = scriptabit.parse_date_utc(b['date'])
-            if date <= now and now - date < window:
-                counter.count(a['value'], b['value'])
-
-        return counter.sum_delta, counter.up, counter.down
+        return TaskHistory([task]).summarise(now, window)[0]
 
     def logistic_growth(
             self,
@@ -299,12 +522,17 @@ class HealthEffects(scriptabit.IPlugin):
         y = a / (1 + b * math.exp(k * x))
         return y
 
-    def summarise_task_performance(self, tasks, window_hours=24):
+    def summarise_task_performance(self, tasks=None, window_hours=24):
         """ Summarises overall task performance within a time window back from
         the current time.
 
         Args:
-            tasks (list): The list of Habitica tasks to summarise.
+            tasks (iterable): The Habitica tasks to summarise. If None, the
+                user tasks and the todos completed within the window are
+                streamed from Habitica, keeping only the fields needed for
+                scoring. The history of these tasks is summarised
+                incrementally using the persistent `HistoryCache`, which is
+                not saved on a dry run.
             window_hours (float): Size of the time window in hours
 
         Returns:
@@ -312,11 +540,23 @@ class HealthEffects(scriptabit.IPlugin):
         now = datetime.now(tz=pytz.utc)
         window = timedelta(hours=window_hours)
 
+        if tasks is None:
+            tasks = itertools.chain(
+                self._hs.iter_tasks(fields=self.SCORE_FIELDS),
+                self._hs.iter_completed_todos(
+                    updated_since=now - window,
+                    fields=self.SCORE_FIELDS))
+            cache = HistoryCache(self.__history_cache_file)
+            history = cache.update(tasks, now, window)
+            if not self.dry_run:
+                cache.save(self.__history_cache_file)
+        else:
+            history = TaskHistory(tasks)
+
         up = 0
         down = 0
         total_delta = 0
-        for t in tasks:
-            tot_delta, tup, tdown = self.summarise_task_score(t, now, window)
+        for tot_delta, tup, tdown in history.summarise(now, window):
 
             # only track those tasks in which something changed inside the time
             # window. If nothing changed, there will be no up or down counts.
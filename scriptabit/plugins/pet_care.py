@@ -11,25 +11,114 @@ from __future__ import (
     unicode_literals)
 from builtins import *
 import logging
+import math
 import random
+from collections import OrderedDict, deque
+from enum import Enum
 from pprint import pprint
-from time import sleep
 
 import scriptabit
 
 
+class PetType(Enum):
+    """ Pet classifications """
+    base = 'base'
+    magic = 'magic'
+    quest = 'quest'
+    rare = 'rare'
+
+
+def max_matching(left, right, pairs):
+    """ Finds a maximum set of pairs such that each left and right item is
+    used no more than its capacity, and each pair is used at most once.
+
+    This is a bipartite b-matching, solved as a maximum flow from the left
+    items to the right items using shortest augmenting paths.
+
+    Args:
+        left (dict): Capacities of the left items.
+        right (dict): Capacities of the right items.
+        pairs: Iterable of the allowed (left, right) pairs.
+
+    Returns:
+        list: The matched (left, right) pairs.
+    """
+    source, sink = ('source',), ('sink',)
+    capacity = {}
+    graph = {source: [], sink: []}
+
+    def add_edge(u, v, c):
+        """ Adds an edge and its residual edge """
+        graph.setdefault(u, []).append(v)
+        graph.setdefault(v, []).append(u)
+        capacity[(u, v)] = capacity.get((u, v), 0) + c
+        capacity.setdefault((v, u), 0)
+
+    for l, c in left.items():
+        if c > 0:
+            add_edge(source, ('left', l), c)
+    for r, c in right.items():
+        if c > 0:
+            add_edge(('right', r), sink, c)
+    for l, r in pairs:
+        if left.get(l, 0) > 0 and right.get(r, 0) > 0:
+            add_edge(('left', l), ('right', r), 1)
+
+    while True:
+        # breadth first search for the shortest augmenting path
+        parents = {source: None}
+        queue = deque([source])
+        while queue and sink not in parents:
+            u = queue.popleft()
+            for v in graph[u]:
+                if v not in parents and capacity[(u, v)] > 0:
+                    parents[v] = u
+                    queue.append(v)
+
+        if sink not in parents:
+            break
+
+        # every left -> right edge has unit capacity, so each path carries
+        # a single unit of flow
+        v = sink
+        while parents[v] is not None:
+            u = parents[v]
+            capacity[(u, v)] -= 1
+            capacity[(v, u)] += 1
+            v = u
+
+    # matched pairs are the saturated left -> right edges
+    return [
+        (u[1], v[1]) for (u, v), c in capacity.items()
+        if u[0] == 'left' and v[0] == 'right' and c == 0]
+
+
 class PetCare(scriptabit.IPlugin):
     """ Habitica pet care
     """
+    # Growth rules. Pets grow faster on their preferred food, and magic pets
+    # treat all food as preferred. A pet becomes a mount at MOUNT_GROWTH.
+    PREFERRED_FOOD_GROWTH = 5
+    OTHER_FOOD_GROWTH = 2
+    MOUNT_GROWTH = 50
+
+    # Feeding stops at this growth when pets are not to be raised to mounts
+    NO_RAISE_GROWTH = 45
+
+    # Foods that are never fed by the planner. Saddles instantly raise a pet
+    # to a mount.
+    EXCLUDED_FOODS = frozenset(['Saddle'])
+
     def __init__(self):
         """ Initialises the plugin.
         """
         super().__init__()
         self.__items = None
         self.__any_food = False
+        self.__pet_types = {}
 
-        # Generate the reference lists
-        self.__base_pets = [
+        # Generate the reference sets
+        self.__base_pets = frozenset([
             'BearCub',
             'Cactus',
             'Dragon',
@@ -39,15 +128,15 @@ class PetCare(scriptabit.IPlugin):
             'PandaCub',
             'TigerCub',
             'Wolf',
-        ]
+        ])
 
-        self.__rare_pets = [
+        self.__rare_pets = frozenset([
             'Wolf-Veteran',
             'Mammoth-Base',
             'JackOLantern-Base',
             'Turkey-Base',
             'BearCub-Polar',
-        ]
+        ])
 
         self.__preferred_foods = {
             'Base': ['Meat'],
@@ -62,7 +151,7 @@ class PetCare(scriptabit.IPlugin):
             'Shade': ['Chocolate'],
         }
 
-        self.__base_potions = [
+        self.__base_potions = frozenset([
             'Base',
             'White',
             'Desert',
@@ -73,7 +162,7 @@ class PetCare(scriptabit.IPlugin):
             'CottonCandyPink',
             'CottonCandyBlue',
             'Golden',
-        ]
+        ])
 
         # augment the preferred foods with the special foods
         for potion in self.__base_potions:
@@ -141,6 +230,14 @@ class PetCare(scriptabit.IPlugin):
             action='store_true',
             help='When feeding pets, this flag prevents them being raised to mounts')
 
+        parser.add(
+            '--pet-care-workers',
+            required=False,
+            type=int,
+            default=4,
+            help='''Maximum number of concurrent feeding requests. Requests are
+also limited by the Habitica API rate limit.''')
+
         self.print_help = parser.print_help
 
         return parser
@@ -161,9 +258,14 @@ class PetCare(scriptabit.IPlugin):
         logging.getLogger(__name__).info('Scriptabit Pet Care Services: looking'
                                          ' after your pets since yesterday')
 
-        self.__items = self._hs.get_user()['items']
+        self.__items = self._hs.get_user_fields('items')['items']
         self.__any_food = self._config.any_pet_food
 
+        # classify every pet once, rather than on every filter
+        self.__pet_types = dict(
+            (pet, self.__classify_pet(pet))
+            for pet in self.__items['pets'])
+
     @staticmethod
     def supports_dry_runs():
         """ The PetCare plugin supports dry runs.
@@ -233,14 +335,49 @@ class PetCare(scriptabit.IPlugin):
         """
         return potion not in self.__base_potions
 
+    def __classify_pet(self, pet):
+        """ Classifies a pet.
+
+        Args:
+            pet (str): The full pet name.
+
+        Returns:
+            PetType: The pet type.
+        """
+        if pet in self.__rare_pets:
+            return PetType.rare
+        animal, _, potion = pet.partition('-')
+        if potion not in self.__base_potions:
+            return PetType.magic
+        if animal in self.__base_pets:
+            return PetType.base
+        return PetType.quest
+
+    def get_pet_type(self, pet):
+        """ Gets the type of a pet.
+
+        Types are looked up in the index built when the plugin is
+        initialised. Pets that are not in the index are classified and added
+        to it.
+
+        Args:
+            pet (str): The full pet name.
+
+        Returns:
+            PetType: The pet type.
+        """
+        pet_type = self.__pet_types.get(pet)
+        if pet_type is None:
+            pet_type = self.__pet_types[pet] = self.__classify_pet(pet)
+        return pet_type
+
     def is_base_pet(self, pet):
         """ Is this a base pet?
 
         Args:
             pet (str): The full pet name.
         """
-        animal, potion = pet.split('-')
-        return animal in self.__base_pets and potion in self.__base_potions
+        return self.get_pet_type(pet) == PetType.base
 
     def is_quest_pet(self, pet):
         """ Is this a quest pet?
@@ -248,9 +385,7 @@ class PetCare(scriptabit.IPlugin):
         Args:
             pet (str): The full pet name.
         """
-        return not (self.is_base_pet(pet)
-                    or self.is_magic_pet(pet)
-                    or self.is_rare_pet(pet))
+        return self.get_pet_type(pet) == PetType.quest
 
     def is_magic_pet(self, pet):
         """ Is this a magic pet?
@@ -258,9 +393,7 @@ class PetCare(scriptabit.IPlugin):
         Args:
             pet (str): The full pet name.
         """
-        animal, potion = pet.split('-')
-        return not self.is_rare_pet(pet) and \
-                potion not in self.__base_potions
+        return self.get_pet_type(pet) == PetType.magic
 
     def is_rare_pet(self, pet):
         """ Is this a rare pet?
@@ -268,7 +401,7 @@ class PetCare(scriptabit.IPlugin):
         Args:
             pet (str): The full pet name.
         """
-        return pet in self.__rare_pets
+        return self.get_pet_type(pet) == PetType.rare
 
     def get_eggs(self, base=True, quest=False):
         """ Gets the filtered dictionary of available eggs. Values
@@ -332,29 +465,31 @@ class PetCare(scriptabit.IPlugin):
         Returns:
             list: the filtered pet list.
         """
-        pets = []
-        for pet, growth in self.__items['pets'].items():
-            # Habitica indicates a pet that has been raised to a mount with
-            # growth == -1. These pets are non-interactive, so exclude them.
-            # There is no direct indication of the second pet (where a mount
-            # also exists), so we check for the presence of a mount.
-            if growth > 0:
-                has_mount = self.__items['mounts'].get(pet, False)
-
-                # if the no-raise flag is true, then we skip pets that are near
-                # to being raised to mounts
-                if self._config.no_raise and growth >= 45:
-                    continue
-
-                if not (feedable_only and has_mount):
-                    if base and self.is_base_pet(pet):
-                        pets.append(pet)
-                    elif magic and self.is_magic_pet(pet):
-                        pets.append(pet)
-                    elif quest and self.is_quest_pet(pet):
-                        pets.append(pet)
-                    elif rare and self.is_rare_pet(pet):
-                        pets.append(pet)
+        types = set()
+        if base:
+            types.add(PetType.base)
+        if magic:
+            types.add(PetType.magic)
+        if quest:
+            types.add(PetType.quest)
+        if rare:
+            types.add(PetType.rare)
+
+        mounts = self.__items['mounts']
+        max_growth = self.NO_RAISE_GROWTH if self._config.no_raise \
+            else self.MOUNT_GROWTH
+
+        # Habitica indicates a pet that has been raised to a mount with
+        # growth == -1. These pets are non-interactive, so exclude them.
+        # There is no direct indication of the second pet (where a mount
+        # also exists), so we check for the presence of a mount.
+        # If the no-raise flag is true, then we skip pets that are near
+        # to being raised to mounts.
+        pets = [
+            pet for pet, growth in self.__items['pets'].items()
+            if 0 < growth < max_growth and
+            not (feedable_only and mounts.get(pet, False)) and
+            self.get_pet_type(pet) in types]
 
         return pets
 
@@ -367,77 +502,139 @@ class PetCare(scriptabit.IPlugin):
             rare=False,
             feedable_only=True)
 
-        pet_count = 0
+        plan = self.plan_feeding(pets)
+
+        if self.dry_run:
+            for step in plan:
+                logging.getLogger(__name__).info(
+                    '%s (%d): %d x %s',
+                    step['pet'],
+                    step['growth'],
+                    step['amount'],
+                    step['food'])
+                step['fed'] = True
+        else:
+            # Feeds for the same pet must be sequential, so each pet is a
+            # single bulk operation. Steps are marked as they are fed, so a
+            # retried pet resumes from the step that failed.
+            feeds = OrderedDict()
+            for step in plan:
+                step['fed'] = False
+                feeds.setdefault(step['pet'], []).append(step)
+
+            runner = scriptabit.BulkRunner(
+                self.__feed,
+                max_workers=self._config.pet_care_workers,
+                description='pets',
+                not_found_is_done=False)
+            runner.run(list(feeds.values()))
+
         food_count = 0
         mounts_raised = 0
-        for pet in pets:
-            if not self.has_any_food():
-                logging.getLogger(__name__).info('Out of food')
-                break
-            try:
-                food = self.get_food_for_pet(pet)
-                fed_something = False
-                while food:
-                    fed_something = True
-                    if self.dry_run:
-                        response = {'data': -1, 'message': 'dry run'}
-                    else:
-                        response = self._hs.feed_pet(pet, food)
-
-                    food_count += 1
-                    self.consume_food(food)
-                    growth = response['data']
-                    logging.getLogger(__name__).info(
-                        '%s (%d): %s', pet, growth, response['message'])
-
-                    # Doh: this test needs to be first, or it gets masked by the 
-                    # growth > 0 test.
-                    if self._config.no_raise and growth >= 45:
-                        break
-                    elif growth > 0:
-                        # growth > 0 indicates that the pet is still hungry
-                        food = self.get_food_for_pet(pet)
-                    else:
-                        # growth <= 0 (-1 actually) indicates that the
-                        # pet became a mount
-                        mounts_raised += 1
-                        break
-
-                if fed_something and not self.dry_run:
-                    sleep(2)  # sleep for a bit so we don't pound the server
-            except Exception as e:
-                logging.getLogger(__name__).warning(e)
-
-            pet_count += 1
+        for step in plan:
+            if step['fed']:
+                food_count += step['amount']
+                self.consume_food(step['food'], step['amount'])
+                if step['growth'] < 0:
+                    mounts_raised += 1
 
         message = \
             'Checked {1} pets, fed {0} pieces of food, raised {2} mounts'.\
-            format(food_count, pet_count, mounts_raised)
+            format(food_count, len(pets), mounts_raised)
         self.notify(message)
 
-    def get_food_for_pet(self, pet):
-        """ Gets a food item for a pet
+    def __feed(self, steps):
+        """ Executes the feeding steps for a single pet, in order.
+
+        Steps that have already been fed are skipped, so that a retry after
+        a failure does not feed them again. Each step is marked as fed once
+        the food has been accepted.
+        """
+        for step in steps:
+            if step['fed']:
+                continue
+            response = self._hs.feed_pet(
+                step['pet'],
+                step['food'],
+                step['amount'])
+            step['fed'] = True
+            logging.getLogger(__name__).info(
+                '%s (%d): %s',
+                step['pet'],
+                response['data'],
+                response['message'])
+
+    def plan_feeding(self, pets):
+        """ Plans the feeding of pets from the current food inventory.
+
+        Pets closest to becoming mounts are fed first, so that the most
+        mounts are raised when food is scarce. Magic pets, which eat any food,
+        are fed after the other pets have had their preferred foods.
+
+        Args:
+            pets (list): The names of the pets to feed.
+
+        Returns:
+            list: The feeding steps, in order. Each step is a dictionary with
+            the `pet`, the `food`, the `amount` of food, and the expected
+            `growth` afterwards. Growth is -1 if the pet becomes a mount.
+        """
+        food = dict(
+            (f, q) for f, q in self.__items['food'].items()
+            if q > 0 and f not in self.EXCLUDED_FOODS)
+        target = self.NO_RAISE_GROWTH if self._config.no_raise \
+            else self.MOUNT_GROWTH
+        growth = self.__items['pets']
+
+        pets = sorted(
+            pets,
+            key=lambda p: (self.is_magic_pet(p), -growth[p], p))
+
+        plan = []
+        for pet in pets:
+            pet_growth = growth[pet]
+            for f, gain in self.__get_food_choices(pet, food):
+                if pet_growth >= target:
+                    break
+                if not food.get(f):
+                    continue
+
+                amount = min(
+                    food[f],
+                    int(math.ceil((target - pet_growth) / gain)))
+                food[f] -= amount
+                pet_growth += amount * gain
+                plan.append({
+                    'pet': pet,
+                    'food': f,
+                    'amount': amount,
+                    'growth':
+                        -1 if pet_growth >= self.MOUNT_GROWTH else pet_growth,
+                })
+
+        return plan
+
+    def __get_food_choices(self, pet, food):
+        """ Gets the foods that a pet can be fed, in order of preference.
 
         Args:
             pet (str): The composite pet name (animal-potion)
+            food (dict): The available food.
 
         Returns:
-            str: The name of a suitable food if that food is in stock.
-                If no suitable food is available, then None is returned.
+            list: The (food, growth) pairs.
         """
-        # split the pet name
-        animal, potion = pet.split('-')
-
-        # magic pets eat any food
-        if self.__any_food or self.is_magic_pet(pet, animal, potion):
-            for food, quantity in self.__items['food'].items():
-                if quantity > 0:
-                    return food
-        else:
-            for food in self.__preferred_foods[potion]:
-                if self.has_food(food):
-                    return food
-        return None
+        if self.is_magic_pet(pet):
+            return [(f, self.PREFERRED_FOOD_GROWTH) for f in sorted(food)]
+
+        potion = pet.split('-')[1]
+        preferred = self.__preferred_foods.get(potion, [])
+        choices = [(f, self.PREFERRED_FOOD_GROWTH) for f in preferred]
+        if self.__any_food:
+            choices.extend(
+                (f, self.OTHER_FOOD_GROWTH) for f in sorted(food)
+                if f not in preferred)
+        return choices
 
     def has_any_food(self):
         """ Checks whether any food is left.
@@ -458,15 +655,16 @@ class PetCare(scriptabit.IPlugin):
         """
         return self.__items['food'].get(food, 0) > 0
 
-    def consume_food(self, food):
+    def consume_food(self, food, amount=1):
         """ Consumes a food, updating the cached quantity.
 
         Args:
             food (str): The food.
+            amount (int): The amount of food consumed.
         """
         quantity = self.__items['food'].get(food, 0)
         if quantity > 0:
-            self.__items['food'][food] = quantity - 1
+            self.__items['food'][food] = max(0, quantity - amount)
 
     @staticmethod
     def list_pet_items(items):
@@ -523,15 +721,16 @@ class PetCare(scriptabit.IPlugin):
                 message),
             **kwargs)
 
-    def hatch_pets(self):
-        """ Hatch all available pets. """
-        # first get the lists of things
-        current_pets = self.get_pets(
-            base=not self._config.no_base_pets,
-            magic=self._config.magic_pets,
-            quest=self._config.quest_pets,
-            rare=False)
+    def plan_hatching(self):
+        """ Plans the hatching of pets from the current inventory.
 
+        Finds the largest set of new pets that can be hatched from the
+        available eggs and potions, subject to the pet type options. Pets that
+        are already owned are not hatched again.
+
+        Returns:
+            list: The (egg, potion) pairs to hatch, sorted by pet name.
+        """
         potions = self.get_hatching_potions(
             base=True,  # we always need the base potions
             magic=self._config.magic_pets)
@@ -540,51 +739,46 @@ class PetCare(scriptabit.IPlugin):
             base=not self._config.no_base_pets,
             quest=self._config.quest_pets)
 
-        hatched = 0
-
-        for egg, egg_quantity in eggs.items():
-            for potion, potion_quantity in potions.items():
-                potential_pet = '{0}-{1}'.format(egg, potion)
-
-                if egg_quantity <= 0:
-                    # logging.getLogger(__name__).debug(
-                        # "Can't hatch %s, no egg", potential_pet)
-                    continue
-                if potion_quantity <= 0:
-                    # logging.getLogger(__name__).debug(
-                        # "Can't hatch %s, no potion", potential_pet)
-                    continue
-                if potential_pet in current_pets:
-                    # logging.getLogger(__name__).debug(
-                        # "Can't hatch %s, already have one", potential_pet)
-                    continue
-                if self.is_quest_egg(egg) and self.is_magic_potion(potion):
-                    # this is not a valid combination
-                    continue
-
-                try:
-                    if self.dry_run:
-                        response = {'message': 'dry run'}
-                    else:
-                        response = self._hs.hatch_pet(egg, potion)
+        owned = set(p for p, growth in self.__items['pets'].items()
+                    if growth > 0)
 
-                    logging.getLogger(__name__).info(
-                        '%s: %s',
-                        potential_pet,
-                        response['message'])
+        # quest eggs can't be hatched with magic potions
+        pairs = [
+            (egg, potion) for egg in eggs for potion in potions
+            if '{0}-{1}'.format(egg, potion) not in owned and
+            not (self.is_quest_egg(egg) and self.is_magic_potion(potion))]
 
-                    hatched += 1
-                    potions[potion] -= 1
+        return sorted(
+            max_matching(eggs, potions, pairs),
+            key=lambda pair: '{0}-{1}'.format(*pair))
 
-                    # don't need to store the egg_quantity back into the dict,
-                    # since it is the outer loop
-                    egg_quantity -= 1
+    def hatch_pets(self):
+        """ Hatch all available pets. """
+        plan = self.plan_hatching()
 
-                    # strictly speaking don't need this either, since we
-                    # shouldn't ever revist the same egg/potion combo
-                    current_pets.append(potential_pet)
-                except Exception as e:
-                    logging.getLogger(__name__).warning(e)
+        if self.dry_run:
+            for egg, potion in plan:
+                logging.getLogger(__name__).info(
+                    '%s-%s: dry run', egg, potion)
+            hatched = len(plan)
+        else:
+            # a missing egg or potion is a failure, not a hatched pet
+            runner = scriptabit.BulkRunner(
+                self.__hatch,
+                max_workers=self._config.pet_care_workers,
+                description='pets',
+                not_found_is_done=False)
+            hatched = runner.run(plan).done
 
         message = 'Hatched {0} new pets'.format(hatched)
         self.notify(message)
+
+    def __hatch(self, pair):
+        """ Hatches a pet from an (egg, potion) pair. """
+        egg, potion = pair
+        response = self._hs.hatch_pet(egg, potion)
+        logging.getLogger(__name__).info(
+            '%s-%s: %s',
+            egg,
+            potion,
+            response['message'])
@@ -9,15 +9,22 @@ from __future__ import (
     print_function,
     unicode_literals)
 from builtins import *
-from time import sleep
 from pprint import pprint
+import itertools
 import logging
+import os
 
 import scriptabit as sb
 
 class Tasks(sb.IPlugin):
     """ Tasks plugin implementation
     """
+    # Files in the data directory that record pending bulk deletes. Task
+    # deletes are recorded per task type, so that resuming a delete never
+    # acts on tasks of a different type.
+    PENDING_TASK_DELETES = 'tasks_pending_{0}_deletes.json'
+    PENDING_TAG_DELETES = 'tasks_pending_tag_deletes.json'
+
     def __init__(self):
         """ Initialises the plugin.
         Generally nothing to do here other than initialise any class attributes.
@@ -77,6 +84,20 @@ class Tasks(sb.IPlugin):
             action='store_true',
             help='''Delete unused tags.''')
 
+        parser.add(
+            '--include-completed-todos',
+            required=False,
+            action='store_true',
+            help='''When finding unused tags, tags assigned to completed todos are
+treated as used.''')
+
+        parser.add(
+            '--ignore-challenge-tasks',
+            required=False,
+            action='store_true',
+            help='''When finding unused tags, tags assigned only to challenge tasks
+are treated as unused.''')
+
         parser.add(
             '--task-type',
             required=False,
@@ -91,6 +112,14 @@ class Tasks(sb.IPlugin):
             action='store_true',
             help='''Show the task UUID. Useful for finding spell targets.''')
 
+        parser.add(
+            '--bulk-workers',
+            required=False,
+            type=int,
+            default=4,
+            help='''Maximum number of concurrent requests when deleting tasks or
+tags. Requests are also limited by the Habitica API rate limit.''')
+
         self.print_help = parser.print_help
         return parser
 
@@ -165,22 +194,38 @@ class Tasks(sb.IPlugin):
         logging.getLogger(__name__).debug(
             'Deleting all %s', self.task_type_name)
 
-        tasks = self._hs.get_tasks(task_type=self.task_type)
-        for t in tasks:
-            if 'challenge' in t and 'id' in t['challenge']:
-                print('Skipping challenge task {0}'.format(t['text']))
-            else:
-                print('Deleting {0}'.format(t['text']))
-                if not self.dry_run:
-                    self._hs.delete_task(t)
-                    sleep(1)
+        pending_file = os.path.join(
+            self._data_dir,
+            self.PENDING_TASK_DELETES.format(self._config.task_type))
+        tasks = sb.BulkRunner.load_pending(pending_file)
+        if tasks:
+            logging.getLogger(__name__).info(
+                'Resuming %d task deletes from an earlier run', len(tasks))
+        else:
+            # Challenge tasks can't be deleted, so leave them out of the query
+            tasks = self._hs.get_tasks(
+                task_type=self.task_type,
+                include_challenges=False,
+                fields=('_id', 'text'))
+
+        self.__bulk_delete(
+            tasks,
+            self._hs.delete_task,
+            pending_file,
+            self.task_type_name,
+            'text')
 
     def list_tasks(self):
         """Dumps all tasks"""
         print('*** Listing {0} ***'.format(self.task_type_name))
         print()
 
-        tasks = self._hs.get_tasks(task_type=self.task_type)
+        if self._config.verbose:
+            tasks = self._hs.iter_tasks(task_type=self.task_type)
+        else:
+            tasks = self._hs.iter_tasks(
+                task_type=self.task_type,
+                fields=('id', 'text'))
         for t in tasks:
             if self._config.verbose:
                 pprint(t)
@@ -205,30 +250,85 @@ class Tasks(sb.IPlugin):
         """Deletes unused tags"""
         print('*** Deleting unused tags ***')
         print()
-        self._hs.delete_tags(self.__get_unused_tags().values())
+
+        pending_file = os.path.join(self._data_dir, self.PENDING_TAG_DELETES)
+        tags = sb.BulkRunner.load_pending(pending_file)
+        if tags:
+            logging.getLogger(__name__).info(
+                'Resuming %d tag deletes from an earlier run', len(tags))
+        else:
+            tags = [
+                {'id': t['id'], 'name': t['name']}
+                for t in self.__get_unused_tags().values()]
+
+        self.__bulk_delete(
+            tags,
+            self._hs.delete_tag,
+            pending_file,
+            'tags',
+            'name')
+
+    def __bulk_delete(self, objects, delete, pending_file, description, name):
+        """ Deletes objects concurrently.
+
+        Args:
+            objects (list): The tasks or tags to delete.
+            delete (callable): The HabiticaService delete method.
+            pending_file (str): The file recording the pending deletes.
+            description (str): Description of the objects.
+            name (str): The object field holding the name.
+        """
+        if self.dry_run:
+            for o in objects:
+                print('Deleting {0}'.format(o[name]))
+            return
+
+        runner = sb.BulkRunner(
+            delete,
+            max_workers=self._config.bulk_workers,
+            pending_file=pending_file,
+            description=description)
+        result = runner.run(objects)
+
+        print('Deleted {0} of {1} {2}'.format(
+            result.done,
+            len(objects),
+            description))
+        if result.failed:
+            logging.getLogger(__name__).error(
+                '%d deletes failed, and will be retried on the next run',
+                len(result.failed))
 
     def __get_unused_tags(self):
         """gets the dictionary of unused tags"""
-        tags = self._hs.get_tags()
-        tasks = self._hs.get_tasks()
-
-        # simple m*n first implementation. No need to do something fancier
-        # unless this is too slow
-
-        # first, assume that all tags are unused
-        unused_tags = {t['id']:t for t in tags}
-
-        # Then, try to disprove that assumption by finding at least one task
-        # that uses the tag
-        for tag in tags:
-            for task in tasks:
-                if tag['id'] in task['tags']:
-                    logging.getLogger(__name__).debug(
-                        'tag %s is used', tag['name'])
-                    del unused_tags[tag['id']]
-                    break
-
-        return unused_tags
+        query = {
+            'include_challenges': not self._config.ignore_challenge_tasks,
+            'fields': ('tags',),
+        }
+        tasks = self._hs.iter_tasks(**query)
+        if self._config.include_completed_todos:
+            tasks = itertools.chain(
+                tasks,
+                self._hs.iter_completed_todos(**query))
+
+        return self.find_unused_tags(self._hs.get_tags(), tasks)
+
+    @staticmethod
+    def find_unused_tags(tags, tasks):
+        """ Finds the tags that are not assigned to any task.
+
+        Args:
+            tags (list): The tags.
+            tasks: Iterable of tasks. Only the task tags are required.
+
+        Returns:
+            dict: The unused tags, keyed by tag ID.
+        """
+        used = set()
+        for task in tasks:
+            used.update(task.get('tags', ()))
+
+        return {t['id']: t for t in tags if t['id'] not in used}
 
     def __print_tags(self, tags):
         """ print the supplied list of tags.
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+""" Unit tests for the CSV tasks plugin """
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals,
+)
+from builtins import *
+import csv
+import io
+import os
+
+import requests
+
+from .csv_tasks import CsvTasks, ImportCheckpoints, ImportIndex
+
+
+class MockConfig(object):
+    def __init__(self, dry_run=False, csv_file=None):
+        self.dry_run = dry_run
+        self.csv_file = csv_file
+        self.csv_chunk_size = 2
+        self.csv_workers = 1
+        self.csv_start_row = 0
+        self.csv_checkpoint_file = 'checkpoints.json'
+        self.csv_ignore_checkpoint = False
+        self.csv_index_file = 'index.json'
+        self.use_notification_panel = False
+        self.tags = []
+
+
+class FakeHabiticaService(object):
+    """ Records uploads, failing the chunks that contain a given task. """
+    def __init__(self, fail_text=None):
+        self.fail_text = fail_text
+        self.uploads = []
+        self.updates = []
+        self.missing = set()
+        self.created_tags = []
+
+    def create_tasks(self, tasks):
+        if any(t['text'] == self.fail_text for t in tasks):
+            raise IOError('upload failed')
+        self.uploads.append(tasks)
+        return tasks
+
+    def update_task(self, task):
+        if task['alias'] in self.missing:
+            response = requests.Response()
+            response.status_code = 404
+            raise requests.exceptions.HTTPError(response=response)
+        self.updates.append(task)
+        return task
+
+    def create_tags(self, names):
+        self.created_tags.append(sorted(names))
+        return [{'name': n, 'id': 'id-' + n} for n in names]
+
+
+def make_plugin(hs, dry_run=False, csv_file=None, data_dir=''):
+    plugin = CsvTasks()
+    plugin.initialise(MockConfig(dry_run, csv_file), hs, data_dir)
+    return plugin
+
+
+def make_csv(rows):
+    return 'name,type,tags\n' + ''.join(
+        '{0},{1},"{2}"\n'.format(*r) for r in rows)
+
+
+def make_reader(rows):
+    return csv.DictReader(io.StringIO(make_csv(rows)))
+
+
+def write_csv(tmpdir, rows):
+    csv_file = tmpdir.join('tasks.csv')
+    csv_file.write(make_csv(rows))
+    return str(csv_file)
+
+
+def test_import_in_chunks():
+    hs = FakeHabiticaService()
+    plugin = make_plugin(hs)
+    reader = make_reader([('t{0}'.format(i), 'todo', '') for i in range(7)])
+    result = plugin.import_tasks(plugin.iter_tasks(reader), chunk_size=3)
+
+    assert [len(u) for u in hs.uploads] == [3, 3, 1]
+    assert result.rows == 7
+    assert result.uploaded == 7
+    assert result.last_committed_row == 7
+    assert not result.failed_rows
+
+
+def test_invalid_rows_are_skipped():
+    hs = FakeHabiticaService()
+    plugin = make_plugin(hs)
+    reader = make_reader([('a', 'todo', ''), ('b', 'bogus', ''),
+                          ('c', 'habit', '')])
+    result = plugin.import_tasks(plugin.iter_tasks(reader), chunk_size=10)
+
+    assert [t['text'] for t in hs.uploads[0]] == ['a']
+    assert result.rows == 3
+    assert result.tasks == 1
+    assert result.last_committed_row == 3
+
+
+def test_failed_chunk_reported_and_import_continues():
+    hs = FakeHabiticaService(fail_text='t3')
+    plugin = make_plugin(hs)
+    reader = make_reader([('t{0}'.format(i), 'todo', '') for i in range(7)])
+    result = plugin.import_tasks(
+        plugin.iter_tasks(reader), chunk_size=2, workers=3)
+
+    assert result.failed_rows == [(3, 4)]
+    assert result.uploaded == 5
+    assert result.last_committed_row == 2
+
+
+def test_resume_from_start_row():
+    hs = FakeHabiticaService()
+    plugin = make_plugin(hs)
+    reader = make_reader([('t{0}'.format(i), 'todo', '') for i in range(5)])
+    result = plugin.import_tasks(
+        plugin.iter_tasks(reader, start_row=3), chunk_size=10, start_row=3)
+
+    assert [t['text'] for t in hs.uploads[0]] == ['t3', 't4']
+    assert result.last_committed_row == 5
+
+
+def test_tags_resolved_once():
+    hs = FakeHabiticaService()
+    plugin = make_plugin(hs)
+    reader = make_reader([('a', 'todo', 'x,y'), ('b', 'todo', 'y'),
+                          ('c', 'todo', 'y,z')])
+    plugin.import_tasks(plugin.iter_tasks(reader), chunk_size=2)
+
+    assert hs.created_tags == [['x', 'y'], ['z']]
+    assert hs.uploads[0][0]['tags'] == ['id-x', 'id-y']
+    assert hs.uploads[1][0]['tags'] == ['id-y', 'id-z']
+
+
+def test_dry_run_uploads_nothing():
+    hs = FakeHabiticaService()
+    plugin = make_plugin(hs, dry_run=True)
+    reader = make_reader([('a', 'todo', 'x')])
+    result = plugin.import_tasks(plugin.iter_tasks(reader))
+
+    assert not hs.uploads
+    assert not hs.created_tags
+    assert plugin.tag_names == {'x'}
+    assert result.tasks == 1
+
+
+def test_checkpoint_resumes_after_failure(tmpdir):
+    csv_file = write_csv(
+        tmpdir, [('t{0}'.format(i), 'todo', '') for i in range(7)])
+
+    hs = FakeHabiticaService(fail_text='t4')
+    make_plugin(hs, csv_file=csv_file, data_dir=str(tmpdir)).update()
+    assert [t['text'] for u in hs.uploads for t in u] == [
+        't0', 't1', 't2', 't3', 't6']
+
+    checkpoint = ImportCheckpoints(
+        os.path.join(str(tmpdir), 'checkpoints.json')).get(
+            ImportCheckpoints.hash_file(csv_file))
+    assert checkpoint['row'] == 4
+    assert checkpoint['fieldnames'] == ['name', 'type', 'tags']
+
+    # the rerun starts after the last committed row, and the index skips
+    # the task uploaded after the failed chunk
+    hs = FakeHabiticaService()
+    make_plugin(hs, csv_file=csv_file, data_dir=str(tmpdir)).update()
+    assert [t['text'] for u in hs.uploads for t in u] == ['t4', 't5']
+
+    # and a completed import uploads nothing
+    hs = FakeHabiticaService()
+    make_plugin(hs, csv_file=csv_file, data_dir=str(tmpdir)).update()
+    assert not hs.uploads
+
+
+def test_checkpoint_ignored_for_changed_file(tmpdir):
+    csv_file = write_csv(tmpdir, [('a', 'todo', ''), ('b', 'todo', '')])
+    make_plugin(
+        FakeHabiticaService(), csv_file=csv_file, data_dir=str(tmpdir)).update()
+
+    csv_file = write_csv(tmpdir, [('a', 'todo', ''), ('c', 'todo', '')])
+    hs = FakeHabiticaService()
+    make_plugin(hs, csv_file=csv_file, data_dir=str(tmpdir)).update()
+
+    # row 'a' is read again, but skipped as unchanged by the index
+    assert [t['text'] for u in hs.uploads for t in u] == ['c']
+
+
+def test_index_skips_unchanged_and_updates_changed_rows(tmpdir):
+    index_file = str(tmpdir.join('index.json'))
+    rows = [('t{0}'.format(i), 'todo', '') for i in range(10)]
+    index = ImportIndex(scope='tasks.csv')
+    hs = FakeHabiticaService()
+    plugin = make_plugin(hs)
+    plugin.import_tasks(plugin.iter_tasks(make_reader(rows)), index=index)
+    assert len(index) == 10
+    index.save(index_file)
+
+    rows[3] = ('t3', 'todo', 'x')
+    rows.append(('t10', 'todo', ''))
+    index = ImportIndex(index_file, scope='tasks.csv')
+    hs = FakeHabiticaService()
+    plugin = make_plugin(hs)
+    result = plugin.import_tasks(
+        plugin.iter_tasks(make_reader(rows)), index=index)
+
+    assert [t['text'] for t in hs.updates] == ['t3']
+    assert 'type' not in hs.updates[0]
+    assert [t['text'] for u in hs.uploads for t in u] == ['t10']
+    assert result.unchanged == 9
+    assert result.updated == 1
+    assert result.uploaded == 2
+
+
+def test_index_aliases():
+    index = ImportIndex(scope='tasks.csv')
+    task = {'type': 'todo', 'text': 'same'}
+    first = index.alias(task)
+    second = index.alias(task)
+    assert first.startswith('csv-')
+    assert second == first + '-1'
+    assert ImportIndex(scope='other.csv').alias(task) != first
+    assert index.alias({'type': 'todo', 'text': 'x', 'alias': 'mine'}) == 'mine'
+
+
+def test_index_aliases_count_skipped_rows():
+    task = {'type': 'todo', 'text': 'same'}
+    first = ImportIndex(scope='tasks.csv').alias(task)
+
+    # resuming after row 2, the first occurrence is already indexed
+    index = ImportIndex(scope='tasks.csv')
+    index.set(first, 'hash', 2)
+    assert index.alias(task, start_row=2) == first + '-1'
+
+    # but without a resume it is the same task
+    index = ImportIndex(scope='tasks.csv')
+    index.set(first, 'hash', 2)
+    assert index.alias(task) == first
+
+
+def test_index_recreates_missing_task(tmpdir):
+    index_file = str(tmpdir.join('index.json'))
+    index = ImportIndex(scope='tasks.csv')
+    plugin = make_plugin(FakeHabiticaService())
+    plugin.import_tasks(
+        plugin.iter_tasks(make_reader([('a', 'todo', '')])), index=index)
+    index.save(index_file)
+
+    index = ImportIndex(index_file, scope='tasks.csv')
+    hs = FakeHabiticaService()
+    hs.missing.add(ImportIndex(scope='tasks.csv').alias(
+        {'type': 'todo', 'text': 'a'}))
+    plugin = make_plugin(hs)
+    plugin.import_tasks(
+        plugin.iter_tasks(make_reader([('a', 'todo', 'x')])), index=index)
+
+    assert not hs.updates
+    assert [t['text'] for u in hs.uploads for t in u] == ['a']
+
+
+def test_parse_enums():
+    plugin = make_plugin(FakeHabiticaService())
+    task = plugin.parse_row({'name': 'a', 'type': 'todo', 'priority': '1.5',
+                             'attribute': 'INT'})
+    assert task['priority'] == 1.5
+    assert task['attribute'] == 'int'
+
+    task = plugin.parse_row({'name': 'a', 'type': 'todo',
+                             'difficulty': 'hard', 'attribute': 'perception'})
+    assert task['priority'] == 2.0
+    assert task['attribute'] == 'per'
+
+    task = plugin.parse_row({'name': 'a', 'type': 'todo', 'priority': 'x'})
+    assert task['priority'] == 1.0
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+""" Unit tests for the health effects plugin """
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals,
+)
+from builtins import *
+import random
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from . import health_effects
+from .health_effects import HealthEffects, HistoryCache, TaskHistory
+
+NOW = datetime(2017, 3, 1, 12, tzinfo=pytz.utc)
+WINDOW = timedelta(hours=24)
+
+try:
+    import numpy
+    ENGINES = [False, True]
+except ImportError:
+    ENGINES = [False]
+
+
+def epoch_ms(date):
+    return (date - datetime(1970, 1, 1, tzinfo=pytz.utc)).total_seconds() * 1000
+
+
+def reference_score(task, now, window):
+    """ Straightforward per-pair scoring of a single task. """
+    if task['type'] == 'todo':
+        if task['completed']:
+            return float(task['value']) * float(task['priority']), 1, 0
+        return 0, 0, 0
+
+    total, up, down = 0, 0, 0
+    previous = 0
+    for entry in task.get('history', []):
+        date = datetime.fromtimestamp(entry['date'] / 1000, pytz.utc)
+        delta = entry['value'] - previous
+        previous = entry['value']
+        if date <= now and now - date < window:
+            total += delta
+            if delta > 0:
+                up += 1
+            elif delta < 0:
+                down += 1
+    return total, up, down
+
+
+def make_tasks(count, seed=42):
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        kind = rng.choice(['habit', 'daily', 'todo'])
+        if kind == 'todo':
+            tasks.append({
+                'type': 'todo',
+                'completed': rng.random() < 0.5,
+                'value': rng.uniform(-5, 5),
+                'priority': rng.choice([0.1, 1, 1.5, 2])})
+            continue
+
+        history = []
+        for _ in range(rng.randint(0, 40)):
+            date = NOW - timedelta(hours=rng.uniform(-6, 72))
+            history.append({
+                'date': epoch_ms(date),
+                'value': round(rng.uniform(-10, 10), 2)})
+        history.sort(key=lambda h: h['date'])
+        tasks.append({'type': kind, 'history': history})
+    return tasks
+
+
+@pytest.mark.parametrize('use_numpy', ENGINES)
+def test_history_matches_reference(use_numpy):
+    tasks = make_tasks(200)
+    actual = TaskHistory(tasks, use_numpy=use_numpy).summarise(NOW, WINDOW)
+
+    assert len(actual) == len(tasks)
+    for task, (total, up, down) in zip(tasks, actual):
+        expected = reference_score(task, NOW, WINDOW)
+        assert total == pytest.approx(expected[0])
+        assert (up, down) == expected[1:]
+
+
+@pytest.mark.parametrize('use_numpy', ENGINES)
+def test_history_window_bounds(use_numpy):
+    history = [
+        {'date': epoch_ms(NOW - WINDOW), 'value': 1},
+        {'date': epoch_ms(NOW - WINDOW + timedelta(seconds=1)), 'value': 3},
+        {'date': epoch_ms(NOW), 'value': 2},
+        {'date': epoch_ms(NOW + timedelta(seconds=1)), 'value': 5},
+    ]
+    tasks = [{'type': 'habit', 'history': history}]
+    assert TaskHistory(tasks, use_numpy=use_numpy).summarise(NOW, WINDOW) == [
+        (1, 1, 1)]
+
+
+@pytest.mark.parametrize('use_numpy', ENGINES)
+def test_history_empty(use_numpy):
+    assert TaskHistory([], use_numpy=use_numpy).summarise(NOW, WINDOW) == []
+    tasks = [{'type': 'habit'}, {'type': 'todo', 'completed': False}]
+    assert TaskHistory(tasks, use_numpy=use_numpy).summarise(NOW, WINDOW) == [
+        (0, 0, 0), (0, 0, 0)]
+
+
+def test_history_string_dates():
+    history = [
+        {'date': '2017-03-01T06:00:00.000Z', 'value': 2},
+        {'date': epoch_ms(NOW - timedelta(hours=1)), 'value': 1},
+    ]
+    assert TaskHistory([{'type': 'daily', 'history': history}]).summarise(
+        NOW, WINDOW) == [(1, 1, 1)]
+
+
+def test_summarise_task_score():
+    task = {'type': 'todo', 'completed': True, 'value': 2, 'priority': 1.5}
+    assert HealthEffects().summarise_task_score(task, NOW, WINDOW) == (
+        3, 1, 0)
+
+
+def with_ids(tasks):
+    for i, task in enumerate(tasks):
+        task['id'] = 'task-{0}'.format(i)
+    return tasks
+
+
+def test_history_cache_matches_full_summary(tmpdir):
+    cache_file = str(tmpdir.join('history.json'))
+    tasks = with_ids(make_tasks(50))
+    for task in tasks:
+        for entry in task.get('history', []):
+            entry['date'] -= 48 * 3600 * 1000
+
+    # replay several update cycles, adding history as time moves on
+    rng = random.Random(7)
+    now = NOW - timedelta(hours=48)
+    for cycle in range(6):
+        now += timedelta(hours=12)
+        for task in tasks:
+            if 'history' in task and rng.random() < 0.7:
+                task['history'].append({
+                    'date': epoch_ms(
+                        now - timedelta(minutes=rng.randint(0, 600))),
+                    'value': round(rng.uniform(-10, 10), 2)})
+                task['history'].sort(key=lambda h: h['date'])
+
+        cache = HistoryCache(cache_file)
+        actual = cache.update(tasks, now, WINDOW).summarise(now, WINDOW)
+        cache.save(cache_file)
+
+        expected = TaskHistory(tasks).summarise(now, WINDOW)
+        for a, e in zip(actual, expected):
+            assert a[0] == pytest.approx(e[0])
+            assert a[1:] == e[1:]
+
+
+def test_history_cache_converts_only_new_entries(monkeypatch):
+    history = [{'date': epoch_ms(NOW - timedelta(hours=h)), 'value': h}
+               for h in range(10, 0, -1)]
+    tasks = [{'id': 'a', 'type': 'habit', 'history': history}]
+    cache = HistoryCache()
+    cache.update(tasks, NOW, WINDOW)
+
+    converted = []
+
+    def timestamp(date):
+        converted.append(date)
+        return date / 1000
+
+    monkeypatch.setattr(health_effects, '_timestamp', timestamp)
+    history.append({'date': epoch_ms(NOW), 'value': 4})
+    summary = cache.update(tasks, NOW, WINDOW).summarise(NOW, WINDOW)
+
+    # the new entry, and the high-water mark entry that ends the scan
+    assert converted == [history[-1]['date'], history[-2]['date']]
+    assert summary == [(4, 2, 9)]
+
+
+def test_history_cache_expires_and_drops_tasks(tmpdir):
+    cache_file = str(tmpdir.join('history.json'))
+    tasks = [
+        {'id': 'a', 'type': 'habit',
+         'history': [{'date': epoch_ms(NOW - timedelta(hours=1)), 'value': 1}]},
+        {'id': 'b', 'type': 'daily',
+         'history': [{'date': epoch_ms(NOW - timedelta(hours=2)), 'value': -1}]},
+    ]
+    cache = HistoryCache(cache_file)
+    cache.update(tasks, NOW, WINDOW)
+    cache.save(cache_file)
+
+    cache = HistoryCache(cache_file)
+    assert len(cache) == 2
+    later = NOW + WINDOW
+    assert cache.update(tasks[:1], later, WINDOW).summarise(
+        later, WINDOW) == [(0, 0, 0)]
+    assert len(cache) == 1
+
+    # a later change is relative to the cached value
+    tasks[0]['history'].append({'date': epoch_ms(later), 'value': 3})
+    assert cache.update(tasks[:1], later, WINDOW).summarise(
+        later, WINDOW) == [(2, 1, 0)]
+
+
+def test_history_cache_reset_for_larger_window():
+    tasks = [{'id': 'a', 'type': 'habit', 'history': [
+        {'date': epoch_ms(NOW - timedelta(hours=30)), 'value': 1},
+        {'date': epoch_ms(NOW - timedelta(hours=1)), 'value': 2}]}]
+    cache = HistoryCache()
+    cache.update(tasks, NOW, WINDOW)
+
+    window = timedelta(hours=48)
+    assert cache.update(tasks, NOW, window).summarise(NOW, window) == [
+        (2, 2, 0)]
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+""" Unit tests for the pet care plugin """
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals,
+)
+from builtins import *
+import threading
+
+import requests
+
+from .pet_care import PetCare, PetType, max_matching
+
+
+class MockConfig(object):
+    def __init__(self, dry_run=False, any_pet_food=False, no_raise=False):
+        self.dry_run = dry_run
+        self.any_pet_food = any_pet_food
+        self.no_raise = no_raise
+        self.no_base_pets = False
+        self.quest_pets = True
+        self.magic_pets = True
+        self.pet_care_workers = 4
+        self.use_notification_panel = False
+        self.tags = []
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(response=response)
+
+
+class FakeHabiticaService(object):
+    """ Serves a fixed inventory, and records feeding and hatching. Requests
+    fail with the errors listed for their arguments.
+    """
+    def __init__(self, items):
+        self.items = items
+        self.feeds = []
+        self.hatched = []
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def get_user_fields(self, *fields):
+        return {'items': self.items}
+
+    def __check_errors(self, key):
+        errors = self.errors.get(key)
+        if errors:
+            raise errors.pop(0)
+
+    def feed_pet(self, pet, food, amount=1):
+        with self.lock:
+            self.__check_errors((pet, food, amount))
+            self.feeds.append((pet, food, amount))
+        return {'data': 0, 'message': 'fed'}
+
+    def hatch_pet(self, egg, potion):
+        with self.lock:
+            self.__check_errors((egg, potion))
+            self.hatched.append((egg, potion))
+        return {'message': 'hatched'}
+
+
+def make_items(pets, food, mounts=None):
+    return {
+        'pets': pets,
+        'food': food,
+        'mounts': mounts or {},
+        'eggs': {},
+        'hatchingPotions': {},
+    }
+
+
+def make_plugin(items, **kwargs):
+    hs = FakeHabiticaService(items)
+    plugin = PetCare()
+    plugin.initialise(MockConfig(**kwargs), hs, '')
+    return plugin, hs
+
+
+def test_plan_preferred_food_to_mount():
+    plugin, _ = make_plugin(make_items({'Wolf-Red': 40}, {'Strawberry': 10}))
+    plan = plugin.plan_feeding(['Wolf-Red'])
+    assert plan == [
+        {'pet': 'Wolf-Red', 'food': 'Strawberry', 'amount': 2, 'growth': -1}]
+
+
+def test_plan_feeds_closest_to_mount_first():
+    plugin, _ = make_plugin(
+        make_items({'Wolf-Red': 5, 'Fox-Red': 45}, {'Strawberry': 3}))
+    plan = plugin.plan_feeding(['Wolf-Red', 'Fox-Red'])
+    assert [(s['pet'], s['amount'], s['growth']) for s in plan] == [
+        ('Fox-Red', 1, -1), ('Wolf-Red', 2, 15)]
+
+
+def test_plan_non_preferred_food():
+    items = make_items({'Wolf-Red': 44}, {'Fish': 10, 'Saddle': 1})
+    plugin, _ = make_plugin(items)
+    assert plugin.plan_feeding(['Wolf-Red']) == []
+
+    plugin, _ = make_plugin(items, any_pet_food=True)
+    assert plugin.plan_feeding(['Wolf-Red']) == [
+        {'pet': 'Wolf-Red', 'food': 'Fish', 'amount': 3, 'growth': -1}]
+
+
+def test_plan_magic_pets_fed_last():
+    plugin, _ = make_plugin(
+        make_items({'Wolf-Spooky': 45, 'Wolf-Red': 5}, {'Strawberry': 2}))
+    plan = plugin.plan_feeding(['Wolf-Spooky', 'Wolf-Red'])
+    assert [(s['pet'], s['amount']) for s in plan] == [('Wolf-Red', 2)]
+
+
+def test_plan_no_raise():
+    plugin, _ = make_plugin(
+        make_items({'Wolf-Red': 30}, {'Strawberry': 10}), no_raise=True)
+    assert plugin.plan_feeding(['Wolf-Red']) == [
+        {'pet': 'Wolf-Red', 'food': 'Strawberry', 'amount': 3, 'growth': 45}]
+
+
+def test_feed_pets_executes_plan():
+    pets = dict(('{0}-Red'.format(a), 40) for a in ['Wolf', 'Fox', 'Cactus'])
+    plugin, hs = make_plugin(make_items(pets, {'Strawberry': 100}))
+    plugin.feed_pets()
+    assert sorted(hs.feeds) == [
+        ('Cactus-Red', 'Strawberry', 2),
+        ('Fox-Red', 'Strawberry', 2),
+        ('Wolf-Red', 'Strawberry', 2)]
+    assert hs.items['food']['Strawberry'] == 94
+
+
+def test_feed_pets_retries_only_the_failed_step():
+    plugin, hs = make_plugin(
+        make_items({'Wolf-Red': 5}, {'Strawberry': 2, 'Cake_Red': 10}))
+    hs.errors[('Wolf-Red', 'Cake_Red', 7)] = [http_error(429)]
+    messages = []
+    plugin.notify = messages.append
+    plugin.feed_pets()
+
+    # the rate limited step is retried without feeding the first step again
+    assert hs.feeds == [
+        ('Wolf-Red', 'Strawberry', 2), ('Wolf-Red', 'Cake_Red', 7)]
+    assert hs.items['food'] == {'Strawberry': 0, 'Cake_Red': 3}
+    assert messages == [
+        'Checked 1 pets, fed 9 pieces of food, raised 1 mounts']
+
+
+def test_feed_pets_partial_failure():
+    plugin, hs = make_plugin(
+        make_items({'Wolf-Red': 5}, {'Strawberry': 2, 'Cake_Red': 10}))
+    hs.errors[('Wolf-Red', 'Cake_Red', 7)] = [http_error(404)]
+    messages = []
+    plugin.notify = messages.append
+    plugin.feed_pets()
+
+    # only the food that was accepted is consumed and counted
+    assert hs.feeds == [('Wolf-Red', 'Strawberry', 2)]
+    assert hs.items['food'] == {'Strawberry': 0, 'Cake_Red': 10}
+    assert messages == [
+        'Checked 1 pets, fed 2 pieces of food, raised 0 mounts']
+
+
+def test_feed_pets_dry_run():
+    plugin, hs = make_plugin(
+        make_items({'Wolf-Red': 40}, {'Strawberry': 10}), dry_run=True)
+    plugin.feed_pets()
+    assert not hs.feeds
+
+
+def test_pet_types():
+    plugin, _ = make_plugin(make_items(
+        {'Wolf-Red': 5, 'Gryphon-Red': 5, 'Wolf-Spooky': 5,
+         'Wolf-Veteran': 5, 'Mammoth-Base': 5},
+        {}))
+    assert plugin.get_pet_type('Wolf-Red') == PetType.base
+    assert plugin.get_pet_type('Gryphon-Red') == PetType.quest
+    assert plugin.get_pet_type('Wolf-Spooky') == PetType.magic
+    assert plugin.get_pet_type('Wolf-Veteran') == PetType.rare
+    assert plugin.get_pet_type('Mammoth-Base') == PetType.rare
+
+    # pets outside the inventory are classified on demand
+    assert plugin.is_quest_pet('Owl-Golden')
+    assert plugin.is_magic_pet('Owl-Aquatic')
+
+
+def test_get_pets_filters():
+    plugin, _ = make_plugin(make_items(
+        {'Wolf-Red': 5, 'Gryphon-Red': 5, 'Wolf-Spooky': 5,
+         'Wolf-Veteran': 5, 'Fox-Red': -1, 'Fox-Golden': 46},
+        {},
+        mounts={'Wolf-Red': True}))
+    assert sorted(plugin.get_pets()) == ['Fox-Golden', 'Wolf-Red']
+    assert sorted(plugin.get_pets(feedable_only=True)) == ['Fox-Golden']
+    assert sorted(plugin.get_pets(base=False, quest=True, magic=True)) == [
+        'Gryphon-Red', 'Wolf-Spooky']
+    assert plugin.get_pets(base=False, rare=True) == ['Wolf-Veteran']
+
+
+def test_max_matching():
+    # a greedy match of a-x would leave b unmatched
+    matches = max_matching(
+        {'a': 1, 'b': 1},
+        {'x': 1, 'y': 1},
+        [('a', 'x'), ('a', 'y'), ('b', 'x')])
+    assert sorted(matches) == [('a', 'y'), ('b', 'x')]
+
+
+def test_max_matching_capacities():
+    matches = max_matching(
+        {'a': 2, 'b': 5, 'c': 0},
+        {'x': 3, 'y': 1, 'z': 4},
+        [(l, r) for l in 'abc' for r in 'xyz'])
+    assert len(matches) == 5
+    assert len(set(matches)) == 5
+    assert sum(1 for l, _ in matches if l == 'a') <= 2
+    assert not [m for m in matches if m[0] == 'c']
+
+
+def test_plan_hatching():
+    items = make_items({'Wolf-Red': 5, 'Wolf-Base': -1}, {})
+    items['eggs'] = {'Wolf': 3, 'Fox': 1, 'Gryphon': 2}
+    items['hatchingPotions'] = {'Red': 2, 'Base': 1, 'Spooky': 5}
+    plugin, _ = make_plugin(items)
+    plan = plugin.plan_hatching()
+
+    pets = ['{0}-{1}'.format(*p) for p in plan]
+    assert 'Wolf-Red' not in pets
+    assert 'Gryphon-Spooky' not in pets
+    assert len(set(pets)) == len(pets)
+    # Wolf: Base and Spooky, Fox: one of three, Gryphon: Red (Base is used)
+    assert len(plan) == 4
+
+
+def test_hatch_pets_dry_run():
+    items = make_items({}, {})
+    items['eggs'] = {'Wolf': 1}
+    items['hatchingPotions'] = {'Red': 1}
+    plugin, hs = make_plugin(items, dry_run=True)
+    plugin.hatch_pets()
+    assert plugin.plan_hatching() == [('Wolf', 'Red')]
+
+
+def test_hatch_pets_not_found_is_a_failure():
+    items = make_items({}, {})
+    items['eggs'] = {'Wolf': 1, 'Fox': 1}
+    items['hatchingPotions'] = {'Red': 1, 'Base': 1}
+    plugin, hs = make_plugin(items)
+    plan = plugin.plan_hatching()
+    hs.errors[plan[0]] = [http_error(404)]
+    messages = []
+    plugin.notify = messages.append
+    plugin.hatch_pets()
+    assert hs.hatched == plan[1:]
+    assert messages == ['Hatched 1 new pets']
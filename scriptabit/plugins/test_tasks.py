@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+""" Unit tests for the tasks plugin """
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals,
+)
+from builtins import *
+
+from .tasks import Tasks
+
+def test_find_unused_tags():
+    """tags that are not assigned to any task are unused"""
+    tags = [{'id': 'a', 'name': 'A'},
+            {'id': 'b', 'name': 'B'},
+            {'id': 'c', 'name': 'C'}]
+    tasks = [{'tags': ['a']}, {'tags': []}, {}, {'tags': ['a', 'c']}]
+    assert Tasks.find_unused_tags(tags, tasks) == {'b': tags[1]}
+
+def test_find_unused_tags_from_iterator():
+    """tasks can be a single-pass iterator"""
+    tags = [{'id': str(i), 'name': str(i)} for i in range(1000)]
+    tasks = iter({'tags': [str(i)]} for i in range(0, 1000, 2))
+    unused = Tasks.find_unused_tags(tags, tasks)
+    assert sorted(unused, key=int) == [str(i) for i in range(1, 1000, 2)]
+
+def test_find_unused_tags_no_tasks():
+    """all tags are unused when there are no tasks"""
+    tags = [{'id': 'a', 'name': 'A'}]
+    assert Tasks.find_unused_tags(tags, []) == {'a': tags[0]}
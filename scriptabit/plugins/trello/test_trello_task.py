@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+""" Unit tests for the Trello task """
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals,
+)
+from builtins import *
+from datetime import datetime
+
+import pytz
+
+from scriptabit import Difficulty, CharacterAttribute
+from .trello_task import CardLabels, TrelloTask
+
+
+class FakeLabel(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeCard(object):
+    """ Counts reads of the card fields that are expensive to convert. """
+    def __init__(self, labels):
+        self.reads = 0
+        self.__labels = [FakeLabel(l) for l in labels]
+        self.dateLastActivity = datetime(
+            2017, 1, 2, 10, tzinfo=pytz.FixedOffset(600))
+        self.checklists = []
+
+    @property
+    def labels(self):
+        self.reads += 1
+        return self.__labels
+
+    @property
+    def due_date(self):
+        self.reads += 1
+        return ''
+
+    def fetch(self):
+        self.__labels = [FakeLabel('easy')]
+
+
+def test_labels_read_once():
+    card = FakeCard(['hard', 'intelligence'])
+    task = TrelloTask(card)
+    assert task.difficulty == Difficulty.hard
+    assert task.attribute == CharacterAttribute.intelligence
+    assert task.difficulty == Difficulty.hard
+    assert card.reads == 1
+
+
+def test_dates_converted_once():
+    card = FakeCard([])
+    task = TrelloTask(card)
+    assert task.due_date is None
+    assert task.due_date is None
+    assert card.reads == 1
+    assert task.last_modified == datetime(2017, 1, 2, tzinfo=pytz.utc)
+    assert task.last_modified is task.last_modified
+
+
+def test_fetch_invalidates_derived_values():
+    card = FakeCard(['hard'])
+    task = TrelloTask(card)
+    assert task.difficulty == Difficulty.hard
+    assert task.checklist == []
+    assert task.difficulty == Difficulty.easy
+
+
+def test_card_labels():
+    labels = CardLabels([FakeLabel(n) for n in [
+        'urgent', 'hard', 'perception', 'no sync', 'easy']])
+    assert labels.no_sync
+    # the first matching member in enum order wins, as before
+    assert labels.difficulty == Difficulty.easy
+    assert labels.attribute == CharacterAttribute.perception
+
+    labels = CardLabels([FakeLabel('default')])
+    assert not labels.no_sync
+    assert labels.difficulty is None
+    assert labels.attribute is None
+
+
+def test_precomputed_labels_used():
+    card = FakeCard(['hard'])
+    task = TrelloTask(
+        card,
+        default_attribute=CharacterAttribute.constitution,
+        labels=CardLabels(card.labels))
+    card.reads = 0
+    assert task.difficulty == Difficulty.hard
+    assert task.attribute == CharacterAttribute.constitution
+    assert card.reads == 0
@@ -30,6 +30,7 @@ from trello import TrelloClient
 from trello.util import create_oauth_token
 
 from .board_config import BoardConfig
+from .trello_task import NO_SYNC_LABEL
 from .trello_task_service import TrelloTaskService
 
 class Trello(scriptabit.IPlugin):
@@ -162,6 +163,14 @@ If empty, then cards are only marked done when archived.''')
             help='''Synchronises task description/extra text field.
 The default is to only synchronise the task names.''')
 
+        parser.add(
+            '--trello-fetch-timeout',
+            required=False,
+            type=float,
+            default=0,
+            help='''Maximum time in seconds to wait for the Trello cards and
+Habitica tasks, which are fetched concurrently. If 0, there is no limit.''')
+
         self.print_help = parser.print_help
         return parser
 
@@ -284,10 +293,15 @@ The default is to only synchronise the task names.''')
             self.__habitica_task_service,
             task_map,
             last_sync=self.__data.last_sync,
-            sync_description=self._config.trello_sync_description)
+            sync_description=self._config.trello_sync_description,
+            fetch_timeout=self._config.trello_fetch_timeout or None)
 
         stats = sync.synchronise(clean_orphans=False)
 
+        if self.dry_run and len(sync.plan):
+            logging.getLogger(__name__).info(
+                'Planned Habitica changes:\n%s', sync.plan)
+
         self.__notify(stats)
 
         # Checkpoint the sync data
@@ -411,12 +425,12 @@ The default is to only synchronise the task names.''')
         difficulty_labels = [a.name for a in Difficulty]
         attribute_labels = [a.name for a in CharacterAttribute]
         required_labels = difficulty_labels + attribute_labels
-        required_labels.append('no sync')
+        required_labels.append(NO_SYNC_LABEL)
 
         for b in boards:
+            existing = set(x.name for x in b.get_labels())
             for rl in required_labels:
-                found = [x for x in b.get_labels() if x.name == rl]
-                if not found:
+                if rl not in existing:
                     logging.getLogger(__name__).info(
                         'Board "%s": Label "%s" not found, creating',
                         b.name,
@@ -13,16 +13,79 @@ import pytz
 
 from scriptabit import CharacterAttribute, ChecklistItem, Difficulty, Task
 
+# The label that excludes a card from synchronisation
+NO_SYNC_LABEL = 'no sync'
+
+# Difficulty and attribute members by label name, with the member rank. When
+# a card has several labels of one kind, the lowest ranked member is used.
+_LABEL_MEMBERS = dict(
+    (member.name, (rank, member))
+    for enum in (Difficulty, CharacterAttribute)
+    for rank, member in enumerate(enum))
+
+
+class CardLabels(object):
+    """ The classification of the labels on a Trello card.
+
+    Attributes:
+        no_sync (bool): True if the card is excluded from synchronisation.
+        difficulty (scriptabit.Difficulty): The difficulty label, or None.
+        attribute (scriptabit.CharacterAttribute): The attribute label, or
+            None.
+    """
+
+    __slots__ = ('no_sync', 'difficulty', 'attribute')
+
+    def __init__(self, labels):
+        """ Classifies the labels in a single pass.
+
+        Args:
+            labels (list): The Trello card labels.
+        """
+        self.no_sync = False
+        self.difficulty = None
+        self.attribute = None
+        ranks = {}
+
+        for label in labels:
+            if label.name == NO_SYNC_LABEL:
+                self.no_sync = True
+                continue
+
+            entry = _LABEL_MEMBERS.get(label.name)
+            if not entry:
+                continue
+
+            rank, member = entry
+            kind = type(member)
+            if rank < ranks.get(kind, len(_LABEL_MEMBERS)):
+                ranks[kind] = rank
+                if kind is Difficulty:
+                    self.difficulty = member
+                else:
+                    self.attribute = member
+
 
 class TrelloTask(Task):
     """ Defines a Trello synchronisation task.
     """
+
+    __slots__ = (
+        '__card',
+        '__default_difficulty',
+        '__default_attribute',
+        '__force_completed',
+        '__labels',
+        '__due_date',
+        '__last_modified')
+
     def __init__(
             self,
             card,
             default_difficulty=Difficulty.default,
             default_attribute=CharacterAttribute.default,
-            force_completed=False):
+            force_completed=False,
+            labels=None):
         """ Initialise the Trello task.
 
         Args:
@@ -33,12 +96,30 @@ class TrelloTask(Task):
                 to use if the card does not have an attribute label applied.
             force_completed (bool): If True, the task will report as completed
                 even if card.closed is False.
+            labels (CardLabels): The card label classification, if it is
+                already known.
         """
         super().__init__()
         self.__card = card
         self.__default_difficulty = default_difficulty
         self.__default_attribute = default_attribute
         self.__force_completed = force_completed
+        self.__invalidate()
+        self.__labels = labels
+
+    def __invalidate(self):
+        """ Clears the values derived from the card, so that they are
+        recalculated from the card data on next use. """
+        self.__labels = None
+        self.__due_date = None
+        self.__last_modified = None
+
+    @property
+    def labels(self):
+        """ The card label classification. """
+        if self.__labels is None:
+            self.__labels = CardLabels(self.__card.labels)
+        return self.__labels
 
     @property
     def id(self):
@@ -78,12 +159,7 @@ class TrelloTask(Task):
     @property
     def difficulty(self):
         """ Task difficulty """
-        card_labels = [x.name for x in self.__card.labels]
-        if card_labels:
-            for dl in Difficulty:
-                if dl.name in card_labels:
-                    return dl
-        return self.__default_difficulty
+        return self.labels.difficulty or self.__default_difficulty
 
     @difficulty.setter
     def difficulty(self, difficulty):
@@ -95,12 +171,7 @@ class TrelloTask(Task):
     @property
     def attribute(self):
         """ Task character attribute """
-        card_labels = [x.name for x in self.__card.labels]
-        if card_labels:
-            for al in CharacterAttribute:
-                if al.name in card_labels:
-                    return al
-        return self.__default_attribute
+        return self.labels.attribute or self.__default_attribute
 
     @attribute.setter
     def attribute(self, attribute):
@@ -112,10 +183,11 @@ class TrelloTask(Task):
     @property
     def due_date(self):
         """ The due date if there is one, or None. """
-        due = self.__card.due_date
-        if due:
-            return due.astimezone(tz=pytz.utc)
-        return None
+        if self.__due_date is None:
+            due = self.__card.due_date
+            # False marks a card without a due date
+            self.__due_date = due.astimezone(tz=pytz.utc) if due else False
+        return self.__due_date or None
 
     @due_date.setter
     def due_date(self, due_date):
@@ -127,7 +199,10 @@ class TrelloTask(Task):
     @property
     def last_modified(self):
         """ The last modified timestamp in UTC. """
-        return self.__card.dateLastActivity.astimezone(tz=pytz.utc)
+        if self.__last_modified is None:
+            self.__last_modified = \
+                self.__card.dateLastActivity.astimezone(tz=pytz.utc)
+        return self.__last_modified
 
     @property
     def checklist(self):
@@ -138,6 +213,7 @@ class TrelloTask(Task):
         # unfortunately the py-trello lazy checklist load only works if all
         # card data is fetched first.
         self.__card.fetch()
+        self.__invalidate()
 
         if self.__card.checklists:
             for cl in self.__card.checklists:
@@ -11,7 +11,7 @@ from builtins import *
 
 from scriptabit import TaskService
 
-from .trello_task import TrelloTask
+from .trello_task import CardLabels, TrelloTask
 
 # TODO: Implement dry run support if I implement task writing
 class TrelloTaskService(TaskService):
@@ -39,18 +39,16 @@ class TrelloTaskService(TaskService):
         self.__board_config = board_config
         self.__current_user = trello_client.get_member('me')
 
-    def __get_tasks_from_lists(self, lists, force_completed):
-        """ Gets all tasks from a list of Trello lists.
+    def __iter_tasks_from_lists(self, lists, force_completed):
+        """ Iterates over the tasks in a list of Trello lists.
 
         Args:
             lists (list): The Trello lists.
             force_completed (bool): The completion status override.
 
-        Returns:
-            list: The list of TrelloTask instances.
+        Yields:
+            TrelloTask: The tasks.
         """
-        tasks = []
-
         for l in lists:
             board_defaults = self.__board_config[l.board.name]
             for card in l.list_cards(card_filter='open'):
@@ -58,8 +56,9 @@ class TrelloTaskService(TaskService):
                 # Check whether we can use this card or not based on the board
                 # settings: all cards or only those assigned to the current user
                 use_card = False
+                labels = CardLabels(card.labels)
 
-                if 'no sync' in [l.name for l in card.labels]:
+                if labels.no_sync:
                     use_card = False
                 elif board_defaults.all_cards:
                     use_card = True
@@ -68,13 +67,12 @@ class TrelloTaskService(TaskService):
                     use_card = self.__current_user.id in card.member_id
 
                 if use_card:
-                    task = TrelloTask(
+                    yield TrelloTask(
                         card,
                         default_difficulty=board_defaults.difficulty,
                         default_attribute=board_defaults.attribute,
-                        force_completed=force_completed)
-                    tasks.append(task)
-        return tasks
+                        force_completed=force_completed,
+                        labels=labels)
 
     def get_all_tasks(self):
         """ Get all tasks.
@@ -82,15 +80,23 @@ class TrelloTaskService(TaskService):
         Returns:
             list: The list of tasks
         """
-        tasks = self.__get_tasks_from_lists(
-            self.__lists,
-            force_completed=False)
+        return list(self.iter_tasks())
 
-        tasks.extend(self.__get_tasks_from_lists(
-            self.__done_lists,
-            force_completed=True))
+    def iter_tasks(self):
+        """ Iterates over all tasks, one Trello list at a time.
 
-        return tasks
+        Yields:
+            TrelloTask: The tasks.
+        """
+        for task in self.__iter_tasks_from_lists(
+                self.__lists,
+                force_completed=False):
+            yield task
+
+        for task in self.__iter_tasks_from_lists(
+                self.__done_lists,
+                force_completed=True):
+            yield task
 
     def persist_tasks(self, tasks):
         """ Task factory method.
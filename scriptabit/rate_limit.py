@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+""" Client-side tracking of the Habitica API rate limit.
+
+Habitica reports the rate limit in the `X-RateLimit-Limit`,
+`X-RateLimit-Remaining`, and `X-RateLimit-Reset` response headers, and
+responds with status 429 and a `Retry-After` header once the limit is
+exceeded. `RateLimit` records these headers and keeps a local estimate of the
+remaining request budget, so that callers can wait for the window to reset
+rather than sending requests that will be rejected.
+"""
+
+# Ensure backwards compatibility with Python 2
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals)
+from builtins import *
+
+import calendar
+import logging
+import threading
+import time
+from datetime import datetime
+from email.utils import mktime_tz, parsedate_tz
+
+
+def parse_reset(value, now=None):
+    """ Parses an `X-RateLimit-Reset` header value.
+
+    Habitica sends a JavaScript date string, such as
+    'Mon Mar 20 2023 12:00:00 GMT+0000 (Coordinated Universal Time)'. Numeric
+    values are also accepted, either as an epoch time or as a number of
+    seconds from now.
+
+    Args:
+        value (str): The header value.
+        now (float): The current epoch time. Defaults to `time.time()`.
+
+    Returns:
+        float: The reset time in epoch seconds, or None if the value can't be
+        parsed.
+    """
+    if not value:
+        return None
+    now = time.time() if now is None else now
+
+    try:
+        seconds = float(value)
+        # small values are relative, anything else is an epoch time
+        return now + seconds if seconds < 1e9 else seconds
+    except ValueError:
+        pass
+
+    parts = str(value).split()
+    try:
+        reset = datetime.strptime(' '.join(parts[:5]), '%a %b %d %Y %H:%M:%S')
+        offset = 0
+        if len(parts) > 5 and parts[5].startswith('GMT') and len(parts[5]) == 8:
+            sign = -1 if parts[5][3] == '-' else 1
+            offset = sign * (
+                int(parts[5][4:6]) * 3600 + int(parts[5][6:8]) * 60)
+        return calendar.timegm(reset.timetuple()) - offset
+    except (ValueError, IndexError):
+        logging.getLogger(__name__).debug(
+            'Unrecognised rate limit reset: %s', value)
+        return None
+
+
+def parse_retry_after(value, now=None):
+    """ Parses a `Retry-After` header value.
+
+    The value is either a number of seconds to wait, or an HTTP-date such as
+    'Wed, 21 Oct 2015 07:28:00 GMT'.
+
+    Args:
+        value (str): The header value.
+        now (float): The current epoch time. Defaults to `time.time()`.
+
+    Returns:
+        float: The retry time in epoch seconds, or None if the value can't be
+        parsed.
+    """
+    if not value:
+        return None
+    now = time.time() if now is None else now
+
+    try:
+        return now + float(value)
+    except ValueError:
+        pass
+
+    parsed = parsedate_tz(str(value))
+    if parsed is None:
+        logging.getLogger(__name__).debug(
+            'Unrecognised retry after: %s', value)
+        return None
+    return float(mktime_tz(parsed))
+
+
+class RateLimit(object):
+    """ Thread-safe tracker of the API rate limit.
+
+    Attributes:
+        limit (int): The number of requests allowed in each window, or None
+            if it is not known.
+    """
+
+    # Seconds to wait after a 429 response without a valid Retry-After header
+    DEFAULT_RETRY_AFTER = 60
+
+    def __init__(self, clock=None):
+        """ Initialise the rate limit tracker.
+
+        Args:
+            clock (callable): Optional time source returning seconds. Defaults
+                to `time.time`.
+        """
+        self.limit = None
+        self.__clock = clock or time.time
+        self.__lock = threading.Lock()
+        self.__remaining = None
+        self.__reset_at = None
+
+    @property
+    def remaining(self):
+        """ The estimated number of requests remaining in the current window,
+        or None if it is not known.
+        """
+        with self.__lock:
+            self.__expire()
+            return self.__remaining
+
+    def seconds_until_reset(self):
+        """ Gets the time remaining in the current window.
+
+        Returns:
+            float: Seconds until the window resets, or 0 if not known.
+        """
+        with self.__lock:
+            self.__expire()
+            if self.__reset_at is None:
+                return 0
+            return max(0, self.__reset_at - self.__clock())
+
+    def __expire(self):
+        """ Forgets the budget once the window has reset. The lock must be
+        held by the caller.
+        """
+        if self.__reset_at is not None and self.__clock() >= self.__reset_at:
+            self.__remaining = None
+            self.__reset_at = None
+
+    def update(self, headers, status_code=None):
+        """ Records the rate limit headers of a response.
+
+        Args:
+            headers (dict): The response headers.
+            status_code (int): The response status code.
+        """
+        limit = headers.get('X-RateLimit-Limit')
+        remaining = headers.get('X-RateLimit-Remaining')
+        now = self.__clock()
+        reset_at = parse_reset(headers.get('X-RateLimit-Reset'), now)
+        retry_after = parse_retry_after(headers.get('Retry-After'), now)
+
+        with self.__lock:
+            self.__expire()
+            if limit is not None:
+                self.limit = int(limit)
+
+            if remaining is not None:
+                remaining = int(remaining)
+                new_window = reset_at is not None and (
+                    self.__reset_at is None or reset_at > self.__reset_at + 1)
+                if new_window or self.__remaining is None:
+                    self.__remaining = remaining
+                else:
+                    # Responses to concurrent requests can arrive out of
+                    # order, so never increase the budget within a window.
+                    self.__remaining = min(self.__remaining, remaining)
+
+            if reset_at is not None:
+                self.__reset_at = reset_at
+
+            if status_code == 429:
+                self.__remaining = 0
+                if retry_after is not None:
+                    self.__reset_at = max(self.__reset_at or 0, retry_after)
+                elif self.__reset_at is None:
+                    self.__reset_at = now + self.DEFAULT_RETRY_AFTER
+                logging.getLogger(__name__).warning(
+                    'Rate limit exceeded. Retrying in %.0f seconds',
+                    self.__reset_at - now)
+
+    def acquire(self):
+        """ Reserves a request from the remaining budget.
+
+        Returns:
+            float: Seconds the caller should wait before sending the request.
+            0 if the request can be sent immediately.
+        """
+        with self.__lock:
+            self.__expire()
+            if self.__remaining is None:
+                return 0
+            if self.__remaining > 0:
+                self.__remaining -= 1
+                return 0
+            return max(0, self.__reset_at - self.__clock()) \
+                if self.__reset_at is not None else 0
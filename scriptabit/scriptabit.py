@@ -20,9 +20,11 @@ from pkg_resources import Requirement, resource_filename
 from yapsy.PluginManager import PluginManager
 
 from .authentication import load_habitica_authentication_credentials
+from .circuit_breaker import CircuitBreaker
 from .configuration import (
     get_configuration,
     get_config_file,
+    get_habitica_timeouts,
     copy_default_config_to_user_directory)
 from .errors import ServerUnreachableError, PluginError
 from .habitica_service import HabiticaService
@@ -215,7 +217,13 @@ def run_scriptabit(plugin_name=''):
             # Habitica Service
             habitica_service = HabiticaService(
                 auth_tokens,
-                config.habitica_api_url)
+                config.habitica_api_url,
+                circuit_breaker=CircuitBreaker(
+                    failure_threshold=config.circuit_breaker_failures,
+                    reset_timeout=config.circuit_breaker_reset),
+                timeouts=get_habitica_timeouts(config),
+                streaming=config.stream_responses,
+                user_cache_ttls=config.user_cache_ttls)
 
             # Test for server availability
             if not habitica_service.is_server_up():
@@ -289,7 +297,16 @@ def run_scriptabit(plugin_name=''):
                         plugin_info.name, count, datetime.now().strftime("%c"))
 
                     try:
-                        updating = plugin.update()
+                        breaker = habitica_service.circuit_breaker
+                        if breaker.is_open:
+                            # Skip the cycle rather than waiting out a timeout
+                            # on every call to a degraded server.
+                            logging.getLogger(__name__).warning(
+                                'Habitica API circuit is open, skipping update.'
+                                ' Next probe in %.0f seconds',
+                                breaker.seconds_until_retry())
+                        else:
+                            updating = plugin.update()
                     except Exception as e:
                         logging.getLogger(__name__).error(
                             'Plugin Update failed')
@@ -22,11 +22,26 @@ class Difficulty(Enum):
 
     @staticmethod
     def from_value(value):
-        """ Creates an enum instance from the corresponding value. """
-        for e in Difficulty:
-            if e.value == value:
-                return e
-        return Difficulty.default
+        """ Creates an enum instance from the corresponding value.
+
+        Args:
+            value: The difficulty value. Numeric strings are accepted, and
+                values are compared with a tolerance of 0.005.
+
+        Returns:
+            Difficulty: The matching difficulty, or the default.
+        """
+        value = _difficulty_key(value)
+        if value is None:
+            return Difficulty.default
+
+        difficulty = _DIFFICULTY_BY_VALUE.get(value)
+        if difficulty is None:
+            for known, e in _DIFFICULTY_BY_VALUE.items():
+                if abs(value - known) <= _DIFFICULTY_TOLERANCE:
+                    return e
+            return Difficulty.default
+        return difficulty
 
 
 class CharacterAttribute(Enum):
@@ -39,11 +54,44 @@ class CharacterAttribute(Enum):
 
     @staticmethod
     def from_value(value):
-        """ Creates an enum instance from the corresponding value. """
-        for e in CharacterAttribute:
-            if e.value == value:
-                return e
-        return CharacterAttribute.default
+        """ Creates an enum instance from the corresponding value.
+
+        Args:
+            value (str): The attribute value. Case and surrounding whitespace
+                are ignored.
+
+        Returns:
+            CharacterAttribute: The matching attribute, or the default.
+        """
+        return _ATTRIBUTE_BY_VALUE.get(
+            _attribute_key(value),
+            CharacterAttribute.default)
+
+
+def _difficulty_key(value):
+    """ Normalises a difficulty value for lookup. """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _attribute_key(value):
+    """ Normalises a character attribute value for lookup. """
+    try:
+        return value.strip().lower()
+    except AttributeError:
+        return None
+
+
+# Difficulty values within this distance of a known value match it
+_DIFFICULTY_TOLERANCE = 0.005
+
+# Value to member lookup tables. Iterating an Enum skips the `default` aliases.
+_DIFFICULTY_BY_VALUE = dict(
+    (_difficulty_key(e.value), e) for e in Difficulty)
+_ATTRIBUTE_BY_VALUE = dict(
+    (_attribute_key(e.value), e) for e in CharacterAttribute)
 
 
 class SyncStatus(Enum):
@@ -94,11 +142,16 @@ class Task(object):
         checklist (list): The task checklist, or None if the task does not have
             a checklist.
     """
-    def __init__(self):
+    __slots__ = ('__status',)
+
+    def __init__(self, status=SyncStatus.new):
         """ Initialise the task.
+
+        Args:
+            status (SyncStatus): The initial synchronisation status.
         """
         super().__init__()
-        self.__status = SyncStatus.new
+        self.__status = status
 
     @property
     def id(self):
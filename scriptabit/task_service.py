@@ -5,7 +5,7 @@ A task service provides the following features:
 
     - Query for tasks (including all tasks)
     - Create a new task
-    - Persist a list of tasks
+    - Persist a list of tasks, or a synchronisation change plan
 """
 # Ensure backwards compatibility with Python 2
 from __future__ import (
@@ -29,6 +29,18 @@ class TaskService(object):
         """
         raise NotImplementedError
 
+    def iter_tasks(self):
+        """ Iterates over all tasks.
+
+        Services that can fetch tasks incrementally should override this, so
+        that callers can index the tasks without first building a list.
+
+        Yields:
+            Task: The tasks.
+        """
+        for task in self.get_all_tasks():
+            yield task
+
     def persist_tasks(self, tasks):
         """ Persists the tasks.
 
@@ -37,6 +49,18 @@ class TaskService(object):
         """
         raise NotImplementedError
 
+    def persist_plan(self, plan):
+        """ Persists the changes in a synchronisation plan.
+
+        The default implementation persists the changed tasks with
+        `persist_tasks`. Services can override this to handle each kind of
+        change directly, for example to batch or parallelise them.
+
+        Args:
+            plan (SyncPlan): The changes to persist.
+        """
+        self.persist_tasks(plan.tasks)
+
     def _create_task(self, src=None):
         """ Task factory method.
 
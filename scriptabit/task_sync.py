@@ -33,7 +33,7 @@ Basic algorithm
     - delete mapping
 
 - **Not implemented**: persist source tasks
-- Persist destination tasks
+- Persist the destination task changes, as a `SyncPlan`
 
 
 """
@@ -45,14 +45,63 @@ from __future__ import (
     unicode_literals)
 from builtins import *
 import logging
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from datetime import datetime
 
 import pytz
 from tzlocal import get_localzone
 
+from .errors import TaskFetchError
 from .task import SyncStatus
 
 
+class SyncPlan(object):
+    """ The destination task changes produced by a synchronisation.
+
+    Attributes:
+        creates (list): New destination tasks, including tasks recreated
+            because the mapped destination task was missing.
+        updates (list): Destination tasks updated from changed source tasks.
+        completions (list): Destination tasks updated from completed source
+            tasks.
+        deletes (list): Destination tasks whose source task was deleted.
+    """
+    def __init__(self):
+        """ Initialise an empty plan """
+        self.creates = []
+        self.updates = []
+        self.completions = []
+        self.deletes = []
+
+    def __len__(self):
+        """ The number of changed tasks """
+        return len(self.creates) + len(self.updates) + \
+            len(self.completions) + len(self.deletes)
+
+    @property
+    def tasks(self):
+        """ Gets all changed tasks.
+
+        Returns:
+            list: The creates, updates, completions, and deletes, in that
+            order.
+        """
+        return self.creates + self.updates + self.completions + self.deletes
+
+    def __str__(self):
+        """ Gets a readable list of the planned changes """
+        lines = []
+        for action, tasks in [
+                ('Create', self.creates),
+                ('Update', self.updates),
+                ('Complete', self.completions),
+                ('Delete', self.deletes)]:
+            for task in tasks:
+                lines.append('\t{0}: {1}'.format(action, task.name))
+        return '\n'.join(lines)
+
+
 # pylint: disable=too-few-public-methods
 class TaskSync(object):
     """ Provides synchronisation between two task services.
@@ -97,7 +146,8 @@ class TaskSync(object):
             dst_service,
             task_map,
             last_sync=None,
-            sync_description=True):
+            sync_description=True,
+            fetch_timeout=None):
         """ Initialise the TaskSync instance.
 
         Args:
@@ -107,17 +157,19 @@ class TaskSync(object):
             last_sync (datetime): The last known synchronisation datetime (UTC).
             sync_description (bool): Controls whether the task description will
                 be synchronised.
+            fetch_timeout (float): The maximum time in seconds to wait for the
+                source and destination tasks. None waits indefinitely.
         """
         self.__src_service = src_service
         self.__dst_service = dst_service
         self.__map = task_map
         self.__last_sync = last_sync or datetime.min.replace(tzinfo=pytz.utc)
-        self.__src_tasks = None
-        self.__dst_tasks = None
         self.__src_index = None
         self.__dst_index = None
         self.__sync_description = sync_description
+        self.__fetch_timeout = fetch_timeout
         self.__stats = TaskSync.Stats()
+        self.__plan = SyncPlan()
 
     def __create_new_dst(self, src):
         """ Creates and maps a new destination task.
@@ -143,18 +195,84 @@ class TaskSync(object):
         """ Looks up a cached destination task by ID """
         return self.__dst_index.get(_id, None)
 
+    @staticmethod
+    def __index_tasks(service, description):
+        """ Fetches and indexes the tasks from a service.
+
+        Args:
+            service (TaskService): The task service.
+            description (str): Description of the tasks, for log messages.
+
+        Returns:
+            dict: The tasks, keyed by ID.
+        """
+        logging.getLogger(__name__).debug('Fetching %s tasks', description)
+        start = time.time()
+        index = {t.id:t for t in service.iter_tasks()}
+        logging.getLogger(__name__).debug(
+            'Fetched %d %s tasks in %.1f seconds',
+            len(index),
+            description,
+            time.time() - start)
+        return index
+
     def __get_task_data(self):
-        """ Gets, caches, and indexes task data from the source and destination
+        """ Gets and indexes task data from the source and destination
         services.
-        """
-        logging.getLogger(__name__).debug('Fetching source tasks')
-        self.__src_tasks = self.__src_service.get_all_tasks()
 
-        logging.getLogger(__name__).debug('Fetching destination tasks')
-        self.__dst_tasks = self.__dst_service.get_all_tasks()
+        The two services are independent, so the tasks are fetched
+        concurrently. The tasks are indexed as they are fetched, so the
+        indexes are the only copy of the task data held by the sync.
 
-        self.__src_index = {s.id:s for s in self.__src_tasks}
-        self.__dst_index = {d.id:d for d in self.__dst_tasks}
+        Raises:
+            TaskFetchError: Either fetch failed or timed out. The other fetch
+                is not interrupted, but its result is discarded.
+        """
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            fetches = [
+                ('source', executor.submit(
+                    self.__index_tasks, self.__src_service, 'source')),
+                ('destination', executor.submit(
+                    self.__index_tasks, self.__dst_service, 'destination')),
+            ]
+            done, not_done = wait(
+                [f for _, f in fetches],
+                timeout=self.__fetch_timeout,
+                return_when=FIRST_EXCEPTION)
+
+            errors = []
+            for description, future in fetches:
+                if future in done and future.exception():
+                    logging.getLogger(__name__).error(
+                        'Failed to fetch %s tasks',
+                        description,
+                        exc_info=future.exception())
+                    errors.append('{0} tasks: {1}'.format(
+                        description, future.exception()))
+
+            # a fetch still running after another failed is abandoned, rather
+            # than reported as a timeout
+            if not errors:
+                for description, future in fetches:
+                    if future in not_done:
+                        errors.append(
+                            '{0} tasks timed out after {1} seconds'.format(
+                                description, self.__fetch_timeout))
+
+            if errors:
+                raise TaskFetchError('; '.join(errors))
+
+            self.__src_index = fetches[0][1].result()
+            self.__dst_index = fetches[1][1].result()
+        finally:
+            # don't wait for a fetch that timed out or was abandoned
+            executor.shutdown(wait=False)
+
+    def __add_dst(self, dst):
+        """ Adds a new destination task to the index and the plan. """
+        self.__dst_index[dst.id] = dst
+        self.__plan.creates.append(dst)
 
     def __handle_destination_found(self, src, dst):
         """ Handle the case where a pair of mapped tasks exist.
@@ -175,10 +293,12 @@ class TaskSync(object):
             logging.getLogger(__name__).info(
                 'Completing: %s', src.name)
             self.__stats.completed += 1
+            self.__plan.completions.append(dst)
         else:
             logging.getLogger(__name__).info(
                 'Updating: %s', src.name)
             self.__stats.updated += 1
+            self.__plan.updates.append(dst)
         dst.copy_fields(src, status=SyncStatus.updated)
         if not self.__sync_description:
             dst.description = ''
@@ -195,7 +315,7 @@ class TaskSync(object):
                 'Recreating: %s',
                 src.name)
             self.__map.unmap(src.id)
-            self.__dst_tasks.append(self.__create_new_dst(src))
+            self.__add_dst(self.__create_new_dst(src))
             self.__stats.created += 1
         else:
             # otherwise ignore
@@ -223,7 +343,7 @@ class TaskSync(object):
             create = True
 
         if create:
-            self.__dst_tasks.append(self.__create_new_dst(src))
+            self.__add_dst(self.__create_new_dst(src))
             self.__stats.created += 1
 
     def __handle_deleted_source_task(self, src_id, dst):
@@ -238,6 +358,7 @@ class TaskSync(object):
             'Deleting: %s --> %s', src_id, dst.name)
         dst.status = SyncStatus.deleted
         self.__stats.deleted += 1
+        self.__plan.deletes.append(dst)
 
     def __clean_orphan_task_mappings(self):
         """ Removes task mappings where neither the source or destination
@@ -277,11 +398,12 @@ class TaskSync(object):
             'Starting sync. Last sync at %s',
             self.last_sync.astimezone(get_localzone()))
 
-        # reset the stats
+        # reset the stats and plan
         self.__stats = TaskSync.Stats()
+        self.__plan = SyncPlan()
 
         # source task checks
-        for src in self.__src_tasks:
+        for src in self.__src_index.values():
             try:
                 dst_id = self.__map.try_get_dst_id(src.id)
                 if dst_id:
@@ -303,7 +425,7 @@ class TaskSync(object):
         # destination task checks. Only need to look for cases involving missing
         # source tasks. All other sync conditions can be handled during the
         # source task loop (above).
-        for dst in self.__dst_tasks:
+        for dst in self.__dst_index.values():
             try:
                 src_id = self.__map.try_get_src_id(dst.id)
                 if src_id and not self.__get_src_by_id(src_id):
@@ -321,7 +443,8 @@ class TaskSync(object):
             self.__clean_orphan_task_mappings()
 
         try:
-            self.__dst_service.persist_tasks(self.__dst_tasks)
+            # only the changed tasks are persisted
+            self.__dst_service.persist_plan(self.__plan)
         except Exception as e:
             self.__stats.errors += 1
             logging.getLogger(__name__).warning(
@@ -338,6 +461,15 @@ class TaskSync(object):
 
         return self.__stats
 
+    @property
+    def plan(self):
+        """ Gets the destination task changes from the last synchronisation.
+
+        Returns:
+            SyncPlan: The change plan.
+        """
+        return self.__plan
+
     @property
     def last_sync(self):
         """ Gets the last synchronisation datestamp.
@@ -157,6 +157,10 @@ class MockTaskService(TaskService):
 
     def persist_tasks(self, tasks):
         self.persisted_tasks = tasks
+        # new tasks are now part of the service
+        for t in tasks:
+            if t.status == SyncStatus.new and t not in self.tasks:
+                self.tasks.append(t)
 
     def _create_task(self, src=None):
         return MockTask(_id=uuid.uuid4())
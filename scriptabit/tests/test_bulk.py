@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals,
+)
+from builtins import *
+import threading
+
+import requests
+
+from scriptabit import BulkRunner
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(response=response)
+
+
+class FakeOperation(object):
+    """ Records objects, failing with the given errors. """
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.done = []
+        self.lock = threading.Lock()
+
+    def __call__(self, obj):
+        with self.lock:
+            errors = self.errors.get(obj['id'])
+            if errors:
+                raise errors.pop(0)
+            self.done.append(obj['id'])
+
+
+def test_run_all():
+    op = FakeOperation()
+    objects = [{'id': i} for i in range(100)]
+    result = BulkRunner(op, max_workers=8).run(objects)
+    assert result.done == 100
+    assert not result.failed
+    assert sorted(op.done) == list(range(100))
+
+def test_not_found_counts_as_done():
+    op = FakeOperation({1: [http_error(404)]})
+    result = BulkRunner(op).run([{'id': 0}, {'id': 1}])
+    assert result.done == 2
+    assert op.done == [0]
+
+def test_not_found_is_a_failure_when_requested():
+    op = FakeOperation({1: [http_error(404)]})
+    result = BulkRunner(op, not_found_is_done=False).run(
+        [{'id': 0}, {'id': 1}])
+    assert result.done == 1
+    assert [o['id'] for o, _ in result.failed] == [1]
+
+def test_rate_limited_objects_are_retried():
+    op = FakeOperation({1: [http_error(429), http_error(429)]})
+    result = BulkRunner(op).run([{'id': 0}, {'id': 1}])
+    assert result.done == 2
+    assert sorted(op.done) == [0, 1]
+
+def test_failures_are_left_pending(tmpdir):
+    pending_file = str(tmpdir.join('pending.json'))
+    op = FakeOperation({1: [http_error(401)], 3: [ValueError('bad')]})
+    objects = [{'id': i} for i in range(5)]
+    result = BulkRunner(op, pending_file=pending_file).run(objects)
+
+    assert result.done == 3
+    assert sorted(o['id'] for o, _ in result.failed) == [1, 3]
+    pending = BulkRunner.load_pending(pending_file)
+    assert sorted(o['id'] for o in pending) == [1, 3]
+
+    # resuming completes the operation and removes the pending file
+    result = BulkRunner(op, pending_file=pending_file).run(pending)
+    assert result.done == 2
+    assert BulkRunner.load_pending(pending_file) == []
+    assert not tmpdir.join('pending.json').exists()
+
+def test_load_pending_missing_file(tmpdir):
+    assert BulkRunner.load_pending(str(tmpdir.join('missing.json'))) == []
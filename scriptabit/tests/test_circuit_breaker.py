@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals,
+)
+from builtins import *
+import pytest
+
+from scriptabit import CircuitBreaker, CircuitState
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(object):
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.cb = CircuitBreaker(
+            failure_threshold=3,
+            reset_timeout=60,
+            clock=self.clock)
+
+    def test_initially_closed(self):
+        assert self.cb.state == CircuitState.closed
+        assert self.cb.allow_request()
+
+    def test_opens_after_threshold(self):
+        for _ in range(2):
+            self.cb.record_failure()
+        assert self.cb.state == CircuitState.closed
+        self.cb.record_failure()
+        assert self.cb.state == CircuitState.open
+        assert self.cb.is_open
+        assert not self.cb.allow_request()
+
+    def test_success_resets_failure_count(self):
+        self.cb.record_failure()
+        self.cb.record_failure()
+        self.cb.record_success()
+        self.cb.record_failure()
+        assert self.cb.state == CircuitState.closed
+        assert self.cb.failures == 1
+
+    def test_half_open_after_reset_timeout(self):
+        for _ in range(3):
+            self.cb.record_failure()
+        self.clock.now += 30
+        assert self.cb.seconds_until_retry() == 30
+        self.clock.now += 30
+        assert self.cb.state == CircuitState.half_open
+        assert not self.cb.is_open
+
+    def test_half_open_allows_single_probe(self):
+        for _ in range(3):
+            self.cb.record_failure()
+        self.clock.now += 60
+        assert self.cb.allow_request()
+        assert not self.cb.allow_request()
+
+    def test_successful_probe_closes(self):
+        for _ in range(3):
+            self.cb.record_failure()
+        self.clock.now += 60
+        assert self.cb.allow_request()
+        self.cb.record_success()
+        assert self.cb.state == CircuitState.closed
+        assert self.cb.allow_request()
+
+    def test_failed_probe_reopens(self):
+        for _ in range(3):
+            self.cb.record_failure()
+        self.clock.now += 60
+        assert self.cb.allow_request()
+        self.cb.record_failure()
+        assert self.cb.state == CircuitState.open
+        assert self.cb.seconds_until_retry() == 60
+
+    def test_disabled(self):
+        cb = CircuitBreaker(failure_threshold=0, clock=self.clock)
+        for _ in range(10):
+            cb.record_failure()
+        assert cb.state == CircuitState.closed
+        assert cb.allow_request()
@@ -36,3 +36,29 @@ def test_parse_date_epoch_utc_seconds():
 def test_parse_date_invalid():
     with (pytest.raises(ValueError)):
         parse_date_utc('this is not a date')
+
+def test_parse_date_epoch_number():
+    expected = datetime(2016, 7, 27, 6, 41, 34, 391000, tzinfo=pytz.utc)
+    assert parse_date_utc(1469601694391) == expected
+    assert parse_date_utc(1469601694.391, milliseconds=False) == expected
+
+@pytest.mark.parametrize('raw', [
+    '2016-08-12T11:39:08.123Z',
+    '2016-08-12T11:39:08Z',
+    '2016-08-12T11:39:08.0Z',
+    '2016-08-12T11:39:08.123456+00:00',
+    '2016-08-12T11:39:08+10:00',
+    '2016-08-12',
+    '20160812',
+    '2016',
+    '1469601694391',
+])
+def test_parse_date_matches_iso8601(raw):
+    import iso8601
+    try:
+        expected = iso8601.parse_date(raw).replace(tzinfo=pytz.utc)
+    except iso8601.ParseError:
+        expected = parse_date_utc(int(raw))
+    assert parse_date_utc(raw) == expected
+    # and again from the memo
+    assert parse_date_utc(raw) == expected
@@ -6,13 +6,22 @@ from __future__ import (
     unicode_literals,
 )
 from builtins import *
+import json
+from datetime import datetime
 import pytest
+import pytz
 import requests
 import requests_mock
 from pkg_resources import resource_filename
 
+from scriptabit.circuit_breaker import CircuitBreaker, CircuitState
+from scriptabit.configuration import get_habitica_timeouts
 from scriptabit.errors import *
-from scriptabit.habitica_service import HabiticaService
+from scriptabit.habitica_service import (
+    HEAVY_TASK_FIELDS,
+    EndpointCategory,
+    HabiticaService,
+    HabiticaTaskTypes)
 
 from .fake_data import *
 
@@ -130,6 +139,28 @@ class TestHabiticaService(object):
             new_gp = self.hs.set_gp(0)
             assert new_gp == 0
 
+    def test_set_stats(self):
+        with requests_mock.mock() as m:
+            m.put('https://habitica.com/api/v3/user',
+                  text=get_fake_stats(hp=20, gp=5, lvl=7, exp=0)[1])
+            stats = self.hs.set_stats(hp=20, gp=5, lvl=7)
+
+            assert len(m.request_history) == 1
+            assert sorted(m.request_history[0].text.split('&')) == [
+                'stats.exp=0', 'stats.gp=5', 'stats.hp=20', 'stats.lvl=7']
+            assert stats['hp'] == 20
+            assert stats['lvl'] == 7
+
+    def test_set_stats_validates_all_values(self):
+        with requests_mock.mock() as m:
+            with (pytest.raises(ArgumentOutOfRangeError)):
+                self.hs.set_stats(hp=20, mp=-1)
+            assert not m.called
+
+    def test_set_stats_unknown_stat(self):
+        with (pytest.raises(ValueError)):
+            self.hs.set_stats(str=10)
+
     def test_upsert_without_id_or_alias(self):
         with (pytest.raises(ValueError)):
             self.hs.upsert_task({})
@@ -199,3 +230,281 @@ class TestHabiticaService(object):
             assert history[0].url == 'https://habitica.com/api/v3/tasks/'+_id
             assert history[1].method == 'PUT'
             assert history[1].url == 'https://habitica.com/api/v3/tasks/'+_id
+
+    def test_circuit_opens_on_server_errors(self):
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            circuit_breaker=CircuitBreaker(failure_threshold=2))
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/user',
+                  text='Bad Gateway',
+                  status_code=requests.codes.bad_gateway)
+            for _ in range(2):
+                with pytest.raises(requests.HTTPError):
+                    hs.get_stats()
+            assert hs.circuit_state == CircuitState.open
+
+            # fail fast without touching the network
+            with pytest.raises(CircuitOpenError):
+                hs.get_stats()
+            assert len(m.request_history) == 2
+
+    def test_circuit_ignores_client_errors(self):
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            circuit_breaker=CircuitBreaker(failure_threshold=1))
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/tasks/missing',
+                  status_code=requests.codes.not_found)
+            assert hs.get_task('missing') is None
+            assert hs.circuit_state == CircuitState.closed
+
+    def test_circuit_opens_on_connection_errors(self):
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            circuit_breaker=CircuitBreaker(failure_threshold=1))
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/status',
+                  exc=requests.exceptions.ConnectTimeout)
+            with pytest.raises(requests.Timeout):
+                hs.is_server_up()
+            assert hs.circuit_breaker.is_open
+
+    def test_circuit_probe_closed_out_on_unexpected_errors(self):
+        now = [0]
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=1, reset_timeout=10, clock=lambda: now[0]))
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/status',
+                  exc=requests.exceptions.ConnectTimeout)
+            with pytest.raises(requests.Timeout):
+                hs.is_server_up()
+
+            # the half-open probe fails with an exception that is not a
+            # connection error, and must still reopen the circuit
+            now[0] += 10
+            assert hs.circuit_state == CircuitState.half_open
+            m.get('https://habitica.com/api/v3/status',
+                  exc=requests.exceptions.TooManyRedirects)
+            with pytest.raises(requests.TooManyRedirects):
+                hs.is_server_up()
+            assert hs.circuit_state == CircuitState.open
+
+            # and a later successful probe closes it again
+            now[0] += 10
+            m.get('https://habitica.com/api/v3/status',
+                  json={'data': {'status': 'up'}})
+            assert hs.is_server_up()
+            assert hs.circuit_state == CircuitState.closed
+
+    def test_default_timeouts(self):
+        hs = HabiticaService({}, 'https://habitica.com/api/v3/')
+        for category, timeout in HabiticaService.DEFAULT_TIMEOUTS.items():
+            assert hs.get_timeout(category) == timeout
+
+    def test_timeout_overrides(self):
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            timeouts={EndpointCategory.status: (1, 2)})
+        assert hs.get_timeout(EndpointCategory.status) == (1, 2)
+        assert hs.get_timeout(EndpointCategory.reads) == \
+            HabiticaService.DEFAULT_TIMEOUTS[EndpointCategory.reads]
+
+    def test_global_read_timeout_skips_status(self):
+        config = type(str('Config'), (object,), dict(
+            connect_timeout=0,
+            read_timeout=45,
+            status_timeout=None,
+            reads_timeout=None,
+            writes_timeout=(2, 20),
+            bulk_timeout=None))
+        timeouts = get_habitica_timeouts(config)
+        assert timeouts[EndpointCategory.status] == \
+            HabiticaService.DEFAULT_TIMEOUTS[EndpointCategory.status]
+        assert timeouts[EndpointCategory.reads][1] == 45
+        assert timeouts[EndpointCategory.writes] == (2, 20)
+        assert timeouts[EndpointCategory.bulk][1] == 45
+
+        config.status_timeout = (None, 8)
+        assert get_habitica_timeouts(config)[EndpointCategory.status][1] == 8
+
+    def test_status_uses_status_timeout(self):
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            timeouts={EndpointCategory.status: (1, 2)})
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/status',
+                  text='{"data": {"status": "up"}}')
+            hs.is_server_up()
+            assert m.request_history[0].timeout == (1, 2)
+
+    def test_completed_todos_use_bulk_timeout(self):
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            timeouts={EndpointCategory.bulk: (4, 90)})
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/tasks/user',
+                  text='{"data": []}')
+            hs.get_tasks(HabiticaTaskTypes.completed_todos)
+            assert m.request_history[0].timeout == (4, 90)
+            hs.get_tasks(HabiticaTaskTypes.todos)
+            assert m.request_history[1].timeout == \
+                HabiticaService.DEFAULT_TIMEOUTS[EndpointCategory.reads]
+
+    def test_get_tasks_filters(self):
+        tasks = [
+            {'_id': '1', 'text': 'a', 'tags': ['x'], 'history': [1, 2]},
+            {'_id': '2', 'text': 'b', 'tags': ['y'], 'history': [3]},
+            {'_id': '3', 'text': 'c', 'tags': ['x'],
+             'challenge': {'id': 'ch'}},
+        ]
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/tasks/user',
+                  text=json.dumps({'data': tasks}))
+
+            result = self.hs.get_tasks(tags=['x'])
+            assert [t['_id'] for t in result] == ['1', '3']
+
+            result = self.hs.get_tasks(include_challenges=False)
+            assert [t['_id'] for t in result] == ['1', '2']
+
+            result = self.hs.get_tasks(fields=('_id',))
+            assert result == [{'_id': '1'}, {'_id': '2'}, {'_id': '3'}]
+
+            result = self.hs.get_tasks(exclude_fields=HEAVY_TASK_FIELDS)
+            assert all('history' not in t for t in result)
+
+    def test_get_tasks_updated_since(self):
+        tasks = [
+            {'_id': '1', 'updatedAt': '2016-08-12T11:39:08.0Z'},
+            {'_id': '2', 'updatedAt': '2017-08-12T11:39:08.0Z'},
+        ]
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/tasks/user',
+                  text=json.dumps({'data': tasks}))
+            result = self.hs.get_tasks(
+                updated_since=datetime(2017, 1, 1, tzinfo=pytz.utc))
+            assert [t['_id'] for t in result] == ['2']
+
+    def test_iter_completed_todos(self):
+        tasks = [{'_id': str(i), 'text': 'done', 'history': []}
+                 for i in range(100)]
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/tasks/user',
+                  text=json.dumps({'success': True, 'data': tasks}))
+            result = list(self.hs.iter_completed_todos(
+                chunk_size=16,
+                fields=('_id',)))
+            assert result == [{'_id': str(i)} for i in range(100)]
+            assert m.request_history[0].qs['type'] == ['_allcompletedtodos']
+
+    def test_streaming_get_user(self):
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            streaming=True)
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/user', text=get_fake_stats()[1])
+            stats = hs.get_stats()
+            assert stats == get_fake_stats()[0]
+
+    def test_streaming_get_tasks(self):
+        tasks = [{'_id': str(i), 'history': [1]} for i in range(10)]
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            streaming=True)
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/tasks/user',
+                  text=json.dumps({'data': tasks}))
+            assert hs.get_tasks() == tasks
+            assert hs.get_tasks(fields=('_id',)) == \
+                [{'_id': str(i)} for i in range(10)]
+
+    def test_get_user_fields_query(self):
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/user', text=get_fake_stats()[1])
+            self.hs.get_user_fields('stats', 'items')
+            assert m.request_history[0].qs['userfields'] == ['stats,items']
+
+    def test_user_fields_cached_independently(self):
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            user_cache_ttls={'stats': 60})
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/user', text=get_fake_stats()[1])
+            hs.get_stats()
+            hs.get_stats()
+            assert len(m.request_history) == 1
+
+            # items are not cached, and only the items are fetched
+            hs.get_user_fields('stats', 'items')
+            hs.get_user_fields('items')
+            assert len(m.request_history) == 3
+            assert m.request_history[1].qs['userfields'] == ['items']
+
+            # max_age overrides the ttl
+            hs.get_stats(max_age=0)
+            assert len(m.request_history) == 4
+
+    def test_stats_cache_refreshed_by_writes(self):
+        hs = HabiticaService(
+            {},
+            'https://habitica.com/api/v3/',
+            user_cache_ttls={'stats': 60})
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/user', text=get_fake_stats()[1])
+            m.put('https://habitica.com/api/v3/user',
+                  text=get_fake_stats(hp=10)[1])
+            hs.get_stats()
+            hs.set_hp(10)
+            assert hs.get_stats()['hp'] == 10
+            assert len(m.request_history) == 2
+
+            hs.invalidate_user_cache()
+            hs.get_stats()
+            assert len(m.request_history) == 3
+
+
+class TestRateLimitTracking(object):
+
+    def test_rate_limit_headers_recorded(self):
+        hs = HabiticaService({}, 'https://habitica.com/api/v3/')
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/status',
+                  text='{"data": {"status": "up"}}',
+                  headers={
+                      'X-RateLimit-Limit': '30',
+                      'X-RateLimit-Remaining': '17',
+                      'X-RateLimit-Reset': 'Mon Mar 20 2023 12:00:00 '
+                                           'GMT+0000 (UTC)'})
+            hs.is_server_up()
+        assert hs.rate_limit.limit == 30
+
+    def test_delete_tag(self):
+        hs = HabiticaService({}, 'https://habitica.com/api/v3/')
+        with requests_mock.mock() as m:
+            m.delete('https://habitica.com/api/v3/tags/abc',
+                     text='{"data": {}}')
+            hs.delete_tag({'id': 'abc', 'name': 'x'})
+            assert m.call_count == 1
+
+    def test_feed_pet_amount(self):
+        hs = HabiticaService({}, 'https://habitica.com/api/v3/')
+        with requests_mock.mock() as m:
+            m.post('https://habitica.com/api/v3/user/feed/Wolf-Red/Strawberry',
+                   text='{"data": 20, "message": "fed"}')
+            hs.feed_pet('Wolf-Red', 'Strawberry')
+            hs.feed_pet('Wolf-Red', 'Strawberry', 3)
+            assert m.request_history[0].qs == {}
+            assert m.request_history[1].qs == {'amount': ['3']}
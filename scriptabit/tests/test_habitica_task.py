@@ -96,3 +96,124 @@ def test_init():
     assert a.difficulty == difficulty
     assert a.attribute == attribute
     assert a.status == status
+
+def test_last_modified_parsed_once(monkeypatch):
+    import scriptabit.habitica_task as habitica_task
+    calls = []
+    parse = habitica_task.parse_date_utc
+
+    def counting_parse(*args, **kwargs):
+        calls.append(args[0])
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(habitica_task, 'parse_date_utc', counting_parse)
+    task = HabiticaTask({'updatedAt': '2016-08-12T11:39:08.0Z'})
+    first = task.last_modified
+    assert task.last_modified is first
+    assert calls == ['2016-08-12T11:39:08.0Z']
+
+    # writing the raw field invalidates the parsed value
+    task.task_dict['updatedAt'] = '2017-08-12T11:39:08.0Z'
+    assert task.last_modified.year == 2017
+    assert len(calls) == 2
+
+def test_derived_values_follow_writes():
+    task = HabiticaTask({'date': '2016-08-12T00:00:00.000Z'})
+    assert task.due_date.day == 12
+    task.task_dict['date'] = '2016-08-13T00:00:00.000Z'
+    assert task.due_date.day == 13
+    task.due_date = None
+    assert task.due_date is None
+
+    assert task.difficulty == Difficulty.default
+    task.difficulty = Difficulty.hard
+    assert task.difficulty == Difficulty.hard
+
+def test_task_dict_not_modified():
+    d = {'_id': '1', 'text': 'a', 'type': 'habit', 'collapseChecklist': True,
+         'checklist': [{'id': 'c', 'text': 'item', 'completed': False}]}
+    original = json.loads(json.dumps(d))
+    task = HabiticaTask(d)
+    assert task.difficulty == Difficulty.default
+    assert task.attribute == CharacterAttribute.default
+    assert [i.name for i in task.checklist] == ['item']
+    assert d == original
+
+    data = task.update_data
+    assert d == original
+    assert data == {
+        '_id': '1',
+        'text': 'a',
+        'type': 'todo',
+        'priority': Difficulty.default.value,
+        'attribute': CharacterAttribute.default.value}
+
+def test_compact_record():
+    task = HabiticaTask({'_id': '1', 'text': 'a', 'updatedAt': None})
+    assert not hasattr(task, '__dict__')
+    with pytest.raises(AttributeError):
+        task.something = 1
+
+def test_task_service_streams_tasks():
+    from scriptabit import HabiticaTaskService
+
+    class FakeHabiticaService(object):
+        def __init__(self):
+            self.decoded = 0
+            self.query = None
+
+        def iter_tasks(self, task_type=None, **query):
+            self.query = query
+            for i in range(3):
+                self.decoded += 1
+                yield {'_id': str(i), 'text': 'task {0}'.format(i),
+                       'checklist': [{'id': 'c', 'text': 'item'}]}
+
+    hs = FakeHabiticaService()
+    tasks = HabiticaTaskService(hs).iter_tasks()
+    first = next(tasks)
+    assert hs.decoded == 1
+    assert first.id == '0'
+    assert first.status == SyncStatus.unchanged
+    assert first.existing_checklist_items == [{'id': 'c', 'text': 'item'}]
+    assert [t.id for t in tasks] == ['1', '2']
+    assert hs.query['fields'] == HabiticaTask.SYNC_FIELDS
+    assert not hs.query['include_challenges']
+
+def test_task_service_persists_plan():
+    from scriptabit import HabiticaTaskService, SyncPlan
+
+    class FakeHabiticaService(object):
+        def __init__(self):
+            self.calls = []
+
+        def update_task(self, task):
+            self.calls.append(('update', task['_id']))
+
+        def score_task(self, task):
+            self.calls.append(('score', task['_id']))
+
+        def delete_task(self, task):
+            self.calls.append(('delete', task['_id']))
+
+    def task(_id, completed=False):
+        return HabiticaTask({'_id': _id, 'text': _id, 'completed': completed})
+
+    plan = SyncPlan()
+    plan.creates.append(task('new'))
+    plan.updates.append(task('changed'))
+    plan.completions.append(task('done', completed=True))
+    plan.deletes.append(task('gone'))
+
+    hs = FakeHabiticaService()
+    HabiticaTaskService(hs).persist_plan(plan)
+    assert hs.calls == [
+        ('update', 'new'),
+        ('update', 'changed'),
+        ('update', 'done'),
+        ('score', 'done'),
+        ('delete', 'gone')]
+
+    hs = FakeHabiticaService()
+    HabiticaTaskService(hs, dry_run=True).persist_plan(plan)
+    assert not hs.calls
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals,
+)
+from builtins import *
+import json
+import pytest
+
+from scriptabit.json_stream import iter_array_items
+
+
+def chunked(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i+size] for i in range(0, len(data), size)]
+
+def test_items_decoded_across_chunk_boundaries():
+    items = [
+        {'text': 'task {0} é☃'.format(i), 'value': i * 1.5,
+         'tags': ['a', 'b'], 'completed': i % 2 == 0}
+        for i in range(50)]
+    doc = json.dumps({
+        'success': True,
+        'data': items,
+        'notifications': [{'data': [1, 2]}]})
+
+    for size in (1, 3, 7, 64, 4096):
+        assert list(iter_array_items(chunked(doc, size))) == items
+
+def test_key_after_other_members():
+    doc = '{"notifications": {"data": [9]}, "userV": 12345, "data": [1, 22]}'
+    assert list(iter_array_items(chunked(doc, 2))) == [1, 22]
+
+def test_numbers_are_not_truncated():
+    doc = '{"data": [123456789, 1.25e10]}'
+    assert list(iter_array_items(chunked(doc, 1))) == [123456789, 1.25e10]
+
+def test_empty_array():
+    assert list(iter_array_items(['{"data" : [ ] }'])) == []
+
+def test_str_chunks():
+    assert list(iter_array_items(['{"da', 'ta": [{"a"', ': 1}]}'])) == \
+        [{'a': 1}]
+
+def test_missing_key():
+    with pytest.raises(KeyError):
+        list(iter_array_items(['{"success": true}']))
+
+def test_malformed():
+    with pytest.raises(ValueError):
+        list(iter_array_items(['{"data": [1, 2']))
+
+def test_lazy():
+    def chunks():
+        yield '{"data": [1, 2, '
+        raise AssertionError('read too far')
+
+    items = iter_array_items(chunks())
+    assert next(items) == 1
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals,
+)
+from builtins import *
+import calendar
+from datetime import datetime
+
+from scriptabit import RateLimit
+from scriptabit.rate_limit import parse_reset, parse_retry_after
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_reset_javascript_date():
+    expected = calendar.timegm(datetime(2023, 3, 20, 12, 0, 0).timetuple())
+    value = 'Mon Mar 20 2023 12:00:00 GMT+0000 (Coordinated Universal Time)'
+    assert parse_reset(value) == expected
+    value = 'Mon Mar 20 2023 22:00:00 GMT+1000 (AEST)'
+    assert parse_reset(value) == expected
+
+def test_parse_reset_numeric():
+    assert parse_reset('30', now=1000) == 1030
+    assert parse_reset('1679313600', now=1000) == 1679313600
+
+def test_parse_reset_invalid():
+    assert parse_reset('soon') is None
+    assert parse_reset(None) is None
+
+def test_parse_retry_after():
+    assert parse_retry_after('12', now=1000) == 1012
+    expected = calendar.timegm(datetime(2015, 10, 21, 7, 28, 0).timetuple())
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == expected
+    assert parse_retry_after('later') is None
+    assert parse_retry_after(None) is None
+
+
+class TestRateLimit(object):
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.rl = RateLimit(clock=self.clock)
+
+    def headers(self, remaining, reset_in=60):
+        return {
+            'X-RateLimit-Limit': '30',
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': str(reset_in),
+        }
+
+    def test_unknown_budget_does_not_wait(self):
+        assert self.rl.remaining is None
+        assert self.rl.acquire() == 0
+
+    def test_acquire_consumes_budget(self):
+        self.rl.update(self.headers(2))
+        assert self.rl.limit == 30
+        assert self.rl.acquire() == 0
+        assert self.rl.acquire() == 0
+        assert self.rl.acquire() == 60
+
+    def test_budget_not_increased_within_window(self):
+        self.rl.update(self.headers(5))
+        self.rl.update(self.headers(9))
+        assert self.rl.remaining == 5
+
+    def test_new_window_resets_budget(self):
+        self.rl.update(self.headers(0))
+        self.clock.now += 61
+        assert self.rl.remaining is None
+        self.rl.update(self.headers(29))
+        assert self.rl.remaining == 29
+
+    def test_too_many_requests(self):
+        self.rl.update({'Retry-After': '12'}, status_code=429)
+        assert self.rl.remaining == 0
+        assert self.rl.acquire() == 12
+        self.clock.now += 12
+        assert self.rl.acquire() == 0
+
+    def test_too_many_requests_http_date(self):
+        self.clock.now = calendar.timegm(
+            datetime(2015, 10, 21, 7, 27, 30).timetuple())
+        self.rl.update(
+            {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}, status_code=429)
+        assert self.rl.acquire() == 30
+
+    def test_too_many_requests_invalid_retry_after(self):
+        self.rl.update({'Retry-After': 'later'}, status_code=429)
+        assert self.rl.acquire() == RateLimit.DEFAULT_RETRY_AFTER
@@ -64,6 +64,27 @@ def test_difficulty_values():
     assert Difficulty.medium.value == 1.5
     assert Difficulty.hard.value == 2.0
 
+def test_difficulty_from_value():
+    assert Difficulty.from_value(0.1) == Difficulty.trivial
+    assert Difficulty.from_value(1) == Difficulty.easy
+    assert Difficulty.from_value(0.1 + 1.4) == Difficulty.medium
+    assert Difficulty.from_value('2') == Difficulty.hard
+    assert Difficulty.from_value(' 1.50 ') == Difficulty.medium
+    assert Difficulty.from_value(3) == Difficulty.default
+    assert Difficulty.from_value(1.504) == Difficulty.medium
+    assert Difficulty.from_value(1.994) == Difficulty.default
+    assert Difficulty.from_value(0.106) == Difficulty.default
+    assert Difficulty.from_value('hard') == Difficulty.default
+    assert Difficulty.from_value(None) == Difficulty.default
+
+def test_attribute_from_value():
+    assert CharacterAttribute.from_value('int') == \
+        CharacterAttribute.intelligence
+    assert CharacterAttribute.from_value(' PER') == \
+        CharacterAttribute.perception
+    assert CharacterAttribute.from_value('dex') == CharacterAttribute.default
+    assert CharacterAttribute.from_value(None) == CharacterAttribute.default
+
 def test_id_readonly():
     task = MockTask(_id='34kid0')
     with pytest.raises(AttributeError):
@@ -11,6 +11,7 @@ import pytest
 import pytz
 import requests
 import requests_mock
+import threading
 import uuid
 
 from datetime import datetime, timedelta
@@ -28,7 +29,9 @@ from scriptabit import (
     Task,
     TaskMap,
     Difficulty,
-    CharacterAttribute)
+    CharacterAttribute,
+    SyncPlan,
+    TaskFetchError)
 
 from .task_implementations import MockTaskService, MockTask
 
@@ -214,9 +217,12 @@ def test_old_existing_tasks_are_not_updated():
     # preconditions
     assert dst.status == SyncStatus.unchanged
 
-    TaskSync(src_svc, dst_svc, map, last_sync=last_sync).synchronise()
+    sync = TaskSync(src_svc, dst_svc, map, last_sync=last_sync)
+    sync.synchronise()
 
-    assert len(dst_svc.persisted_tasks) == 1
+    # unchanged tasks are not part of the change plan, so are not persisted
+    assert len(dst_svc.persisted_tasks) == 0
+    assert len(sync.plan) == 0
     assert dst.status == SyncStatus.unchanged
 
 def test_new_existing_tasks_are_updated():
@@ -352,3 +358,109 @@ def test_completion_of_existing_mapped_tasks():
     assert len(dst_svc.tasks) == 1
     assert dst_svc.tasks[0].completed
     assert dst_svc.tasks[0].status == SyncStatus.updated
+
+class StreamingTaskService(MockTaskService):
+    """ A service that can only be iterated """
+    def get_all_tasks(self):
+        raise AssertionError('tasks should be streamed')
+
+    def iter_tasks(self):
+        for t in self.tasks:
+            yield t
+
+def test_sync_streams_tasks():
+    src_tasks = [random_task() for x in range(3)]
+    src = StreamingTaskService(src_tasks)
+    dst = StreamingTaskService([])
+    map = TaskMap()
+    stats = TaskSync(src, dst, map).synchronise()
+
+    assert stats.created == 3
+    assert len(dst.persisted_tasks) == 3
+    for s in src_tasks:
+        assert map.try_get_dst_id(s.id)
+
+class SlowTaskService(MockTaskService):
+    """ A service that blocks while fetching its tasks """
+    def __init__(self, tasks, barrier=None, release=None, error=None):
+        super().__init__(tasks)
+        self.barrier = barrier
+        self.release = release
+        self.error = error
+
+    def get_all_tasks(self):
+        if self.barrier:
+            # both fetches must be waiting at once, or this times out
+            self.barrier.wait(timeout=5)
+        if self.release:
+            self.release.wait(timeout=5)
+        if self.error:
+            raise self.error
+        return self.tasks
+
+def test_fetches_are_concurrent():
+    barrier = threading.Barrier(2)
+    src = SlowTaskService([random_task() for x in range(3)], barrier=barrier)
+    dst = SlowTaskService([], barrier=barrier)
+    stats = TaskSync(src, dst, TaskMap()).synchronise()
+    assert not barrier.broken
+    assert stats.created == 3
+
+def test_fetch_error_is_reported():
+    src = SlowTaskService([random_task()], error=IOError('Trello is down'))
+    dst = SlowTaskService([])
+    with pytest.raises(TaskFetchError) as e:
+        TaskSync(src, dst, TaskMap()).synchronise()
+    assert 'source tasks: Trello is down' in str(e.value)
+    assert 'destination' not in str(e.value)
+
+def test_fetch_timeout():
+    release = threading.Event()
+    src = SlowTaskService([random_task()])
+    dst = SlowTaskService([], release=release)
+    map = TaskMap()
+    try:
+        with pytest.raises(TaskFetchError) as e:
+            TaskSync(src, dst, map, fetch_timeout=0.1).synchronise()
+    finally:
+        # let the abandoned fetch finish
+        release.set()
+    assert 'destination tasks timed out' in str(e.value)
+    assert not map.get_all_src_keys()
+
+def test_change_plan():
+    last_sync = datetime(2016, 8, 15, tzinfo=pytz.utc)
+    newer = last_sync + timedelta(minutes=1)
+    new = random_task()
+    changed = random_task(last_modified=newer)
+    completed = random_task(completed=True, last_modified=newer)
+    unchanged = random_task(last_modified=last_sync - timedelta(days=1))
+    src_svc = MockTaskService([new, changed, completed, unchanged])
+
+    dst_tasks = [random_task() for x in range(4)]
+    dst_svc = MockTaskService(list(dst_tasks))
+    map = TaskMap()
+    map.map(changed, dst_tasks[0])
+    map.map(completed, dst_tasks[1])
+    map.map(unchanged, dst_tasks[2])
+    map.map(random_task(), dst_tasks[3])
+
+    sync = TaskSync(src_svc, dst_svc, map, last_sync=last_sync)
+    sync.synchronise()
+    plan = sync.plan
+
+    assert [t.name for t in plan.creates] == [new.name]
+    assert plan.updates == [dst_tasks[0]]
+    assert plan.completions == [dst_tasks[1]]
+    assert plan.deletes == [dst_tasks[3]]
+    assert len(plan) == 4
+    assert dst_svc.persisted_tasks == plan.tasks
+    assert 'Delete: {0}'.format(dst_tasks[3].name) in str(plan)
+
+def test_default_persist_plan():
+    svc = MockTaskService([])
+    plan = SyncPlan()
+    plan.updates.append(random_task())
+    plan.creates.append(random_task())
+    svc.persist_plan(plan)
+    assert svc.persisted_tasks == [plan.creates[0], plan.updates[0]]
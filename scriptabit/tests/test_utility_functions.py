@@ -218,3 +218,54 @@ class TestUtilityFunctions(object):
             # the put method to set HP should not be called
             assert history[0].method == 'GET'
             assert len(history) == 1
+
+    def test_set_stats_single_read_and_write(self):
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/user',
+                  text=get_fake_stats(hp=20, mp=30, gp=100)[1])
+            m.put('https://habitica.com/api/v3/user',
+                  text=get_fake_stats(hp=25, mp=40, gp=50)[1])
+            uf = UtilityFunctions(MockConfig(), self.hs)
+            new = uf.set_stats({
+                'hp': (5, True, False),
+                'mp': (40, False, False),
+                'gp': (0.5, False, True)})
+
+            history = m.request_history
+            assert len(history) == 2
+            assert history[0].method == 'GET'
+            assert history[1].method == 'PUT'
+            assert sorted(history[1].text.split('&')) == [
+                'stats.gp=50.0', 'stats.hp=25', 'stats.mp=40']
+            assert new == {'hp': 25, 'mp': 40, 'gp': 50}
+
+    def test_set_stats_level_resets_xp(self):
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/user',
+                  text=get_fake_stats(lvl=4, exp=34)[1])
+            m.put('https://habitica.com/api/v3/user',
+                  text=get_fake_stats(lvl=10, exp=0)[1])
+            uf = UtilityFunctions(MockConfig(), self.hs)
+            new = uf.set_stats({
+                'exp': (100, True, False),
+                'lvl': (10, False, False)})
+
+            history = m.request_history
+            assert len(history) == 2
+            assert sorted(history[1].text.split('&')) == [
+                'stats.exp=0', 'stats.lvl=10']
+            assert new == {'exp': 0, 'lvl': 10}
+
+    def test_set_stats_dry_run(self):
+        with requests_mock.mock() as m:
+            m.get('https://habitica.com/api/v3/user',
+                  text=get_fake_stats(hp=20, mp=30)[1])
+            uf = UtilityFunctions(MockConfig(dry_run=True), self.hs)
+            new = uf.set_stats({
+                'hp': (-25, True, False),
+                'mp': (10, False, False)})
+
+            history = m.request_history
+            assert len(history) == 1
+            assert history[0].method == 'GET'
+            assert new == {'hp': 0, 'mp': 10}
@@ -35,38 +35,38 @@ class UtilityFunctions(object):
         self.__stat_setters = [
             {
                 'name': 'hp',
+                'stat': 'hp',
                 'type': float,
                 'default': -1.0,
                 'help': 'health points',
-                'setter': self.set_health,
             },
             {
                 'name': 'mp',
+                'stat': 'mp',
                 'type': float,
                 'default': -1.0,
                 'help': 'mana points',
-                'setter': self.set_mana,
             },
             {
                 'name': 'xp',
+                'stat': 'exp',
                 'type': int,
                 'default': -1,
                 'help': 'experience points',
-                'setter': self.set_xp,
             },
             {
                 'name': 'gp',
+                'stat': 'gp',
                 'type': float,
                 'default': -1.0,
                 'help': 'gold',
-                'setter': self.set_gold,
             },
             {
                 'name': 'level',
+                'stat': 'lvl',
                 'type': int,
                 'default': -1,
                 'help': 'character level',
-                'setter': self.set_level,
             },
         ]
 
@@ -182,34 +182,74 @@ class UtilityFunctions(object):
 
         config_dict = vars(self.__config)
 
-        # dispatch any setters, incrementers, and scaling args
+        # Collect any setters, incrementers, and scaling args so that all
+        # changes are read and written in a single request each.
+        changes = {}
         for stat in self.__stat_setters:
             arg = config_dict['set_'+stat['name']]
             inc_arg = config_dict['inc_'+stat['name']]
             scale_arg = config_dict['scale_'+stat['name']]
 
             if arg >= 0:
-                stat['setter'](arg)
+                changes[stat['stat']] = (arg, False, False)
             elif inc_arg != 0:
-                stat['setter'](inc_arg, increment=True)
+                changes[stat['stat']] = (inc_arg, True, False)
             elif scale_arg != 0:
-                stat['setter'](scale_arg, scale=True)
-
-    def __set_stat(
-            self,
-            name,
-            value,
-            hs_func,
-            lower_bound=0,
-            increment=False,
-            scale=False):
+                changes[stat['stat']] = (scale_arg, False, True)
+
+        if changes:
+            self.set_stats(changes)
+
+    def set_stats(self, changes, lower_bound=0):
+        """Sets several stats, reading and writing the user stats once.
+
+        Setting the level resets XP to 0, even if an XP change is also
+        requested. This matches applying the changes one stat at a time, where
+        the level was always set after the XP.
+
+        Args:
+            changes (dict): Mapping of stat name ('hp', 'mp', 'exp', 'gp', or
+                'lvl') to a (value, increment, scale) tuple. If increment is
+                True, the value is added to the current value. If scale is
+                True, the current value is multiplied by the value.
+            lower_bound: Lower bound on the set values.
+
+        Returns:
+            dict: The new stat values, keyed by stat name.
+        """
+        old = self.__hs.get_stats()
+
+        new = {}
+        for name, (value, increment, scale) in changes.items():
+            if increment:
+                set_value = old[name] + value
+            elif scale:
+                set_value = old[name] * value
+            else:
+                set_value = value
+            new[name] = max(lower_bound, set_value)
+
+        if 'lvl' in new:
+            new['exp'] = 0
+
+        if not self.dry_run:
+            stats = self.__hs.set_stats(**new)
+            new = {name: stats[name] for name in new}
+
+        for name in sorted(new):
+            logging.getLogger(__name__).info(
+                '%s changed from %f to %f',
+                name,
+                old[name],
+                new[name])
+        return new
+
+    def __set_stat(self, name, value, increment=False, scale=False):
         """Generic stat setter.
 
         Args:
             name (str): The stat name
             value: the new value
-            hs_func: The HabiticaService method that will set the stat.
-            lower_bound: Lower bound on the set value
             increment (bool): If true, the value is treated as an increment
                 instead of the new value
             scale (bool): If true, the current value is scaled by `value`.
@@ -217,23 +257,7 @@ class UtilityFunctions(object):
         Returns:
             The new stat value
         """
-        old = self.__hs.get_stats()[name]
-
-        if increment:
-            set_value = old + value
-        elif scale:
-            set_value = old * value
-        else:
-            set_value = value
-
-        set_value = max(lower_bound, set_value)
-        new = set_value if self.dry_run else hs_func(set_value)
-        logging.getLogger(__name__).info(
-            '%s changed from %f to %f',
-            name,
-            old,
-            new)
-        return new
+        return self.set_stats({name: (value, increment, scale)})[name]
 
     def set_health(self, hp, increment=False, scale=False):
         """Sets the user health to the specified value
@@ -244,7 +268,6 @@ class UtilityFunctions(object):
         return self.__set_stat(
             'hp',
             hp,
-            self.__hs.set_hp,
             increment=increment,
             scale=scale)
 
@@ -257,7 +280,6 @@ class UtilityFunctions(object):
         return self.__set_stat(
             'exp',
             xp,
-            self.__hs.set_exp,
             increment=increment,
             scale=scale)
 
@@ -270,7 +292,6 @@ class UtilityFunctions(object):
         return self.__set_stat(
             'mp',
             mp,
-            self.__hs.set_mp,
             increment=increment,
             scale=scale)
 
@@ -283,7 +304,6 @@ class UtilityFunctions(object):
         return self.__set_stat(
             'gp',
             gp,
-            self.__hs.set_gp,
             increment=increment,
             scale=scale)
 
@@ -296,14 +316,14 @@ class UtilityFunctions(object):
         return self.__set_stat(
             'lvl',
             level,
-            self.__hs.set_lvl,
             increment=increment,
             scale=scale)
 
     def show_user_data(self):
         """Shows the user data"""
         logging.getLogger(__name__).debug('Getting user data')
-        data = self.__hs.get_user()
+        data = self.__hs.get_user(
+            user_fields=('profile', 'lastCron', 'stats'))
         print()
         print("Summarised User Data")
         print("--------------------")